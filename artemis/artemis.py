@@ -1,13 +1,14 @@
 # TODO: Update Description Below
 """
-This Module is used as the main execution of the model, it is divided into four core aspects:
+This Module is used as the main execution of the model, it is divided into three core aspects:
 - Initialize Parameters                         (using scenario file csv and ConfigHandler object)
 - Initialize Model                              (make empty objects supporting structure of the model)
 - Run Simulations                               (start iteration loop)
     -   Initialize model content                (Use init_objects.ObjectInitializer to set up options and agents in the iteration)
-    -   Run Simulation                          (Use run_model.ModelRunner to run an iteration)
+    -   Run Simulation                          (Use run_model.ModelRunner to run an iteration, iterations can run in
+                                                 parallel processes, each with its own random seed)
     -   extract output data to usable formats   (use DataExtractor to extract Pandas.Dataframe objects with raw data)
-- Export Data to datafiles                      (Use DataWriter to create .csv files)
+    -   export data to datafiles                (Use DataWriter to append the output data of the iteration to data files)
 
 Module inputs:
 -   almost all other modules are used directly or indirectly (through one of the other imported modules)
@@ -30,7 +31,9 @@ Version Number:
 
 import timeit                                                                                                           # Import module to track runtime
 import os
-import pandas as pd                                                                                                     # Pandas dataframes as data structure tool
+from concurrent.futures import ProcessPoolExecutor                                                                      # Pool of processes to run iterations in parallel
+from itertools import repeat
+import numpy as np
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Import Internal Modules built for ARTEMIS functionality
@@ -41,8 +44,11 @@ from artemis.run_model import ModelRunner
 
 from artemis.core.agents import AgentFleet                                                                              # Module with agents (and groups of agents) functionality
 from artemis.core.choice_set import ChoiceSet                                                                           # Module with choice option (e.g. grid cells) functionality, representing the physical environment agents operate in
+from artemis.core.random_streams import RandomStreams                                                                   # Module that gives every component of the model its own stream of random numbers
 from artemis.core.competition import CompetitionHandler                                                                 # Module that handles model feedbacks as a result of competition between agents
 
+from artemis.io.output.tracing import Tracer                                                                             # Module that reports on the progress of a run, and captures events to a data file
+from artemis.io.output.profiling import PhaseProfiler                                                                    # Module that measures the time (and memory) every phase of a run takes
 from artemis.io.output.printing import PrintBlocker                                                                     # Module that allows for blocking of print statements in the scripts
 from artemis.io.output.raw_data_extraction import DataExtractor                                                         # Module to generate output data (as pandas dataframes) from the objects in the model
 from artemis.io.output.export_data import DataWriter                                                                    # Module to write datafiles from the output data
@@ -52,7 +58,7 @@ from artemis.io.output.export_data import DataWriter
 # ----------------------------------------------------------------------------------------------------------------------
 
 
-def run_artemis(scenario_data, output_subfolder, save_config=False):
+def run_artemis(scenario_data, output_subfolder, save_config=False, workers=None, seed=None):
     """Run the ARTEMIS model and write output files.
     
     Parameters
@@ -63,6 +69,13 @@ def run_artemis(scenario_data, output_subfolder, save_config=False):
         Path to output subfolder.
     save_config: bool, optional
         Set to True to save configuration file to output subfolder. Default: False.
+    workers: int, optional
+        Number of processes that run iterations in parallel, overrides model > workers in the scenario data.
+        Default: model > workers, or 1 if that is not set.
+    seed: int, optional
+        Master seed every iteration derives its own random seed from, overrides model > seed in the scenario data.
+        Output is the same for any number of workers. Without seed, the master seed is drawn from the global numpy
+        random state. Default: model > seed, or None if that is not set.
     """
     
     start = timeit.default_timer()                                                                                          # Start timer for model run
@@ -70,12 +83,13 @@ def run_artemis(scenario_data, output_subfolder, save_config=False):
     if save_config:
         config.to_yml(os.path.join(output_subfolder, 'config.yml'))
 
+    workers = config.workers if workers is None else workers
+    seed = config.seed if seed is None else seed
+
     # ----------------------------------------------------------------------------------------------------------------------
     # Set up objects that are independent on simulation settings
     # ----------------------------------------------------------------------------------------------------------------------
 
-    model_runner = ModelRunner()                                                                                            # initialize the object with the functionality to run a simulation with the initialized agents and choice options
-    data_extractor = DataExtractor()                                                                                        # initialize the object with the functionality to extract output data from model objects
     print_blocker = PrintBlocker()                                                                                          # define object to block printing if desired
 
     # ----------------------------------------------------------------------------------------------------------------------
@@ -88,122 +102,241 @@ def run_artemis(scenario_data, output_subfolder, save_config=False):
     if not config.reporting:                                                                                            # block printing if desired (if reporting is False in a given scenario setting)
         print_blocker.block_print()
 
-
-    competition_handler = CompetitionHandler(competition_method=config.competition_scenario,
-                                             interference_factor=config.interference_factor)                             # object that will ensure competition feedbacks are executed for in the model
-
-    data_writer = DataWriter(output_file_suffix)                                                                        # initialize the object with the functionality to export data files from output data
-
-    time_x_agent_data = pd.DataFrame()                                                                                  # intialize object to contain output data that has data on individual time steps and individual agent
-    time_x_environment_data = pd.DataFrame()                                                                            # intialize object to contain output data that has data on individual time steps and environmental units (DiscreteAlternatives or Gridcells)
+    data_writer = DataWriter(output_file_suffix, output_format=config.output_format)                                    # initialize the object with the functionality to export data files from output data
+    iteration_seeds = spawn_iteration_seeds(config.number_of_iterations, seed=seed)                                     # independent random seed for every iteration
+    profiler = PhaseProfiler(enabled=config.profiling, memory=config.profile_memory)                                    # measures the writing of the output, and collects the measurements of all iterations
+    profiler.start()
 
     # ----------------------------------------------------------------------------------------------------------------------
     # Start Iteration loop
     # ----------------------------------------------------------------------------------------------------------------------
-    iteration_counter = 0                                                                                               # initialization of counter for iteration loops
-    while iteration_counter < config.number_of_iterations:
-        print('-------------------------------------------------------------------------------------------------------',# print statement for user to keep track of the progression of scenario iterations in the model
-            '\nStarting Iteration no.{} \n'.format(str(iteration_counter)),
-            "-------------------------------------------------------------------------------------------------------"
-            )
+
+    executor = None
+    try:
+        if workers == 1:
+            iteration_outputs = map(run_iteration, repeat(config), range(config.number_of_iterations), iteration_seeds) # run iterations one after another in this process
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers,
+                                           initializer=None if config.reporting else print_blocker.block_print)         # worker processes block printing too
+            iteration_outputs = executor.map(run_iteration, repeat(config), range(config.number_of_iterations),
+                                             iteration_seeds)                                                           # run iterations in parallel, results are returned in iteration order
+
+        for iteration_output, iteration_phases in iteration_outputs:                                                    # write the output of every iteration as soon as it (and all iterations before it) is done
+            with profiler.phase('writing'):
+                for file_name, iteration_data in iteration_output.items():
+                    data_writer.append(iteration_data, os.path.join(output_subfolder, file_name))                       # append to output file, so only a single iteration is kept in memory
+            profiler.merge(iteration_phases)
+    finally:                                                                                                            # also if an iteration or writing its output fails
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)                                                                      # iterations that have not started yet are cancelled if the run failed
+        with profiler.phase('writing'):
+            data_writer.close()                                                                                         # finish the output files (writes the footer of parquet and feather files)
+
+        # Enable Printing
+        print_blocker.enable_print()                                                                                    # enable printing to report on runtime and other prints that are always desired regardless of print blocking
+
+    # ---- exit iteration loop ----
+
+    profiler.stop()
+
+    # Progress to next scenario (implicit in code)
 
     # ----------------------------------------------------------------------------------------------------------------------
-    # initialize the Environment (choice set), containing all discrete alternatives and the fleet, containing all agents
+    # Runtime tracking and reporting
     # ----------------------------------------------------------------------------------------------------------------------
 
-        choice_set = ChoiceSet(                                                                                         # initialize the potential options/ environmental units in the model (e.g. the grid with cells to fish in), representing the environment agents operate in
-            nb_alternatives=config.choice_set_size,
-            stock_distribution=config.stock_reset_scenario,
-            init_stock=config.init_stock,
-            sd_init_stock=config.sd_init_stock,
-            growth_factor=config.growth_factor,
-            duration=config.duration, maximum_stock=config.max_stock, minimum_stock=config.min_stock
-            )
+    # ---- exit scenario loop ----
 
-        fleet = AgentFleet()                                                                                       # initialize the forager agents in the model (e.g. fishermen)
-        for agent in config.agents:
-            fleet.add(
-                nb_agents=agent.number_of_agents,
-                subfleet_name=agent.name,
-                choice_set=choice_set,
-                catchability_coefficient=agent.catchability_coefficient,
-                nb_alternatives_known=agent.init_number_of_alternatives_known,
-                explore_probability=agent.explore_probability,
-                duration_model=config.duration,
-                choice_method=agent.choice_method,
-                sharing_strategy=agent.sharing_strategy,
-                receiver_choice_strategy=config.pick_receiver_strategy,
-                receiving_strategy=agent.receiving_strategy,
-                number_of_shared_alternatives=agent.shared_alternatives,
-                number_of_agents_shared_with=agent.share_partners
-                )
-        fleet.finalize_setup(
-            number_of_sharing_groups=config.number_of_groups,
-            group_division_style=config.division_style,
-            group_dynamics=config.group_dynamics,
-            duration_model=config.duration,
-            agent_ordering_strategy=config.agent_order
-            )
+    stop = timeit.default_timer()                                                                                           # stop run timer
+    execution_time = stop - start                                                                                           # calculate elapsed runtime (in seconds)
+
+    print("Model Runtime: \t{} seconds".format(str(execution_time)))                                                        # report runtime in seconds
+
+    if profiler.enabled:                                                                                                # report on the time every phase of the run took next to the output data
+        profiler.write_report(os.path.join(output_subfolder, 'profiling_report{}.json'.format(output_file_suffix)),
+                              scenario_id=config.name, engine=config.engine, workers=workers,
+                              number_of_iterations=config.number_of_iterations, total_wall_time=execution_time)
+
+
+def spawn_iteration_seeds(number_of_iterations, seed=None):
+    """Derive an independent random seed (numpy.random.SeedSequence) for every iteration from a master seed.
+    Without master seed, it is drawn from the global numpy random state, so seeding numpy keeps runs reproducible."""
+    if seed is None:
+        seed = np.random.randint(np.iinfo(np.int32).max)
+    return np.random.SeedSequence(seed).spawn(number_of_iterations)
+
+
+def run_iteration(config, iteration_id, seed_sequence=None):
+    """Run a single iteration of a scenario and return its output data.
+
+    Parameters
+    ----------
+    config: Configuration
+        Configuration of the scenario.
+    iteration_id: int
+        Number of the iteration.
+    seed_sequence: numpy.random.SeedSequence, optional
+        Random seed of the iteration, the random streams of all components are spawned from it.
+        Default: None, a seed drawn from the global numpy random state.
+
+    Returns
+    -------
+    dict
+        Output data of the iteration (pandas.DataFrame) for every output file name, in the order they are written.
+    dict
+        Wall time, number of calls and allocated bytes of every phase of the iteration, empty if not profiled.
+    """
+
+    profiler = PhaseProfiler(enabled=config.profiling, memory=config.profile_memory)                                    # measures the phases of the iteration, if profiling is on
+    profiler.start()
+
+    random_streams = RandomStreams(seed_sequence)                                                                       # independent stream of random numbers for every component of the model in this iteration
+    tracer = Tracer(level=config.trace_level, capture_level=config.trace_capture_level,
+                    sample_rate=config.trace_sample_rate, random_stream=random_streams['tracing'])                      # object to report on the progress of the iteration and capture its events
+    tracer.set_time(iteration_id=iteration_id)
+    if tracer.traces_iterations:                                                                                        # keep track of the progression of scenario iterations in the model
+        tracer.event('iteration', 'iteration_start',
+                     '-------------------------------------------------------------------------------------------------------'
+                     ' \nStarting Iteration no.{iteration_id} \n '
+                     '-------------------------------------------------------------------------------------------------------')
+    model_runner = ModelRunner()                                                                                        # initialize the object with the functionality to run a simulation with the initialized agents and choice options
+    competition_handler = CompetitionHandler(competition_method=config.competition_scenario,
+                                             interference_factor=config.interference_factor)                             # object that will ensure competition feedbacks are executed for in the model
+
+    with profiler.phase('setup'):
+        choice_set, fleet = initialize_model(config, random_streams=random_streams, tracer=tracer)                      # initialize the Environment (choice set) and the fleet, containing all agents
 
     # ----------------------------------------------------------------------------------------------------------------------
     # RUN SIMULATION
     # ----------------------------------------------------------------------------------------------------------------------
 
-        # TODO: Check if returning the ChoiceSet and AgentFleet is necessary, since they seem to be modified in place as well
-        choice_set_output, fleet_output = \
-            model_runner.run_model(choice_set=choice_set,                                                               # run the model and return final states of the agents and choice options in the model
-                                fleet=fleet,
-                                duration=config.duration,
-                                stock_reset_scenario=config.stock_reset_scenario,
-                                init_stock=config.init_stock,
-                                sd_init_stock=config.sd_init_stock,
-                                competition_handler=competition_handler,
-                                stock_reset_chance=config.chance_reset_stock,                                           # TODO: Move  stock_reset chance as internal Attribute of individual DiscreteAlternative Objects, to allow for flexibility
-                                iteration_id=iteration_counter,
-                                max_stock=config.max_stock,
-                                min_stock=config.min_stock)
+    model_runner.run_model(choice_set=choice_set,                                                                       # run the model, the agents and choice options are modified in place
+                           fleet=fleet,
+                           duration=config.duration,
+                           stock_reset_scenario=config.stock_reset_scenario,
+                           init_stock=config.init_stock,
+                           sd_init_stock=config.sd_init_stock,
+                           competition_handler=competition_handler,
+                           stock_reset_chance=config.chance_reset_stock,                                                # TODO: Move  stock_reset chance as internal Attribute of individual DiscreteAlternative Objects, to allow for flexibility
+                           iteration_id=iteration_id,
+                           max_stock=config.max_stock,
+                           min_stock=config.min_stock,
+                           tracer=tracer,
+                           profiler=profiler)
 
     # ----------------------------------------------------------------------------------------------------------------------
-    # Extract Raw Data in every iteration
+    # Extract Raw Data of the iteration
     # ----------------------------------------------------------------------------------------------------------------------
 
-        time_x_agent_data = \
-            time_x_agent_data = pd.concat([time_x_agent_data,
-                data_extractor.get_time_x_agent_data(agent_set=fleet,
-                                                     iteration_id=iteration_counter)]).reset_index(drop=True)           # Get Dataframe with data specific per unit of time and agent (e.g. actual catch obtained, competition encountered)
+    with profiler.phase('extraction'):
+        iteration_output = extract_output_data(config, choice_set=choice_set, fleet=fleet, iteration_id=iteration_id)
+
+    if tracer.capture_level:                                                                                            # events captured during the iteration
+        iteration_output['trace_events'] = tracer.get_events_data()
+    profiler.stop()
 
-        time_x_environment_data = \
-            time_x_environment_data = pd.concat([time_x_environment_data,
-                data_extractor.get_time_x_environment_data(agent_set=fleet,
-                                                           choice_set=choice_set,
-                                                           iteration_id=iteration_counter)]).reset_index(drop=True)     # Get Dataframe with data specific per unit of time and choice option/environmental subsection (e.g. real stock present, agents catch expectation of each option)
+    return iteration_output, profiler.phases
 
-        iteration_counter += 1                                                                                          # progress to the next iteration
 
+def initialize_model(config, random_streams, tracer):
+    """Initialize the choice set and the fleet of an iteration.
+
+    Parameters
+    ----------
+    config: Configuration
+        Configuration of the scenario.
+    random_streams: RandomStreams
+        Random streams of the iteration.
+    tracer: Tracer
+        Object reporting on the progress of the iteration.
+
+    Returns
+    -------
+    tuple
+        The ChoiceSet and the AgentFleet of the iteration.
+    """
 
     # ----------------------------------------------------------------------------------------------------------------------
-    # Export generated data in every scenario
+    # initialize the Environment (choice set), containing all discrete alternatives and the fleet, containing all agents
     # ----------------------------------------------------------------------------------------------------------------------
 
-    # ---- exit iteration loop ----
+    choice_set = ChoiceSet(                                                                                             # initialize the potential options/ environmental units in the model (e.g. the grid with cells to fish in), representing the environment agents operate in
+        nb_alternatives=config.choice_set_size,
+        stock_distribution=config.stock_reset_scenario,
+        init_stock=config.init_stock,
+        sd_init_stock=config.sd_init_stock,
+        growth_factor=config.growth_factor,
+        duration=config.duration, maximum_stock=config.max_stock, minimum_stock=config.min_stock,
+        trackers=config.option_trackers,
+        random_stream=random_streams['choice_set']
+        )
+
+    fleet = AgentFleet(engine=config.engine, random_streams=random_streams, tracer=tracer)                              # initialize the forager agents in the model (e.g. fishermen)
+    for agent in config.agents:
+        fleet.add(
+            nb_agents=agent.number_of_agents,
+            subfleet_name=agent.name,
+            choice_set=choice_set,
+            catchability_coefficient=agent.catchability_coefficient,
+            nb_alternatives_known=agent.init_number_of_alternatives_known,
+            explore_probability=agent.explore_probability,
+            duration_model=config.duration,
+            choice_method=agent.choice_method,
+            sharing_strategy=agent.sharing_strategy,
+            receiver_choice_strategy=config.pick_receiver_strategy,
+            receiving_strategy=agent.receiving_strategy,
+            number_of_shared_alternatives=agent.shared_alternatives,
+            number_of_agents_shared_with=agent.share_partners
+            )
+    fleet.finalize_setup(
+        number_of_sharing_groups=config.number_of_groups,
+        group_division_style=config.division_style,
+        group_dynamics=config.group_dynamics,
+        switch_probability=config.switch_probability,
+        duration_model=config.duration,
+        agent_ordering_strategy=config.agent_order,
+        synchronous_sharing=config.synchronous_sharing,
+        network_attributes=config.network_attributes,
+        trackers=config.agent_trackers
+        )
 
-    data_writer.write_csv(time_x_agent_data,
-                          os.path.join(output_subfolder, 'flat_time_x_agent_results'))                                  # write csv output file for data specific per unit of time and agent
-    data_writer.write_csv(time_x_environment_data,
-                          os.path.join(output_subfolder, 'flat_time_x_environment_results'))                            # write csv output file for data specific per unit of time and choice option/environmental subsection
+    return choice_set, fleet
 
-    # Enable Printing
-    print_blocker.enable_print()                                                                                        # enable printing to report on runtime and other prints that are always desired regardless of print blocking
 
-    # Progress to next scenario (implicit in code)
+def extract_output_data(config, choice_set, fleet, iteration_id):
+    """Extract the output data of an iteration from the choice set and fleet.
 
-    # ----------------------------------------------------------------------------------------------------------------------
-    # Runtime tracking and reporting
-    # ----------------------------------------------------------------------------------------------------------------------
+    Parameters
+    ----------
+    config: Configuration
+        Configuration of the scenario.
+    choice_set: ChoiceSet
+        Choice set of the iteration, after running the model.
+    fleet: AgentFleet
+        Fleet of the iteration, after running the model.
+    iteration_id: int
+        Number of the iteration.
+
+    Returns
+    -------
+    dict
+        Output data of the iteration (pandas.DataFrame) for every output file name, in the order they are written.
+    """
 
-    # ---- exit scenario loop ----
+    data_extractor = DataExtractor()                                                                                    # initialize the object with the functionality to extract output data from model objects
+    wide_layout = config.output_layout == 'wide'                                                                        # write data series with a value per agent in every choice option as a column per agent (wide) or in a separate file (long)
+    iteration_output = dict()
 
-    stop = timeit.default_timer()                                                                                           # stop run timer
-    execution_time = stop - start                                                                                           # calculate elapsed runtime (in seconds)
+    iteration_output['flat_time_x_agent_results'] = \
+        data_extractor.get_time_x_agent_data(agent_set=fleet, iteration_id=iteration_id)                                # Get Dataframe with data specific per unit of time and agent (e.g. actual catch obtained, competition encountered)
 
-    print("Model Runtime: \t{} seconds".format(str(execution_time)))                                                        # report runtime in seconds
+    iteration_output['flat_time_x_environment_results'] = \
+        data_extractor.get_time_x_environment_data(agent_set=fleet, choice_set=choice_set, iteration_id=iteration_id,
+                                                   agent_columns=wide_layout)                                           # Get Dataframe with data specific per unit of time and choice option/environmental subsection (e.g. real stock present, agents catch expectation of each option)
+
+    if not wide_layout:                                                                                                 # data with a value per agent in every choice option is written in long format to a separate file
+        iteration_output['flat_time_x_environment_x_agent_results'] = \
+            data_extractor.get_time_x_environment_x_agent_data(agent_set=fleet, choice_set=choice_set,
+                                                               iteration_id=iteration_id)                               # Get Dataframe with data specific per unit of time, choice option/environmental subsection and agent (e.g. agents catch expectation of each option)
+
+    return iteration_output
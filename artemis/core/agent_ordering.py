@@ -1,14 +1,15 @@
 """
 This Module is aimed at handling and executing how agents are ordered.
 """
-import random
+from artemis.core.random_streams import RandomStream
 
 class AgentOrderer:
 
-    def __init__(self, agent, strategy):
+    def __init__(self, agent, strategy, random_stream=None):
 
         self.agent_indices = agent.agent_index_list
         self.strategy = strategy
+        self.random_stream = RandomStream() if random_stream is None else random_stream
         self.functionality = self.__init_functionality()
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -36,7 +37,7 @@ class AgentOrderer:
 
     def __order_shuffle(self):
         ordered_agent_indices = self.agent_indices.copy()
-        random.shuffle(ordered_agent_indices)   
+        self.random_stream.shuffle(ordered_agent_indices)
         return ordered_agent_indices
 
 # ----------------------------------------------------------------------------------------------------------------------
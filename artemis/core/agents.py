@@ -27,54 +27,86 @@ Version Number:
 # TODO: Add prefix fleet or agent
 # TODO: Consider fleet.py & agents.py
 
-import random
-import copy
-from collections import defaultdict
 import numpy as np
-from artemis.core.choice_making import ChoiceMaker
-from artemis.core.sharing import HeatmapExchanger
+from artemis.core.choice_making import ChoiceMaker, FleetChoiceMaker
+from artemis.core.sharing import HeatmapExchanger, FleetHeatmapExchanger
 from artemis.core.agent_ordering import AgentOrderer
 from artemis.core.allegiances import GroupFormer
+from artemis.core.social_network import SocialNetwork
+from artemis.core.fleet_state import FleetState
+from artemis.core.expected_competition import ExpectedCompetition
+from artemis.core.trackers import TrackerStore
+from artemis.core.random_streams import RandomStreams
+from artemis.io.output.tracing import Tracer
 
 class AgentFleet:                                         # to be implemented, not yet included in the other scripts
     """Class to contain both the agents in ForagerAgent objects (or a more specified version of it)
     and global data on all agents in the model """
 
-    def __init__(self):
+    def __init__(self, engine='dict', random_streams=None, tracer=None):
+
+        if engine not in ('dict', 'array', 'vectorized'):
+            raise ValueError("engine can only be 'dict', 'array' or 'vectorized', "
+                             "engine is currently defined as {}".format(engine))
 
+        self.random_streams = RandomStreams() if random_streams is None else random_streams                             # RandomStreams object with a stream of random numbers for every component of the fleet
+        self.tracer = Tracer() if tracer is None else tracer                                                            # object reporting the events of the agents
+        self.engine = engine                                                                                            # storage of agent state: a heatmap dictionary per agent ('dict') or fleet wide arrays ('array'), with batched time step phases ('vectorized')
+        self.fleet_state = None                                                                                         # FleetState object containing all agent state as arrays, only used by the 'array' and 'vectorized' engines
+        self.fleet_choice_maker = FleetChoiceMaker() if engine == 'vectorized' else None                                # object making the choices of all agents at once, only used by the 'vectorized' engine
+        self.fleet_heatmap_exchanger = FleetHeatmapExchanger() if engine == 'vectorized' else None                      # object exchanging the heatmap data of all agents at once, only used by the 'vectorized' engine
         self.agents = dict()
         self.total_catch = 0                            # Tracker for total catch of all agents and time_steps combined
         self.total_time_step_catch_tracker = {}         # tracker for total catch each time_step
-        self.average_expected_competitor_tracker = defaultdict(dict)                                                    # tracker to contain the average expected amount of competitors expected when picking any cell
-        self.forage_visit_tracker = defaultdict(dict)                                                                   # tracker to contain where agents have been forager in what time
-        self.heatmap_expectation_tracker = defaultdict(dict)                                                            # tracker to contain what agents were expecting to find in the chosen location
-        self.uncorrected_catch_tracker = defaultdict(dict)                                                              # tracker to contain what would have been an agents catch in a chose location if no competitors would have been present
-        self.corrected_catch_tracker = defaultdict(dict)
-        self.realised_competition_tracker = defaultdict(dict)                                                           # tracker to contain the amount of competitors an agent has encountered in a given time step
-        self.heatmap_tracker = defaultdict(dict)
-        self.catch_potential_tracker = defaultdict(dict)
+        self.trackers = None                                                                                            # TrackerStore with an array (time step x agent) per tracker, made when finalized
+        self.agent_labels = []                                                                                          # label of every agent (e.g. 'agent_subfleet001_07'), agents are identified by their position in this list
+        self.changed_heatmaps = None                                                                                    # boolean mask over the agents (rows) whose heatmap has changed since the expected competition was last updated, None if the tracker is not recorded
+        self.expected_competition = None                                                                                # ExpectedCompetition object, made when the tracker is first updated
+        self.alternative_labels = []                                                                                    # labels of the choice options the agents choose from, choice options are identified by their index
         self.group_former = None
+        self.social_network = None                                                                                      # SocialNetwork object with the links between agents, only made if agents pick receivers with 'network_choice'
         self.agent_index_list = []
         self.agent_orderer = None
+        self.synchronous_sharing = False                                                                                # if True, all agents share from the heatmaps at the start of the sharing phase, in agent id order
         self._finalized = False                                                                                         # If AgentFleet is finalized, no more agents can be added.
 
     def finalize_setup(self,
                        number_of_sharing_groups=10,
                        group_division_style='equal_mutually_exclusive_groups',
                        group_dynamics=False,
+                       switch_probability=0.1,
                        duration_model=100,
-                       agent_ordering_strategy='shuffle'):
+                       agent_ordering_strategy='shuffle',
+                       synchronous_sharing=False,
+                       network_attributes=None,
+                       trackers=None):
         
         self.group_former = GroupFormer(self,
                                         number_of_groups=number_of_sharing_groups,
                                         division_style=group_division_style,
-                                        group_dynamics=group_dynamics)   
+                                        group_dynamics=group_dynamics,
+                                        switch_probability=switch_probability,
+                                        random_stream=self.random_streams['allegiances'])
+        if any(agent.pick_receiver_strategy == 'network_choice' for agent in self.agents.values()):
+            self.social_network = SocialNetwork(self,
+                                                random_stream=self.random_streams['social_network'],
+                                                **(network_attributes or {}))
+        time_ids = [str(time_step).zfill(len(str(duration_model))) for time_step in range(duration_model)]              # same time step ids as in run_model
+        if self.fleet_state is not None:
+            self.fleet_state.finalize(time_ids=time_ids)
         self.__init_group_allegiances()
         self.__init_time_data_trackers(duration_model=duration_model)
+        self.__init_tracker_store(time_ids=time_ids, trackers=trackers)
+        self.__init_changed_heatmaps()
         self.__init_potential_receivers()
+        if self.fleet_heatmap_exchanger is not None:
+            self.fleet_heatmap_exchanger.prepare(self)
         self.agent_index_list = list(self.agents.keys())
+        self.synchronous_sharing = synchronous_sharing
+        self.tracer.set_labels(agent_labels=self.agent_labels, alternative_labels=self.alternative_labels)              # events report labels instead of indices
         self.agent_orderer = AgentOrderer(agent=self,
-                                          strategy=agent_ordering_strategy)
+                                          strategy=agent_ordering_strategy,
+                                          random_stream=self.random_streams['agent_ordering'])
         self._finalized = True
 
 
@@ -96,7 +128,13 @@ class AgentFleet:                                         # to be implemented, n
 
         if self._finalized:
             raise ValueError('AgentFleet already finalized; cannot add more agents.')
-        
+
+        if not self.alternative_labels:
+            self.alternative_labels = list(choice_set.alternative_labels)
+
+        if self.engine in ('array', 'vectorized') and self.fleet_state is None:
+            self.fleet_state = FleetState(alternative_ids=choice_set.discrete_alternatives.keys())                      # columns of the fleet wide arrays are the choice options of the ChoiceSet
+
         add_agents = self.__init_agents(
                                nb_agents=nb_agents,
                                subfleet_name=subfleet_name,
@@ -132,7 +170,9 @@ class AgentFleet:                                         # to be implemented, n
         agent_dictionary = dict()
         agent_tracker = 0                                                                                               # make counter for following while loop functioning
         while agent_tracker < nb_agents:
-            agent_id = 'agent_' + str(subfleet_name) + '_' + str(agent_tracker).zfill(len(str(nb_agents)))                                         # construct agent ID
+            agent_id = len(self.agent_labels)                                                                           # agents are identified by their position in the fleet
+            agent_label = 'agent_' + str(subfleet_name) + '_' + str(agent_tracker).zfill(len(str(nb_agents)))           # construct agent label, only used in the output data
+            self.agent_labels.append(agent_label)
             agent_dictionary[agent_id] = ForagerAgent(choice_set=choice_set,
                                                       choice_method=choice_method,
                                                       agent_id=agent_id,
@@ -143,7 +183,10 @@ class AgentFleet:                                         # to be implemented, n
                                                       pick_receiver_strategy=receiver_choice_strategy,
                                                       receiving_strategy=receiving_strategy,
                                                       number_of_shared_alternatives=number_of_shared_alternatives,
-                                                      number_of_agents_shared_with=number_of_agents_shared_with)        # initialise a ForagerAgent and set up the necessary functioning of attribute ChoiceMaker
+                                                      number_of_agents_shared_with=number_of_agents_shared_with,
+                                                      fleet_state=self.fleet_state,
+                                                      random_streams=self.random_streams,
+                                                      tracer=self.tracer)                                               # initialise a ForagerAgent and set up the necessary functioning of attribute ChoiceMaker
 
             agent_tracker += 1                                                                                          # proceed to next agent
 
@@ -162,6 +205,42 @@ class AgentFleet:                                         # to be implemented, n
                 # proceed to next agent
             duration_counter += 1
 
+    def __init_tracker_store(self, time_ids, trackers=None):
+        """preallocate an array for every tracker that is recorded (all if trackers is None),
+        with a row for every agent in every time step"""
+        nb_agents = len(self.agents)                                                                                    # the row of every agent is its id, as in the FleetState
+        nb_alternatives = len(self.alternative_labels)
+
+        tracker_definitions = {                                                                                         # shape of a single time step, data type and initial value of every tracker
+            'average_expected_competitors': ((nb_agents,), np.float64, 0),                                              # average amount of competitors expected when picking any choice option
+            'knowledge_in_heatmap': ((nb_agents,), np.int64, 0),                                                        # number of choice options an agent knows of at the start of a time step
+            'forage_visit': ((nb_agents,), np.int64, -1),                                                               # index of the choice option agents have foraged in
+            'heatmap_expectation': ((nb_agents,), np.float64, 0),                                                       # what agents were expecting to find in the chosen choice option
+            'realised_competition': ((nb_agents,), np.int64, 0),                                                        # amount of competitors an agent has encountered
+            'uncorrected_catch': ((nb_agents,), np.float64, 0),                                                         # what would have been an agents catch if no competitors would have been present
+            'corrected_catch': ((nb_agents,), np.float64, 0),                                                           # catch of an agent, corrected for competition
+            'heatmap': ((nb_agents, nb_alternatives), np.float64, 0),                                                   # heatmap of every agent at the start of a time step
+            'group_allegiance': ((nb_agents,), np.int64, -1)                                                            # group of every agent during a time step, as index in the group names of the GroupFormer
+        }
+        if trackers is None:
+            trackers = list(tracker_definitions)
+        elif not set(trackers) <= set(tracker_definitions):
+            raise ValueError('agent trackers {} are not supported, supported trackers are: {}'
+                             .format(sorted(set(trackers) - set(tracker_definitions)), list(tracker_definitions)))
+        trackers = set(trackers) | {'group_allegiance'}                                                                 # every output row reports the group of the agent in the time step
+
+        self.trackers = TrackerStore(time_ids=time_ids)
+        for name, (shape, dtype, fill_value) in tracker_definitions.items():
+            if name in trackers:
+                self.trackers.add_tracker(name, shape=shape, dtype=dtype, fill_value=fill_value)
+
+    def __init_changed_heatmaps(self):
+        """give the fleet and every agent the mask of changed heatmaps, only if the expected competitors are recorded"""
+        if 'average_expected_competitors' in self.trackers:
+            self.changed_heatmaps = np.zeros(len(self.agents), dtype=bool)
+        for agent in self.agents.values():
+            agent.changed_heatmaps = self.changed_heatmaps
+
     def __init_group_allegiances(self):
         """initialize groups of agents"""                                                    # set up for later use of group based sharing, not yet implemented properly
 
@@ -185,6 +264,54 @@ class AgentFleet:                                         # to be implemented, n
         """Reorders agent indices in self.agent_index_list."""
         self.agent_index_list = self.agent_orderer.run_ordering()
 
+    def make_choices(self, rng=None):
+        """lets all agents choose a choice option at once (only for the 'vectorized' engine),
+        returns an array with the chosen choice option (column) of every agent (row) in the FleetState.
+        Random numbers are drawn from the numpy Generator rng, by default that of the choice making stream"""
+        if rng is None:
+            rng = self.random_streams['choice_making'].generator
+        chosen_columns = self.fleet_choice_maker.choose_all(self.fleet_state, rng)
+        for agent_id, column in zip(self.fleet_state.agent_ids, chosen_columns.tolist()):                               # the columns of the FleetState are the choice option indices
+            self.agents[agent_id].register_choice(column)                                                               # let the agent remember its choice, as ForagerAgent.make_choice would
+            if self.tracer.traces_agents:
+                self.tracer.event('agent', 'choice', '{agent_id} has chosen {alternative_id} to forage in',
+                                  agent_id=agent_id, alternative_id=column)
+        return chosen_columns
+
+    def exchange_heatmaps(self, chosen_alternatives, rng=None):
+        """lets all agents share heatmap data with their receivers at once (only for the 'vectorized' engine),
+        given the chosen choice option (column) of every agent (row) in the FleetState.
+        Random numbers are drawn from the numpy Generator rng, by default that of the sharing stream"""
+        if rng is None:
+            rng = self.random_streams['sharing'].generator
+        sender_order = list(self.agents) if self.synchronous_sharing else self.agent_index_list                         # agent id order, so the result does not depend on the order of the agents
+        self.fleet_heatmap_exchanger.exchange_all(self, sender_order, chosen_alternatives, rng)
+
+    def exchange_heatmaps_synchronously(self):
+        """lets all agents share heatmap data with their receivers from a snapshot of the heatmaps at the start of the
+        sharing phase ('dict' and 'array' engines). Shared data is written to a buffer that is merged after all agents
+        shared, so data received in a time step is only passed on in the next time step. Agents share and the buffer is
+        merged in agent id order, so the result does not depend on the order of the agents"""
+        write_buffer = []                                                                                               # (receiver id, shared data) of every exchange, heatmaps are only read until it is merged
+        for agent_id in self.agents:
+            self.agents[agent_id].heatmap_exchanger.provide_data(self, write_buffer=write_buffer)
+        for receiver_id, shared_data in write_buffer:
+            self.agents[receiver_id].heatmap_exchanger.receive_data(shared_data)
+
+    def update_group_allegiances(self, time_id):
+        """lets agents switch groups based on the catch of every agent in the time step, if groups are dynamic"""
+        if self.group_former.dynamics is None:
+            return
+        if self.fleet_state is not None:
+            catches = self.fleet_state.time_step_catch[:, self.fleet_state.time_index[time_id]]
+        else:
+            catches = [agent.time_step_catch[time_id] for agent in self.agents.values()]
+        for agent_id, group in self.group_former.run_dynamics(catches):
+            self.agents[agent_id].group_allegiance = group
+            if self.tracer.traces_agents:
+                self.tracer.event('agent', 'group_switch', '{agent_id} has switched to {group}',
+                                  agent_id=agent_id, group=group)
+
     def update_agent_trackers(self, agent_id, catch, alternative_index, time_tracker):
         """" updates the data contained in a single ForagerAgent
         as well as the more general agent trackers in AgentSet"""
@@ -195,6 +322,25 @@ class AgentFleet:                                         # to be implemented, n
         self.__update_total_catch(catch)             # Cumulative catch over all agents and time steps in the whole simulation
         self.__update_total_time_step_catch(catch, time_tracker)                                                        # Cumulative catch over all agents per time step
 
+    def update_agent_trackers_all(self, chosen_alternatives, catches, time_id):
+        """'vectorized' engine version of update_agent_trackers, updates the trackers of all agents at once
+        given the chosen choice option (column) and catch of every agent (row) in the FleetState"""
+        fleet_state = self.fleet_state
+        rows = np.arange(fleet_state.nb_agents)
+        for row in np.flatnonzero(~fleet_state.known[rows, chosen_alternatives]).tolist():                              # only the agents that foraged in a choice option they had no knowledge on
+            self.agents[fleet_state.agent_ids[row]].known_alternatives.add(chosen_alternatives[row].item())             # also marks the choice option as known in the FleetState
+        fleet_state.heatmap[rows, chosen_alternatives] = catches                                                        # overwrite the heatmap entries with the last catch events
+        fleet_state.forage_effort[rows, chosen_alternatives] += 1                                                       # every row occurs once, so no unbuffered (np.add.at) addition is needed
+        fleet_state.forage_catch[rows, chosen_alternatives] += catches
+        fleet_state.total_catch += catches
+        if self.changed_heatmaps is not None:
+            self.changed_heatmaps[:] = True                                                                             # every agent has overwritten a heatmap entry with its catch
+        fleet_state.time_step_catch[:, fleet_state.time_index[time_id]] += catches
+
+        time_step_catch = catches.sum().item()
+        self.__update_total_catch(time_step_catch)
+        self.__update_total_time_step_catch(time_step_catch, time_id)
+
     def __update_total_catch(self, catch):
         """updates the total catch by the given amount from a single catch event for all agents"""
         self.total_catch += catch
@@ -209,57 +355,128 @@ class AgentFleet:                                         # to be implemented, n
         self.total_time_step_catch_tracker[str(time_tracker)] += catch
 
     def update_memory_trackers(self, time_id):
-        """ update the memory of each agent: TODO maar welke trackers zijn dat?  """
-        for agent in self.agents:
-            self.agents[agent].update_memory_trackers(time_id)
-
-    def update_average_expected_competitor_tracker(self, time_id):
-        """calculating the average number of competitors expected in a given time step for every agent"""
-
-        number_of_options = len(self.agents[next(iter(self.agents))].heatmap)                                           # get total number of options(e.g. the amount of grid cells an agent can choose from) as the number of entries in the first agents heatmap
-        keys_options = list(self.agents[next(iter(self.agents))].heatmap.keys())
-        number_of_agents = len(self.agents)
-        keys_agents = list(self.agents.keys())
-        prob_matrix = np.zeros((number_of_agents, number_of_options))
-        
-        for i, agent in enumerate(keys_agents):                                                                         # Loop over Agents (1) to transform an agent heatmap into a probability map --> what is the chance an agent will i each option
-            agent_data = self.agents[agent]
-            prob_matrix[i, :] = np.array([agent_data.heatmap[key] for key in keys_options])                             # create copy of heatmap and put in 2D numpy array for fast calculation
-            prob_matrix[i, :] /= np.sum(prob_matrix[i, :])                                                              # divide heatmap entries by sum of entries to gain proportional weights as probability of choosing an option
-            prob_matrix[i, :] *= (1 - agent_data.explore_probability)                                                   # correct for the fact that probability of choosing an option based on the heatmap is not 100%
-            prob_matrix[i, :] += agent_data.explore_probability/number_of_options                                       # add the chance of choosing the option at random through exploration
+        """records the number of choice options every agent has knowledge on"""
+        self.trackers['knowledge_in_heatmap'][self.trackers.time_step(time_id)] = \
+            [len(agent.known_alternatives) for agent in self.agents.values()]
 
-        encounter_matrix = np.matmul(prob_matrix, prob_matrix.T)                                                        # calculate chances of agents meeting eachother
-        np.fill_diagonal(encounter_matrix, 0)                                                                           # disregard the chance of meeting oneself
-        competitor_tracker = np.sum(encounter_matrix, axis=1) / number_of_options                                       # sum over target agents and divide cumulative tracker by number of options
+    def update_group_allegiance_tracker(self, time_id):
+        """records the group every agent is in at the start of a time step"""
+        self.trackers['group_allegiance'][self.trackers.time_step(time_id)] = \
+            self.group_former.relevant_data['group_of_agent']
 
-        for i, agent in enumerate(keys_agents):
-            self.average_expected_competitor_tracker[time_id][agent] = competitor_tracker[i]
+    def update_average_expected_competitor_tracker(self, time_id):
+        """calculating the average number of competitors expected in a given time step for every agent,
+        only the choice probabilities of agents whose heatmap has changed since the last update are recomputed"""
+        if self.expected_competition is None:
+            if self.fleet_state is not None:
+                explore_probability = self.fleet_state.explore_probability
+            else:
+                explore_probability = [agent.explore_probability for agent in self.agents.values()]
+            self.expected_competition = ExpectedCompetition(explore_probability)
+
+        rows = np.flatnonzero(self.changed_heatmaps)                                                                    # the row of every agent is its id
+        if self.expected_competition.needs_full_update(len(rows)):
+            self.expected_competition.update_all(self.heatmap_matrix())
+        elif len(rows):
+            self.expected_competition.update_rows(rows, self.heatmap_matrix(rows))
+        self.changed_heatmaps[:] = False
+
+        self.trackers['average_expected_competitors'][self.trackers.time_step(time_id)] = \
+            self.expected_competition.average_expected_competitors()
+
+    def heatmap_matrix(self, rows=None):
+        """returns the heatmaps of all agents (or of the agents in the given rows) as a 2D array, with a row for every
+        agent in the order of the fleet and a column for every choice option in choice set order"""
+        if self.fleet_state is not None:                                                                                # the 'array' and 'vectorized' engines already have all heatmaps in a single 2D array
+            return self.fleet_state.heatmap if rows is None else self.fleet_state.heatmap[rows]
+        agents = list(self.agents.values())
+        if rows is not None:
+            agents = [agents[row] for row in rows]
+        return np.array([list(agent.heatmap.values()) for agent in agents], dtype=np.float64)                           # heatmap entries are in choice set order
 
     def update_forage_visit_tracker(self, time_id, agent_id, chosen_alternative):
-        self.forage_visit_tracker[time_id][agent_id] = chosen_alternative
+        self.trackers['forage_visit'][self.trackers.time_step(time_id), agent_id] = chosen_alternative
 
     def update_heatmap_expectation_tracker(self, time_id, agent_id, expected_catch):                                    # what was an agent expecting to catch when going somewhere
-        self.heatmap_expectation_tracker[time_id][agent_id] = expected_catch
+        self.trackers['heatmap_expectation'][self.trackers.time_step(time_id), agent_id] = expected_catch
 
     def update_realised_competition_tracker(self, time_id, agent_id, realised_competition):
-        self.realised_competition_tracker[time_id][agent_id] = realised_competition
+        self.trackers['realised_competition'][self.trackers.time_step(time_id), agent_id] = realised_competition
 
     def update_uncorrected_catch_tracker(self, time_id, agent_id, uncorrected_catch):
-        self.uncorrected_catch_tracker[time_id][agent_id] = uncorrected_catch
+        self.trackers['uncorrected_catch'][self.trackers.time_step(time_id), agent_id] = uncorrected_catch
 
     def update_corrected_catch_tracker(self, time_id, agent_id, corrected_catch):
-        self.corrected_catch_tracker[time_id][agent_id] = corrected_catch
+        self.trackers['corrected_catch'][self.trackers.time_step(time_id), agent_id] = corrected_catch
+
+    def update_choice_trackers_all(self, time_id, chosen_alternatives):
+        """'vectorized' engine version of the forage visit and heatmap expectation trackers,
+        given the chosen choice option (column) of every agent (row) in the FleetState"""
+        time_step = self.trackers.time_step(time_id)
+        if 'forage_visit' in self.trackers:
+            self.trackers['forage_visit'][time_step] = chosen_alternatives
+        if 'heatmap_expectation' in self.trackers:
+            self.trackers['heatmap_expectation'][time_step] = \
+                self.fleet_state.heatmap[np.arange(self.fleet_state.nb_agents), chosen_alternatives]
+
+    def update_catch_trackers_all(self, time_id, uncorrected_catch, corrected_catch, realised_competition):
+        """'vectorized' engine version of the uncorrected catch, corrected catch and realised competition trackers,
+        given arrays with a value for every agent (row) in the FleetState, trackers that are not recorded are skipped"""
+        time_step = self.trackers.time_step(time_id)
+        for name, values in (('uncorrected_catch', uncorrected_catch),
+                             ('corrected_catch', corrected_catch),
+                             ('realised_competition', realised_competition)):
+            if name in self.trackers:
+                self.trackers[name][time_step] = values                                                                 # FleetState rows follow the order of the agents in the fleet, as the tracker rows
+
+    def update_heatmap_tracker(self, time_id):
+        """records the heatmap of every agent"""
+        time_step = self.trackers.time_step(time_id)
+        self.trackers['heatmap'][time_step] = self.heatmap_matrix()                                                     # rows follow the order of the agents in the fleet, as the tracker rows
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------------ the KnownAlternatives of a ForagerAgent -----------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+
+class KnownAlternatives:
+    """Class to contain the choice options an agent has knowledge on, as an ordered set: choice options are kept in the
+    order they became known, with constant time checks, additions and picks by position (e.g. random picks).
+    If the agent has a FleetState row, its known mask is kept up to date as well"""
 
-    def update_heatmap_tracker(self, time_id, agent_id):
-        self.heatmap_tracker[time_id][agent_id] = copy.deepcopy(self.agents[agent_id].heatmap)
+    __slots__ = ('alternatives', 'alternative_set', 'fleet_state', 'agent_index')
 
-    def update_catch_potential_tracker(self, time_id, agent_id, choice_set):
-        self.catch_potential_tracker[time_id][agent_id] = {}
-        for alternative_id in choice_set.discrete_alternatives:
-            self.catch_potential_tracker[time_id][agent_id][alternative_id] = \
-                copy.deepcopy(choice_set.discrete_alternatives[alternative_id].resource_stock)\
-                * self.agents[agent_id].catchability_coefficient
+    def __init__(self, alternatives=(), fleet_state=None, agent_index=None):
+        self.alternatives = []                                                                                          # choice options in the order they became known
+        self.alternative_set = set()                                                                                    # the same choice options, for constant time checks
+        self.fleet_state = fleet_state
+        self.agent_index = agent_index
+        for alternative in alternatives:
+            self.add(alternative)
+
+    def add(self, alternative):
+        """adds a choice option if it was not known yet, returns True if it is newly known"""
+        if alternative in self.alternative_set:
+            return False
+        self.alternative_set.add(alternative)
+        self.alternatives.append(alternative)
+        if self.fleet_state is not None:
+            self.fleet_state.known[self.agent_index, self.fleet_state.alternative_index[alternative]] = True
+        return True
+
+    def __contains__(self, alternative):
+        return alternative in self.alternative_set
+
+    def __getitem__(self, position):
+        return self.alternatives[position]
+
+    def __iter__(self):
+        return iter(self.alternatives)
+
+    def __len__(self):
+        return len(self.alternatives)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, self.alternatives)
 
 # ----------------------------------------------------------------------------------------------------------------------
 # ---------------------------------------------- the ForagerAgent object -----------------------------------------------
@@ -269,17 +486,32 @@ class ForagerAgent:
     """general class to agents that may forage from a resource and their attributes"""
     def __init__(self, choice_set, choice_method, agent_id=None,
                  catchability_coefficient=0, nb_of_alternatives_known=1, explore_probability=0,
-                 other_agent_indices=tuple(),
                  sharing_strategy='random_sharing', pick_receiver_strategy='random_pick',
                  receiving_strategy='combine_receiver',
-                 number_of_shared_alternatives=1, number_of_agents_shared_with=1):
+                 number_of_shared_alternatives=1, number_of_agents_shared_with=1,
+                 fleet_state=None, changed_heatmaps=None, random_streams=None, tracer=None):
         """initialize agents """
+        if random_streams is None:
+            random_streams = RandomStreams()
+        self.random_stream = random_streams['agents']                                                                   # stream of random numbers for the initial knowledge and the shared data of the agent
+        # Memory attributes
+        self.fleet_state = fleet_state                                                                                  # FleetState object containing the heatmap and trackers of this agent as a row, None if the agent keeps its own
+        if fleet_state is not None:
+            self.agent_index = fleet_state.add_agent(agent_id=agent_id,
+                                                     catchability_coefficient=catchability_coefficient,
+                                                     explore_probability=explore_probability,
+                                                     choice_method=choice_method)                                       # row of this agent in the FleetState arrays
+
         # Tracker variables
-        self.total_catch = 0                                                                                            # tracker variable to track total catch for this agent
-        self.forage_catch_tracker = {}                                                                                  # tracker variable for total catch gained from each alternative
-        self.forage_effort_tracker = {}                                                                                 # tracker variable for total location visits on each alternative (visits per alternative, cumulative for all time_steps)
-        self.time_step_catch = {}                                                                                       # tracker variable to check time_step fluctuations in catch
-        self.knowledge_evolution_tracker = defaultdict(dict)                                                            # tracker to identify how the memory of an agent changes over time
+        if fleet_state is None:
+            self._total_catch = 0                                                                                       # tracker variable to track total catch for this agent, see the total_catch property
+            self.forage_catch_tracker = {}                                                                              # tracker variable for total catch gained from each alternative
+            self.forage_effort_tracker = {}                                                                             # tracker variable for total location visits on each alternative (visits per alternative, cumulative for all time_steps)
+            self.time_step_catch = {}                                                                                   # tracker variable to check time_step fluctuations in catch
+        else:                                                                                                           # dictionary-like views on the FleetState rows, with the same behaviour as the dictionaries
+            self.forage_catch_tracker = fleet_state.alternative_view('forage_catch', self.agent_index)
+            self.forage_effort_tracker = fleet_state.alternative_view('forage_effort', self.agent_index)
+            self.time_step_catch = fleet_state.time_view('time_step_catch', self.agent_index)
         self.group_allegiance = None                                                                                    # for later functionality in group sharing
         self.pick_receiver_strategy = pick_receiver_strategy
 
@@ -289,17 +521,25 @@ class ForagerAgent:
         self.explore_probability = explore_probability                                                                  # chance an agent chooses a random alternative (when allowed)
 
         # Memory attributes
-        self.heatmap = {}                                                                                               # agents memory on the last forage event in each alternative
-        self.list_of_known_alternatives = \
-            self.__initialize_list_of_knowns(choice_set=choice_set,
-                                            nb_of_alternatives_known=nb_of_alternatives_known)                          # list of alternatives that an agent has information on
+        if fleet_state is None:
+            self.agent_index = None
+            self.heatmap = {}                                                                                           # agents memory on the last forage event in each alternative
+        else:
+            self.heatmap = fleet_state.heatmap_view(self.agent_index)                                                   # dictionary-like view on the FleetState row, with the same behaviour as the dictionary heatmap
+        self.changed_heatmaps = changed_heatmaps                                                                        # mask of the fleet in which the agent marks its row when its heatmap changes, None if not tracked
+        self.known_alternatives = \
+            KnownAlternatives(self.__initialize_list_of_knowns(choice_set=choice_set,
+                                                               nb_of_alternatives_known=nb_of_alternatives_known),
+                              fleet_state=fleet_state, agent_index=self.agent_index)                                    # choice options that an agent has information on
 
         self.__initialize_fill_heatmap(choice_set=choice_set)                                                           # initialise the heatmap
 
         # Decision Making attribute (separate object)
         self.choice_maker = ChoiceMaker(choice_set=choice_set,                                                          # object that identifies/loads the relevant data from ForagerAgents and can make foraging decisions for ForagerAgents based on that data
                                         choice_method=choice_method,
-                                        agent=self)
+                                        agent=self,
+                                        random_stream=random_streams['choice_making'],
+                                        tracer=tracer)
 
         # Heatmap Data Exchanger Attribute (separate object)
         # TODO: While all functionality has been programmed, it has not yet been implemented in run_model
@@ -308,9 +548,25 @@ class ForagerAgent:
                                                   pick_receiver_strategy=pick_receiver_strategy,
                                                   receiving_strategy=receiving_strategy,
                                                   number_of_shared_alternatives=number_of_shared_alternatives,
-                                                  number_of_agents_shared_with=number_of_agents_shared_with
+                                                  number_of_agents_shared_with=number_of_agents_shared_with,
+                                                  random_stream=random_streams['sharing'],
+                                                  tracer=tracer
                                                   )
 
+    @property
+    def total_catch(self):
+        """total catch of this agent, stored in the FleetState if the agent has a row there"""
+        if self.fleet_state is None:
+            return self._total_catch
+        return self.fleet_state.total_catch[self.agent_index].item()
+
+    @total_catch.setter
+    def total_catch(self, value):
+        if self.fleet_state is None:
+            self._total_catch = value
+        else:
+            self.fleet_state.total_catch[self.agent_index] = value
+
 # ----------------------------------------------------------------------------------------------------------------------
 # --------------------------- Method to initialize agents before running the main model --------------------------------
 # ----------------------------------------------------------------------------------------------------------------------
@@ -319,12 +575,11 @@ class ForagerAgent:
         to initialise the ForagerAgent memory and data trackers with"""
         alternative_indices = []
         alternative_tracker = 0
-        while alternative_tracker < choice_set_length:
-            alternative_id = "alternative_" + str(alternative_tracker).zfill(len(str(choice_set_length)))               # add 0s before the index number until it has a length of four digits
-            self.forage_catch_tracker[alternative_id] = 0                                                               # load index in map with previous yield per alternative
-            self.forage_effort_tracker[alternative_id] = 0                                                              # load index in map with previous effort per alternative
-            self.heatmap[alternative_id] = 0                                                                            # load index in map with expectations per alternative
-            alternative_indices.append(alternative_id)                                                                  # construct list of indeces list for later (external) use
+        while alternative_tracker < choice_set_length:                                                                  # choice options are identified by their index in the choice set
+            self.forage_catch_tracker[alternative_tracker] = 0                                                          # load index in map with previous yield per alternative
+            self.forage_effort_tracker[alternative_tracker] = 0                                                         # load index in map with previous effort per alternative
+            self.heatmap[alternative_tracker] = 0.0                                                                     # load index in map with expectations per alternative
+            alternative_indices.append(alternative_tracker)                                                             # construct list of indeces list for later (external) use
             alternative_tracker += 1                                                                                    # proceed to the next alternative
 
         return alternative_indices                                                                                      # return list of all choice options in the model
@@ -339,7 +594,7 @@ class ForagerAgent:
         i = 0                                                                                                           # counter to track loop with
         while i < nb_of_alternatives_known:                                                                             # loop to generate all knowns choice options
             # choose a random alternatives that the agent will know
-            new_known = random.choice(alternative_indices)                                                              # choose a random
+            new_known = self.random_stream.choice(alternative_indices)                                                  # choose a random
             if new_known not in list_of_knowns:                                                                         # check if the option is not already in the list of knowns to ensure each agents gets to know 4 options
                 list_of_knowns.append(new_known)                                                                        # attach the new known to the list of knowns
                 i += 1                                                                                                  # proceed to generate the next known choice option, only happens if the random generated known is really attached
@@ -348,7 +603,7 @@ class ForagerAgent:
 
     def __initialize_fill_heatmap(self, choice_set):
         """use the list of known choice options to fill the expected catches in the memory of the agent"""
-        for known_cell in self.list_of_known_alternatives:
+        for known_cell in self.known_alternatives:
             self.heatmap[known_cell] = \
                 choice_set.discrete_alternatives[known_cell].resource_stock * self.catchability_coefficient
 
@@ -360,9 +615,12 @@ class ForagerAgent:
         """Uses the ChoiceMaker object from choice_making.py to choose a forage choice option
         and gets the actual catch from the choice options"""
         choice_alternative = self.choice_maker.make_choice()                                                            # prompt the ChoiceMaker to choose a choice option and retrun the ID of the chosen choice options
-        self.__update_list_of_knowns()
         return choice_alternative                                                                                       # return the chosen choice option
 
+    def register_choice(self, choice_alternative):
+        """registers a choice made for this agent outside of its ChoiceMaker (e.g. by a FleetChoiceMaker)"""
+        self.choice_maker.last_choice_id = choice_alternative
+
 # ----------------------------------------------------------------------------------------------------------------------
 # ------------------------------- Methods to update internal parameters and trackers -----------------------------------
 # ----------------------------------------------------------------------------------------------------------------------
@@ -378,6 +636,14 @@ class ForagerAgent:
     def __update_heatmap(self, alternative_index, catch):
         """overwrites a heatmap choice option entry using the last catch event of the agent"""
         self.heatmap[alternative_index] = catch
+        self.known_alternatives.add(alternative_index)
+        self.mark_heatmap_changed(alternative_index)
+
+    def mark_heatmap_changed(self, alternative_id):
+        """lets the ChoiceMaker and the fleet know the heatmap entry of the given choice option has changed"""
+        self.choice_maker.update_heatmap_entry(alternative_id)
+        if self.changed_heatmaps is not None:
+            self.changed_heatmaps[self.id] = True
 
     def __update_forage_catch_tracker(self, alternative_index, catch):
         """adds the last catch event of the agent to the choice option total catch gained by the agent considered"""
@@ -401,29 +667,6 @@ class ForagerAgent:
                          time_step_counter))
         self.time_step_catch[time_step_counter] += catch
 
-    def __update_list_of_knowns(self):  # Quick and dirty way of finding all knowns instead of only adding new ones
-        """"make sure the list of knowns is up to date by checking if all choice option indices
-        with an entry in the heatmap are also in the list_of_knowns"""
-        for alternative in self.heatmap:  # unknowns are alternatives with an integer (0) as catch estimate, not a float
-            if isinstance(self.heatmap[alternative], float):
-                if alternative not in self.list_of_known_alternatives:
-                    self.list_of_known_alternatives.append(alternative)
-
-    def update_memory_trackers(self, time_id):
-        """currently ERRORS""" #TODO CURRENTLY does not work properly (all knowns for agent x are always an age of x)
-        for known in self.list_of_known_alternatives:
-
-            try:
-                time_of_origin = self.knowledge_evolution_tracker[time_id][known]
-            except KeyError:
-                time_of_origin = -1
-
-            temp_data = {
-                        'time_of_origin': time_of_origin
-                        }                                                                                               # empty entry for now, can contain such data as age_of_knowledge or discount factor of knowledge (age specific corrections in expectations)
-            temp_data['age_of_knowledge'] = int(time_id) - 1 - temp_data['time_of_origin']
-            self.knowledge_evolution_tracker[time_id][known] = temp_data
-
 # ----------------------------------------------------------------------------------------------------------------------
 # --------------------------- Methods for information sharing scenarios ------------------------------------------------
 # ----------------------------------------------------------------------------------------------------------------------
@@ -432,21 +675,20 @@ class ForagerAgent:
         """method that returns a given number of alternatives the ForagerAgent has knowledge on
         to be shared with other ForagerAgents"""
         # print("<{}> is now starting to share data".format(self.id))
-        self.__update_list_of_knowns()                                                                                  # make sure the list of known alternatives is up to date
         shared_alternatives_indices = []                                                                                # empty list for later attchment of choice option indices to be shared
         shared_alternatives_data = []                                                                                   # empty list for later attchment of choice option contens to be shared
         if not isinstance(number_of_alternatives, int) and number_of_alternatives != 'ALL':                             # check if number of choice options to be shared is an integer or all
             raise TypeError("number can only be an integer or ALL")
 
         elif number_of_alternatives == 'ALL':                                                                           # share all data
-            shared_alternatives_indices = self.list_of_known_alternatives                                               # to be shared indices are all indices memory has an entry on
+            shared_alternatives_indices = list(self.known_alternatives)                                                 # to be shared indices are all indices memory has an entry on
             for alternative in shared_alternatives_indices:
                 shared_alternatives_data.append(self.heatmap[alternative])                                              # attach all contents of the known choice options 1 by 1 to an empty list
 
         else:
             alternative_counter = 0
             while alternative_counter < number_of_alternatives:
-                shared_alternative = random.choice(self.list_of_known_alternatives)                                     # pick a random choice option index the agents memory has an entry on
+                shared_alternative = self.random_stream.choice(self.known_alternatives)                                 # pick a random choice option index the agents memory has an entry on
                 if shared_alternative not in shared_alternatives_indices:                                               # check if we are not already sharing this choice option
                     shared_alternatives_indices.append(shared_alternative)                                              # attach the choice option index from the randomly chosen entry
                     shared_alternatives_data.append(self.heatmap[shared_alternative])                                   # attach the choice option contents from the randmloy chosen entry
@@ -464,17 +706,17 @@ class ForagerAgent:
             received_index = received_alternative_indices[received_counter]                                             # get index of a single shared choice option
             received_data = received_alternative_data[received_counter]                                                 # get contents of a single shared choice option
             # add knowledge if the alternative is unknown
-            if isinstance(self.heatmap[received_index], int):                                                           # check if the receiving agent already has an entry for that choice: NO
+            if self.known_alternatives.add(received_index):                                                             # check if the receiving agent already has an entry for that choice: NO
                 self.heatmap[received_index] = received_data                                                            # fill the empty choice option entry with the received data
+                self.mark_heatmap_changed(received_index)
 
             # When the receiving agent already has knowledge on the shared knowledge, take the average of both
-            elif isinstance(self.heatmap[received_index], float):                                                       # check if the receiving agent already has an entry for that choice: YES
+            else:                                                                                                       # the receiving agent already has an entry for that choice
                 self.heatmap[received_index] = (received_data + self.heatmap[received_index])/2                         # take average of newly shared data and the information already known from other data
+                self.mark_heatmap_changed(received_index)
 
             received_counter += 1                                                                                       # proceed to next shared choice option
 
-
-        self.__update_list_of_knowns()                                                                                  # update list of known choice options
         # TODO: Functionality for Knowledge degradation
 
 
@@ -2,31 +2,47 @@
 This Module is used to handle group formation in agent sharing mechanisms and the class GroupFormer()
 is meant as attribute of the AgentSet object in agents.py
 
+Besides the overview of the agents per group, the members of every group are kept in a block of a single array, so
+agents that pick a receiver in their group can do so for all agents at once, and agents can move to another group in
+O(1) time: the agent is replaced by the last member of its old group and added at the end of its new group. A group
+that is full is moved to the end of the array with double the capacity
+
+With group dynamics, agents may switch groups based on the payoff of their group:
+-   payoff_switching    every time step, every agent compares the average catch of the members of its own group with
+                        that of a random other group with probability switch_probability, and moves to the other group
+                        if its members caught more on average
+
 Module inputs:
 -   parameters from init_param.py
+-   the catch of every agent in a time step, for group dynamics
 
 Module Usage:
 -   As attribute of the AgentSet() object in agents.py
+-   sharing.py picks receivers among the members of the group of an agent
 
 Last Updated:
-    22-10-2021
+    18-10-2026
 
 Version Number:
     0.1
 """
-from random import shuffle
-from copy import deepcopy
+import numpy as np
+from artemis.core.random_streams import RandomStream
 
 
-# TODO UNIMPLEMENTED FUNCTIONALITY
 class GroupFormer:
 
     def __init__(self, agent_set, number_of_groups=None,
                  division_style='equal_mutually_exclusive_groups',
-                 group_dynamics=False):
+                 group_dynamics=False, switch_probability=0.1, random_stream=None):
 
+        self.random_stream = RandomStream() if random_stream is None else random_stream                                 # stream of random numbers to assign agents to groups with
         self.functionality = self.__init_functionality()
-        self.dynamics = group_dynamics
+        self.dynamics = 'payoff_switching' if group_dynamics is True else group_dynamics or None                        # True selects the default group dynamics, False none
+        if self.dynamics is not None and self.dynamics not in self.functionality['dynamics']:
+            raise ValueError("group_dynamics can only be False or one of {}, group_dynamics is currently defined as {}"
+                             .format(list(self.functionality['dynamics'].keys()), group_dynamics))
+        self.switch_probability = switch_probability                                                                    # chance an agent considers switching groups in a time step
         self.relevant_data = self.__init_relevant_data(number_of_groups, division_style, agent_set)
 
 
@@ -41,7 +57,7 @@ class GroupFormer:
                     },
                 'dynamics':
                     {
-                        'PLACEHOLDER': 'PLACEHOLDER'
+                        'payoff_switching': self.__dynamics_payoff_switching
                     }
 
                 # ENTER FUTURE FUNCTIONALITY HERE
@@ -53,6 +69,8 @@ class GroupFormer:
         relevant_data = dict()
         relevant_data['overview_allegiances'], relevant_data['personal_allegiances'] =\
             self.__init_allegiances(number_of_groups, division_style, agent_set)
+        relevant_data.update(self.__init_membership_arrays(relevant_data['overview_allegiances'],
+                                                           len(agent_set.agents)))
         return relevant_data
 
     def __init_allegiances(self, number_of_groups, division_style, agent_set):
@@ -63,7 +81,7 @@ class GroupFormer:
         overview_allegiances = {}
         personal_allegiances = {}
         agent_list = list(agent_set.agents.keys())
-        shuffle(agent_list)                                                                                             # Shuffle agents list for random assigning of allegiances
+        self.random_stream.shuffle(agent_list)                                                                          # Shuffle agents list for random assigning of allegiances
 
         agent_group_size = int(len(agent_set.agents)/number_of_groups)                                                  # quick and dirty way to assign groups
         agent_start_index = 0
@@ -72,8 +90,7 @@ class GroupFormer:
         group_counter = 0
         while group_counter < number_of_groups:
 
-            overview_allegiances['group_{}'.format(group_counter)] = \
-                deepcopy(agent_list[agent_start_index:agent_end_index])
+            overview_allegiances['group_{}'.format(group_counter)] = agent_list[agent_start_index:agent_end_index]
 
             agent_start_index += agent_group_size
             agent_end_index += agent_group_size
@@ -84,3 +101,139 @@ class GroupFormer:
                 personal_allegiances[agent] = group
 
         return overview_allegiances, personal_allegiances
+
+    def __init_membership_arrays(self, overview_allegiances, number_of_agents):
+        """returns the arrays with the members of every group in a block, in the order of the overview, with room for
+        as many members again in every block"""
+        membership = dict()
+        membership['group_names'] = list(overview_allegiances.keys())                                                   # name of every group, groups are identified by their position in this list
+        membership['group_index'] = {group: index for index, group in enumerate(membership['group_names'])}
+        membership['group_size'] = np.array([len(members) for members in overview_allegiances.values()], dtype=np.int64)
+        membership['group_capacity'] = np.maximum(2 * membership['group_size'], 1)
+        membership['group_start'] = np.concatenate([[0], np.cumsum(membership['group_capacity'])[:-1]]).astype(np.int64)
+        membership['group_members'] = np.full(membership['group_capacity'].sum(), -1, dtype=np.int64)                   # members of group g at group_start[g]:group_start[g] + group_size[g]
+        membership['members_end'] = membership['group_capacity'].sum().item()                                           # end of the last block, free space beyond can be taken by groups that are full
+        membership['group_of_agent'] = np.full(number_of_agents, -1, dtype=np.int64)                                    # group of every agent, -1 if it is in no group
+        membership['position_in_group'] = np.full(number_of_agents, -1, dtype=np.int64)                                 # position of every agent in the block of its group
+        for group, members in enumerate(overview_allegiances.values()):
+            start = membership['group_start'][group]
+            membership['group_members'][start:start + len(members)] = members
+            membership['group_of_agent'][members] = group
+            membership['position_in_group'][members] = np.arange(len(members))
+        return membership
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------------------- Picking other group members ----------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+    def pick_other_member(self, agent, random_number):
+        """returns the member of the group of the agent at the position random_number (in [0, 1)) among the other
+        members, picked as RandomStream.choice would from a list of the other members in the order of the group"""
+        group_name = self.relevant_data['personal_allegiances'][agent]
+        members = self.relevant_data['overview_allegiances'][group_name]                                                # the overview lists keep the same order as the blocks
+        if len(members) < 2:
+            raise IndexError('Cannot choose from an empty sequence')
+        position = int(random_number * (len(members) - 1))
+        if position >= self.relevant_data['position_in_group'][agent]:
+            position += 1                                                                                               # skip the agent itself
+        return members[position]
+
+    def pick_other_members(self, agents, random_numbers):
+        """returns a member of the group of every agent other than the agent itself, at the position of the random
+        number (in [0, 1)) of the agent among the other members"""
+        data = self.relevant_data
+        groups = data['group_of_agent'][agents]
+        other_members = np.where(groups >= 0, data['group_size'][groups] - 1, 0)
+        if np.any(other_members <= 0):
+            raise ValueError('no other agents to share with for agents {}'
+                             .format(sorted(set(agents[other_members <= 0].tolist()))))
+        position = (random_numbers * other_members).astype(np.int64)
+        position += position >= data['position_in_group'][agents]                                                       # skip the agent itself
+        return data['group_members'][data['group_start'][groups] + position]
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------------------ Moving agents between groups ----------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+    def move(self, agent, group_name):
+        """moves an agent to another group in O(1) time, the last member of its old group takes its position"""
+        data = self.relevant_data
+        old_group = data['group_of_agent'][agent].item()
+        new_group = data['group_index'][group_name]
+        if old_group == new_group:
+            return
+
+        if old_group >= 0:
+            old_members = data['overview_allegiances'][data['group_names'][old_group]]
+            position = data['position_in_group'][agent].item()
+            last_position = data['group_size'][old_group].item() - 1
+            last_member = data['group_members'][data['group_start'][old_group] + last_position].item()
+            data['group_members'][data['group_start'][old_group] + position] = last_member
+            data['position_in_group'][last_member] = position
+            data['group_size'][old_group] -= 1
+            old_members[position] = last_member                                                                         # the overview lists keep the same order as the blocks
+            old_members.pop()
+
+        if data['group_size'][new_group] == data['group_capacity'][new_group]:
+            self.__grow_group(new_group)
+        position = data['group_size'][new_group].item()
+        data['group_members'][data['group_start'][new_group] + position] = agent
+        data['position_in_group'][agent] = position
+        data['group_of_agent'][agent] = new_group
+        data['group_size'][new_group] += 1
+        data['overview_allegiances'][group_name].append(agent)
+        data['personal_allegiances'][agent] = group_name
+
+    def __grow_group(self, group):
+        """moves the block of a full group to the end of the member array, with double the capacity"""
+        data = self.relevant_data
+        start, size = data['group_start'][group].item(), data['group_size'][group].item()
+        capacity = max(2 * size, 1)
+        if data['members_end'] + capacity > len(data['group_members']):                                                 # double the member array, so growing takes O(1) time on average
+            group_members = np.full(max(2 * len(data['group_members']), data['members_end'] + capacity), -1,
+                                    dtype=np.int64)
+            group_members[:data['members_end']] = data['group_members'][:data['members_end']]
+            data['group_members'] = group_members
+        end = data['members_end']
+        data['group_members'][end:end + size] = data['group_members'][start:start + size]
+        data['group_start'][group] = data['members_end']
+        data['group_capacity'][group] = capacity
+        data['members_end'] += capacity
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------------------------- Group dynamics -----------------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+    def run_dynamics(self, catches):
+        """lets agents switch groups given the catch of every agent in the last time step (an array in agent order),
+        returns the moves as a list of (agent, new group name)"""
+        if self.dynamics is None:
+            return []
+        return self.functionality['dynamics'][self.dynamics](np.asarray(catches, dtype=np.float64))
+
+    def __dynamics_payoff_switching(self, catches):
+        """every agent considers with probability switch_probability to move to a random other group, and does so if
+        the members of that group caught more on average in the last time step than those of its own group.
+        Payoffs are those at the start of the switching, groups always keep at least two members to share with"""
+        data = self.relevant_data
+        number_of_groups = len(data['group_names'])
+        if number_of_groups < 2:
+            return []
+        in_group = data['group_of_agent'] >= 0
+        group_catch = np.bincount(data['group_of_agent'][in_group], weights=catches[in_group],
+                                  minlength=number_of_groups)
+        payoff = np.divide(group_catch, data['group_size'], out=np.full(number_of_groups, -np.inf),
+                           where=data['group_size'] > 0)                                                                # average catch of the members of every group, empty groups are never joined
+
+        generator = self.random_stream.generator
+        candidates = np.flatnonzero(in_group & (generator.random(len(catches)) < self.switch_probability))
+        own_groups = data['group_of_agent'][candidates]
+        other_groups = generator.integers(0, number_of_groups - 1, len(candidates))
+        other_groups += other_groups >= own_groups                                                                      # any group but the own group
+        switching = payoff[other_groups] > payoff[own_groups]
+
+        moves = []
+        for agent, group in zip(candidates[switching].tolist(), other_groups[switching].tolist()):
+            if data['group_size'][data['group_of_agent'][agent]] > 2:                                                   # the agents left behind keep someone to share with
+                self.move(agent, data['group_names'][group])
+                moves.append((agent, data['group_names'][group]))
+        return moves
+
+# EOF
@@ -4,13 +4,15 @@ This Module is used to determine the way any ForagerAgent might choose any of th
 what mode of transportation to use etc.).
 
 All functionality is contained in methods and attributes of the ChoiceMaker object, The ChoiceMaker object is key for
-any ForagerAgent object to choose a forage option
+any ForagerAgent object to choose a forage option. The FleetChoiceMaker object offers the same choice methods for all
+agents in a FleetState at once, used by the 'vectorized' engine
 
 Module inputs:
 -   loads parts of an ForagerAgent Object during the init (PLEASE ALWAYS AVOID CIRCULAR REFERENCES, see module usage)
 
 Module Usage:
 -   Used by the module agents.py as part of the ForagerAgent object
+-   Used by the module agents.py as part of the AgentFleet object (FleetChoiceMaker)
 
 Last Updated:
     06-09-2021
@@ -19,17 +21,23 @@ Version Number:
     0.1
 """
 import copy
-from random import choice, random, choices
+import numpy as np
+from artemis.core.heatmap_trees import FenwickSampler, MaxTree
+from artemis.core.random_streams import RandomStream
+from artemis.io.output.tracing import Tracer
 
 
 class ChoiceMaker:
-    def __init__(self, choice_set, choice_method, agent='ForagerAgent Placeholder'):                           # initilisation statement
+    def __init__(self, choice_set, choice_method, agent='ForagerAgent Placeholder', random_stream=None,
+                 tracer=None):                                                                                          # initilisation statement
         self.choice_indices = list(choice_set.discrete_alternatives.keys())                                             # initialise list of potential choice options the agent can choose from
         self.choice_instruction = self.__init_instructions()                                                            # initialise dictionary with all references to all potential functionality of a ChoiceMaker object
         self.choice_method = choice_method                                                                              # indication of the functionality this specific instance of ChoiceMaker should have
         self.agent_id = agent.id
         self.relevant_agent_data = self.__init_relevant_data(agent)                                                     # using self.choice method, acquire references to the specific parts of an agent that this specific instance of ChoiceMaker should have access to
-        self.last_choice_id = ''
+        self.last_choice_id = None                                                                                      # index of the last chosen choice option
+        self.random_stream = RandomStream() if random_stream is None else random_stream                                 # stream of random numbers to make choices with
+        self.tracer = Tracer() if tracer is None else tracer                                                            # object reporting the choices made
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Methods that initialise the functionality of the ChoiceMaker
@@ -45,25 +53,30 @@ class ChoiceMaker:
 
             "random": {
                 'init': self.__init_relevant_random,
-                'choose': self.__make_choice_random
+                'choose': self.__make_choice_random,
+                'update': self.__update_nothing
             },
 
             "full_heatmap": {
                 'init': self.__init_relevant_full_heatmap,
-                'choose': self.__make_choice_full_heatmap
+                'choose': self.__make_choice_full_heatmap,
+                'update': self.__update_max_tree
             },
 
             "explore_heatmap": {
                 'init': self.__init_relevant_explore_heatmap,
-                'choose': self.__make_choice_explore_heatmap
+                'choose': self.__make_choice_explore_heatmap,
+                'update': self.__update_max_tree
             },
             "full_weighted_heatmap": {
                 'init': self.__init_relevant_full_weighted_heatmap,
-                'choose': self.__make_choice_full_weighted_heatmap
+                'choose': self.__make_choice_full_weighted_heatmap,
+                'update': self.__update_weighted_sampler
             },
             "explore_weighted_heatmap": {
                 'init': self.__init_relevant_explore_weighted_heatmap,
-                'choose': self.__make_choice_explore_weighted_heatmap
+                'choose': self.__make_choice_explore_weighted_heatmap,
+                'update': self.__update_weighted_sampler
             }
 
             # include further decision making options HERE (and as methods below)
@@ -85,35 +98,43 @@ class ChoiceMaker:
 
     def __init_relevant_full_heatmap(self, agent):
         """" initialises the data needed for the 'full_heatmap' choice method: a reference to:
-        - the agent heatmap"""
+        - the agent heatmap and
+        - a MaxTree over the heatmap, made at the first choice"""
         relevant_data = dict()
         relevant_data['heatmap'] = agent.heatmap                                                                        # load agent heatmap
+        relevant_data['max_tree'] = None                                                                                # made at the first choice, so batched ('vectorized') choices never keep one up to date
         return relevant_data
 
     def __init_relevant_explore_heatmap(self, agent):
         """" initialises the data needed for the 'explore_heatmap' choice method: a reference to:
-        - the agent heatmap and
-        - the agent explore probability"""
+        - the agent heatmap,
+        - the agent explore probability and
+        - a MaxTree over the heatmap, made at the first choice"""
 
         relevant_data = dict()                                                                                          # initialise data dictionary
         relevant_data['explore_probability'] = agent.explore_probability                                                # load explore probability
         relevant_data['heatmap'] = agent.heatmap                                                                        # load agent heatmap
+        relevant_data['max_tree'] = None                                                                                # made at the first choice, so batched ('vectorized') choices never keep one up to date
         return relevant_data
 
     def __init_relevant_full_weighted_heatmap(self, agent):
         """" initialises the data needed for the 'full_weighted_heatmap' choice method: a reference to:
-        - the agent heatmap"""
+        - the agent heatmap and
+        - a FenwickSampler over the heatmap, made at the first choice"""
         relevant_data = dict()
         relevant_data['heatmap'] = agent.heatmap                                                                        # load agent heatmap
+        relevant_data['sampler'] = None                                                                                 # made at the first choice, so batched ('vectorized') choices never keep one up to date
         return relevant_data
 
     def __init_relevant_explore_weighted_heatmap(self, agent):
         """" initialises the data needed for the 'explore_weighted_heatmap' choice method: a reference to:
-        - the agent heatmap and
-        - the agent explore probability"""
+        - the agent heatmap,
+        - the agent explore probability and
+        - a FenwickSampler over the heatmap, made at the first choice"""
         relevant_data = dict()                                                                                          # initialise data dictionary
         relevant_data['explore_probability'] = agent.explore_probability                                                # load explore probability
         relevant_data['heatmap'] = agent.heatmap                                                                        # load agent heatmap
+        relevant_data['sampler'] = None                                                                                 # made at the first choice, so batched ('vectorized') choices never keep one up to date
         return relevant_data
 
 
@@ -125,38 +146,48 @@ class ChoiceMaker:
         as key for the internal instructions dictionary"""
         chosen = self.choice_instruction[self.choice_method]['choose']()
         self.last_choice_id = chosen
-        print('{} has chosen {} to forage in in this instance and last_choice_id is updated'.format(self.agent_id, self.last_choice_id))
+        if self.tracer.traces_agents:
+            self.tracer.event('agent', 'choice', '{agent_id} has chosen {alternative_id} to forage in in this instance '
+                              'and last_choice_id is updated', agent_id=self.agent_id, alternative_id=chosen)
         return chosen
 
+    def update_heatmap_entry(self, alternative_id):
+        """method that lets the choice method update its data on the heatmap,
+        after the heatmap entry of the given choice option has changed"""
+        self.choice_instruction[self.choice_method]['update'](alternative_id)
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Methods that make the actual choice for the ForagerAgent
 # ----------------------------------------------------------------------------------------------------------------------
     def __make_choice_random(self):
         """method to choose a random choice option to forage in"""
-        chosen = choice(self.choice_indices)
+        chosen = self.random_stream.choice(self.choice_indices)
         return chosen
 
     def __make_choice_full_heatmap(self):
         """method to choose an option based on the maximum catch according to an agent heatmap
         returns the dictionary key of that maximum"""
-        heatmap = self.relevant_agent_data['heatmap']
-        chosen = max(heatmap, key=heatmap.get)                                                                          # returns key of the maximum value
+        max_tree = self.relevant_agent_data['max_tree']
+        if max_tree is None:                                                                                            # first choice: build a tree over the heatmap, which is kept up to date from then on
+            heatmap = self.relevant_agent_data['heatmap']
+            max_tree = self.relevant_agent_data['max_tree'] = MaxTree(heatmap.values())                                 # heatmap keys are the choice option indices, so positions in the tree are keys
+        chosen = max_tree.argmax()                                                                                      # returns key of the (first) maximum value
         return chosen
 
     def __make_choice_full_weighted_heatmap(self):
         """method to choose an option based on weighted probabilities according to an agent heatmap
         returns the dictionary key of that maximum"""
-        heatmap = self.relevant_agent_data['heatmap']                                                                   # get a reference to heatmap
-        catch_weights = list(heatmap.values())                                                                          # get catches as the agent has recorded them in ints heatmap
-        total_expectation = sum(catch_weights)                                                                          # get total expectated catch (on the heatmap) as sum of all entries in the heatmap
-        probability_weights = [x / total_expectation for x in catch_weights]                                            # use total expected catch to make proportional weights from the heatmap catch data
-        chosen = choices(list(heatmap.keys()), weights=probability_weights, k=1)[0]                                     # returns key based on the probabilities weight given as the catch events in memory
+        sampler = self.relevant_agent_data['sampler']
+        if sampler is None:                                                                                             # first choice: build a sampler over the heatmap, which is kept up to date from then on
+            heatmap = self.relevant_agent_data['heatmap']                                                               # get a reference to heatmap
+            sampler = self.relevant_agent_data['sampler'] = FenwickSampler(heatmap.values())                            # use the catches as the agent has recorded them in its heatmap as weights
+        chosen = sampler.sample(self.random_stream.random())                                                            # returns key based on the probabilities weight given as the catch events in memory
         return chosen
 
     def __make_choice_explore_heatmap(self):
         """method to choose an option based on either the full_heatmap or random methods,
         according to a fixed probability"""
-        if random() < self.relevant_agent_data['explore_probability']:                                                  # if a random number between 0 and 1 is smaller than the explore probability, the ForagerAgent will explore a random cell
+        if self.random_stream.random() < self.relevant_agent_data['explore_probability']:                               # if a random number between 0 and 1 is smaller than the explore probability, the ForagerAgent will explore a random cell
             chosen = self.__make_choice_random()
         else:                                                                                                           # if a random number between 0 and 1 is larger than the explore probability, the ForagerAgent will choose based on the heatmap
             chosen = self.__make_choice_full_heatmap()
@@ -166,13 +197,110 @@ class ChoiceMaker:
     def __make_choice_explore_weighted_heatmap(self):
         """method to choose an option based on either the full_heatmap or random methods,
         according to a fixed probability"""
-        if random() < self.relevant_agent_data['explore_probability']:                                                  # if a random number between 0 and 1 is smaller than the explore probability, the ForagerAgent will explore a random cell
-            print("{} is exploring!".format(self.agent_id))
+        if self.random_stream.random() < self.relevant_agent_data['explore_probability']:                               # if a random number between 0 and 1 is smaller than the explore probability, the ForagerAgent will explore a random cell
+            if self.tracer.traces_agents:
+                self.tracer.event('agent', 'explore', '{agent_id} is exploring!', agent_id=self.agent_id)
             chosen = self.__make_choice_random()
         else:                                                                                                           # if a random number between 0 and 1 is larger than the explore probability, the ForagerAgent will choose based on the heatmap
             chosen = self.__make_choice_full_weighted_heatmap()
 
         return chosen
 
+# ----------------------------------------------------------------------------------------------------------------------
+# Methods that keep the data of the choice methods up to date with the heatmap
+# ----------------------------------------------------------------------------------------------------------------------
+    def __update_nothing(self, alternative_id):
+        """method for choice methods that read the heatmap directly at every choice"""
+        pass
+
+    def __update_max_tree(self, alternative_id):
+        """method to update the value of a choice option in the tree of the (explore) heatmap choice methods"""
+        max_tree = self.relevant_agent_data['max_tree']
+        if max_tree is not None:
+            max_tree.update(alternative_id, self.relevant_agent_data['heatmap'][alternative_id])
+
+    def __update_weighted_sampler(self, alternative_id):
+        """method to update the weight of a choice option in the sampler of the weighted heatmap choice methods"""
+        sampler = self.relevant_agent_data['sampler']
+        if sampler is not None:
+            sampler.update(alternative_id, self.relevant_agent_data['heatmap'][alternative_id])
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Batched choice making for all agents in a FleetState at once
+# ----------------------------------------------------------------------------------------------------------------------
+
+class FleetChoiceMaker:
+    """Makes the choices of all agents in a FleetState in a single batch per choice method, using numpy.
+    Choices of agents in a time step are independent given the heatmaps, so they can all be drawn at once"""
 
+    def __init__(self):
+        self.choice_instruction = self.__init_instructions()                                                            # initialise dictionary with references to all batched choice methods
 
+    def __init_instructions(self):
+        """define a dictionary with the batched version of every choice method supported by the ChoiceMaker"""
+        instructions = {
+            "random": self.__choose_all_random,
+            "full_heatmap": self.__choose_all_full_heatmap,
+            "explore_heatmap": self.__choose_all_explore_heatmap,
+            "full_weighted_heatmap": self.__choose_all_full_weighted_heatmap,
+            "explore_weighted_heatmap": self.__choose_all_explore_weighted_heatmap
+
+            # include further decision making options HERE (and as methods below)
+        }
+        return instructions
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Main Functionality Method to make a choice for all agents
+# ----------------------------------------------------------------------------------------------------------------------
+    def choose_all(self, fleet_state, rng):
+        """returns an array with the chosen choice option (column) for every agent (row) in the fleet_state,
+        drawing all random numbers needed from the numpy Generator rng"""
+        chosen = np.zeros(fleet_state.nb_agents, dtype=np.int64)
+        for choice_method, rows in fleet_state.choice_method_rows.items():                                              # agents are grouped per choice method, so every method is executed once per time step
+            if choice_method not in self.choice_instruction:
+                raise NotImplementedError('choice method {} is not supported, supported choice methods are:\t{}'
+                                          .format(choice_method, list(self.choice_instruction.keys())))
+            chosen[rows] = self.choice_instruction[choice_method](fleet_state, rows, rng)
+        return chosen
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Methods that make the actual choices for a group of agents
+# ----------------------------------------------------------------------------------------------------------------------
+    def __choose_all_random(self, fleet_state, rows, rng):
+        """choose a random choice option for every agent"""
+        return rng.integers(fleet_state.nb_alternatives, size=len(rows))
+
+    def __choose_all_full_heatmap(self, fleet_state, rows, rng):
+        """choose the choice option with the maximum catch expectation for every agent,
+        ties resolve to the first choice option as in the ChoiceMaker"""
+        return np.argmax(fleet_state.heatmap[rows], axis=1)
+
+    def __choose_all_full_weighted_heatmap(self, fleet_state, rows, rng):
+        """choose a choice option with probabilities proportional to the heatmap entries for every agent,
+        by inverse transform sampling on the cumulative heatmap of every row"""
+        cumulative_weights = np.cumsum(fleet_state.heatmap[rows], axis=1)
+        total_expectation = cumulative_weights[:, -1]
+        if np.any(total_expectation <= 0):
+            raise ValueError('Total of weights must be greater than zero, for agents {}'
+                             .format([fleet_state.agent_ids[row] for row in rows[total_expectation <= 0]]))
+        thresholds = rng.random(len(rows)) * total_expectation
+        chosen = np.count_nonzero(cumulative_weights <= thresholds[:, np.newaxis], axis=1)                              # number of cumulative weights passed is the index of the chosen option (zero weight options are never chosen)
+        return np.minimum(chosen, fleet_state.nb_alternatives - 1)
+
+    def __choose_all_explore_heatmap(self, fleet_state, rows, rng):
+        """choose either a random choice option or the one with the maximum expectation, according to the
+        explore probability of every agent"""
+        return self.__choose_all_explore(fleet_state, rows, rng, self.__choose_all_full_heatmap)
+
+    def __choose_all_explore_weighted_heatmap(self, fleet_state, rows, rng):
+        """choose either a random choice option or one with heatmap weighted probabilities, according to the
+        explore probability of every agent"""
+        return self.__choose_all_explore(fleet_state, rows, rng, self.__choose_all_full_weighted_heatmap)
+
+    def __choose_all_explore(self, fleet_state, rows, rng, exploit_method):
+        exploring = rng.random(len(rows)) < fleet_state.explore_probability[rows]                                       # agents with a random number below their explore probability explore a random cell
+        chosen = np.empty(len(rows), dtype=np.int64)
+        chosen[exploring] = self.__choose_all_random(fleet_state, rows[exploring], rng)
+        chosen[~exploring] = exploit_method(fleet_state, rows[~exploring], rng)
+        return chosen
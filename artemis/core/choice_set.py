@@ -20,11 +20,11 @@ Module inputs:
 
 Module Usage:
 -   init_objects.py uses the module to initialize all objects needed at any later stage in the model
--   run_model.py uses the module to execute choice set operations
+-   run_model.py uses the module to execute choice set operations, such as the growth and reset of all stocks
 -   agents.py uses the module to create a mirror of the choice set to map acquired information on
 
 Last Updated:
-    06-09-2021
+    18-10-2026
 
 Version Number:
     0.1
@@ -32,8 +32,9 @@ Version Number:
 
 import numpy as np
 import copy
-from collections import defaultdict
 from artemis.core.resource_dynamics import DynamicsHandler
+from artemis.core.trackers import TrackerStore
+from artemis.core.random_streams import RandomStream
 
 # ----------------------------------------------------------------------------------------------------------------------
 # ------------------------------------- Objects to contain the full choice set -----------------------------------------
@@ -41,45 +42,118 @@ from artemis.core.resource_dynamics import DynamicsHandler
 
 class ChoiceSet:
     """Class to contain all data for a given choice set of alternatives,
-    including the choice options in the choice set as DiscreteAlternative objects in a dictionary object"""
+    including the choice options in the choice set as DiscreteAlternative objects in a dictionary object.
+    Choice options are identified by their index (0 to nb_alternatives - 1) throughout the model,
+    their labels are only attached to the output data.
+    The stocks and growth factors of all choice options are kept in arrays, in the order of the dictionary,
+    so growth and resets can be applied to all choice options at once"""
 
     # initialisation of the object defining the attributes of a choice set
-    def __init__(self, nb_alternatives, stock_distribution, init_stock, sd_init_stock, minimum_stock, maximum_stock, growth_factor=1, duration=1):
-        self.discrete_alternatives = {}                                                                                 # dictionary with all choice options as DiscreteAlternative objects
-        self.effort_map = {}                                                                                            # tracker variable for effort (effort = 1 -> a single forage event) exerted to each choice options
-        self.catch_map = {}                                                                                             # tracker variable for total catch gained from each choice options
-        self.time_visit_map = defaultdict(dict)
-        self.stock_time_tracker = defaultdict(dict)
-        self.competition_correction = defaultdict(dict)                                                                 # tracks the correction in catch that has occurered
-        self.hypothetical_competition_correction = defaultdict(dict)                                                    # track the correction in catch that would have occured when one additional agent would have foraged
-
-        self.__init_attributes(nb_alternatives=nb_alternatives, stock_distribution=stock_distribution,
-                               init_stock=init_stock, sd_init_stock=sd_init_stock, growth_factor=growth_factor,
-                               duration=duration, maximum_stock=maximum_stock, minimum_stock=minimum_stock)
-
-    def __init_attributes(self, nb_alternatives, stock_distribution, init_stock, sd_init_stock, minimum_stock, maximum_stock, growth_factor, duration):
+    def __init__(self, nb_alternatives, stock_distribution, init_stock, sd_init_stock, minimum_stock, maximum_stock, growth_factor=1, duration=1, trackers=None, random_stream=None):
+        self.random_stream = RandomStream() if random_stream is None else random_stream                                 # stream of random numbers to draw (reset) stocks with
+        self.discrete_alternatives = {}                                                                                 # dictionary with all choice options as DiscreteAlternative objects, keyed by their index
+        self.alternative_labels = []                                                                                    # label of every choice option (e.g. 'alternative_07'), in index order
+        self.resource_stocks = np.zeros(nb_alternatives, dtype=np.float64)                                              # stock present in every choice option, DiscreteAlternative objects read and write their own entry
+        self.growth_factors = np.ones(nb_alternatives, dtype=np.float64)                                                # growth factor of every choice option
+        self.stock_draw_instructions = self.__init_stock_draw_instructions()
+        self.effort_map = np.zeros(nb_alternatives, dtype=np.int64)                                                     # tracker variable for effort (effort = 1 -> a single forage event) exerted to each choice options
+        self.catch_map = np.zeros(nb_alternatives, dtype=np.float64)                                                    # tracker variable for total catch gained from each choice options
+        self.trackers = self.__init_tracker_store(nb_alternatives=nb_alternatives, duration=duration,
+                                                  trackers=trackers)                                                    # TrackerStore with an array (time step x choice option) per recorded tracker
+
+        self.__init_attributes(nb_alternatives=nb_alternatives)
+        self.initialize_stocks(stock_distribution=stock_distribution, init_stock=init_stock,
+                               sd_init_stock=sd_init_stock, minimum_stock=minimum_stock, maximum_stock=maximum_stock,
+                               growth_factor=growth_factor)
+
+    def __init_tracker_store(self, nb_alternatives, duration, trackers=None):
+        """preallocate an array for every tracker that is recorded (all if trackers is None),
+        with an entry for every choice option in every time step"""
+        tracker_definitions = {                                                                                         # data type and initial value of every tracker
+            'resource_stock': (np.float64, 0),                                                                          # stock in every choice option at the start of a time step
+            'nb_agents_visited': (np.int64, 0),                                                                         # number of agents that foraged in every choice option
+            'competition_correction': (np.float64, np.nan),                                                             # tracks the correction in catch that has occurered
+            'hypothetical_competition_correction': (np.float64, np.nan)                                                 # track the correction in catch that would have occured when one additional agent would have foraged
+        }
+        if trackers is None:
+            trackers = list(tracker_definitions)
+        elif not set(trackers) <= set(tracker_definitions):
+            raise ValueError('choice option trackers {} are not supported, supported trackers are: {}'
+                             .format(sorted(set(trackers) - set(tracker_definitions)), list(tracker_definitions)))
+
+        tracker_store = TrackerStore(time_ids=[str(time_step).zfill(len(str(duration))) for time_step in range(duration)])
+        for name, (dtype, fill_value) in tracker_definitions.items():
+            if name in trackers:
+                tracker_store.add_tracker(name, shape=(nb_alternatives,), dtype=dtype, fill_value=fill_value)
+        return tracker_store
+
+    def __init_stock_draw_instructions(self):
+        """define a dictionary with the ways a stock can be drawn, per stock distribution (reset scenario)"""
+        instructions = {
+            'normal_random_repeat': self.__draw_normal_stocks,                                                          # stocks drawn from a normal distribution, cut off at 0
+            'uniform_random_repeat': self.__draw_uniform_stocks                                                         # stocks drawn from a uniform distribution, cut off at 0
+        }
+        return instructions
+
+    def __init_attributes(self, nb_alternatives):
         alternative_tracker = 0
         while alternative_tracker < nb_alternatives:                                                                    # loop the creation of a alternative for the full size of the considered set of choices possibel
-            alternative_id = "alternative_" + str(alternative_tracker).zfill(len(str(nb_alternatives)))                 # assign ID
-            self.discrete_alternatives[alternative_id] = DiscreteAlternative(alternative_id, stock_distribution=stock_distribution,init_stock=init_stock,
-                                                                                   minimum_stock=minimum_stock,
-                                                                             maximum_stock=maximum_stock
-                                                                             , sd_init_stock=sd_init_stock, growth_factor=growth_factor)        # define a single choice option with an ID, initial stock (with an sd) and growth factor
-            self.effort_map[alternative_id] = 0                                                                         # define a tracker with 0 effort on each choice option
-            self.catch_map[alternative_id] = 0                                                                          # define a tracker with 0 catch on every effort
-            self.time_visit_map[alternative_id] = dict()
-
-            duration_counter = 0                                                                                        # make counter for all time_steps in the model for While loop functioning
-            while duration_counter < duration:                                                                          # loop over all time steps in the model
-                time_id = str(duration_counter).zfill(len(str(duration)))
-                self.time_visit_map[alternative_id][time_id] = 0
-                duration_counter += 1
+            alternative_label = "alternative_" + str(alternative_tracker).zfill(len(str(nb_alternatives)))              # assign label, only used in the output data
+            self.alternative_labels.append(alternative_label)
+            self.discrete_alternatives[alternative_tracker] = DiscreteAlternative(alternative_tracker, choice_set=self,
+                                                                                  index=alternative_tracker)            # define a single choice option with its index as ID, its stock and growth factor are drawn by initialize_stocks
             alternative_tracker += 1                                                                                    # proceed to next choice_option
 
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------- Methods to change the stocks of all choice options -----------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def initialize_stocks(self, stock_distribution, init_stock, sd_init_stock, minimum_stock, maximum_stock,
+                          growth_factor=1, rng=None):
+        """draws the initial stock of all choice options at once and sets their growth factor,
+        stocks stay 0 for stock distributions without a way to draw them.
+        Stocks are drawn from the numpy Generator rng, by default that of the random stream of the ChoiceSet"""
+        if rng is None:
+            rng = self.random_stream.generator
+        if stock_distribution in self.stock_draw_instructions:
+            self.resource_stocks[:] = self.stock_draw_instructions[stock_distribution](
+                size=len(self.resource_stocks), init_stock=init_stock, sd_init_stock=sd_init_stock,
+                minimum_stock=minimum_stock, maximum_stock=maximum_stock, rng=rng)
+            self.growth_factors[:] = growth_factor
+
+    def grow_stocks(self):
+        """lets the stock in every choice option grow exponentially with its growth factor"""
+        self.resource_stocks *= self.growth_factors
+
+    def reset_stocks(self, stock_reset_scenario, stock_reset_chance, init_stock, sd_init_stock, minimum_stock,
+                     maximum_stock, rng=None):
+        """redraws the stock of every choice option with a chance of stock_reset_chance, all at once.
+        Random numbers are drawn from the numpy Generator rng, by default that of the random stream of the ChoiceSet"""
+        if stock_reset_scenario not in self.stock_draw_instructions:                                                    # stocks are not reset in other scenarios
+            return
+
+        if rng is None:
+            rng = self.random_stream.generator
+        reset_mask = rng.random(len(self.resource_stocks)) < stock_reset_chance                                         # Bernoulli draw for every choice option
+
+        nb_resets = np.count_nonzero(reset_mask)
+        if nb_resets:
+            self.resource_stocks[reset_mask] = self.stock_draw_instructions[stock_reset_scenario](
+                size=nb_resets, init_stock=init_stock, sd_init_stock=sd_init_stock,
+                minimum_stock=minimum_stock, maximum_stock=maximum_stock, rng=rng)
+
+    def __draw_normal_stocks(self, size, init_stock, sd_init_stock, minimum_stock, maximum_stock, rng):
+        return draw_positive_normal(mean=init_stock, sd=sd_init_stock, size=size, rng=rng)
+
+    def __draw_uniform_stocks(self, size, init_stock, sd_init_stock, minimum_stock, maximum_stock, rng):
+        return draw_positive_uniform(minimum=minimum_stock, maximum=maximum_stock, size=size, rng=rng)
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------------------ Methods to update trackers ------------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+
     def update_environmental_stock_tracker(self, time_id):
-        for alternative in self.discrete_alternatives:
-            stock = copy.deepcopy(self.discrete_alternatives[alternative].resource_stock)
-            self.stock_time_tracker[time_id][alternative] = stock
+        self.trackers['resource_stock'][self.trackers.time_step(time_id)] = self.resource_stocks
 
 
 class SpatialChoiceSet(ChoiceSet):                                                                                      # placeholder for future functionality
@@ -106,39 +180,53 @@ class DiscreteAlternative:
     """Class to contain the choice option specific aspects and modifications,
     for now only resource stock is included"""
 
-    def __init__(self, alternative_id=None, stock_distribution='uniform_random_repeat', init_stock=100, sd_init_stock=25, minimum_stock=0, maximum_stock=100, growth_factor=1):
+    def __init__(self, alternative_id=None, stock_distribution='uniform_random_repeat', init_stock=100, sd_init_stock=25, minimum_stock=0, maximum_stock=100, growth_factor=1, choice_set=None, index=0):
         """"function defining the content of a choice options (e.g. a single grid cell in spatial considerations)"""
         self.alternative_id = alternative_id                                                                            # id consistent with other indices used in the rest of the model
-        self.resource_stock = 0                                                                                         # contains the value(s) for the stock present
-        self.growth_factor = 1                                                                                          # initialise value for growth factor
-        self.initialize_standard_stock(stock_distribution=stock_distribution, init_stock=init_stock, sd_init_stock=sd_init_stock, minimum_stock=minimum_stock, maximum_stock=maximum_stock, growth_factor=growth_factor)                                        # loads proper initialization, overwriting the stock and growth factor with specified values
         self.stock_type = 'singular'                                                                                    # indicates the structure of the stock (e.g. singular/age class)
         self.stock_growth_type = 'exponential'                                                                          # indicator for the way the stock grows
+        if choice_set is None:                                                                                          # a stand-alone choice option keeps its stock in arrays of its own
+            self._resource_stocks = np.zeros(1, dtype=np.float64)
+            self._growth_factors = np.ones(1, dtype=np.float64)
+            self.index = 0
+            self.initialize_standard_stock(stock_distribution=stock_distribution, init_stock=init_stock, sd_init_stock=sd_init_stock, minimum_stock=minimum_stock, maximum_stock=maximum_stock, growth_factor=growth_factor)                                        # loads proper initialization, overwriting the stock and growth factor with specified values
+        else:                                                                                                           # the stock is kept (and drawn) in the arrays of the ChoiceSet
+            self._resource_stocks = choice_set.resource_stocks
+            self._growth_factors = choice_set.growth_factors
+            self.index = index                                                                                          # position of the choice option in the arrays of the ChoiceSet
         #self.dynamics_handler = DynamicsHandler(self, dynamics_scenario=stock_distribution)
 
+    @property
+    def resource_stock(self):
+        """contains the value(s) for the stock present"""
+        return self._resource_stocks[self.index].item()
+
+    @resource_stock.setter
+    def resource_stock(self, value):
+        self._resource_stocks[self.index] = value
+
+    @property
+    def growth_factor(self):
+        """value for growth factor"""
+        return self._growth_factors[self.index].item()
+
+    @growth_factor.setter
+    def growth_factor(self, value):
+        self._growth_factors[self.index] = value
+
     def initialize_standard_stock(self, stock_distribution, init_stock, sd_init_stock, minimum_stock, maximum_stock, growth_factor=1):
         """draws and sets an initial stock size in the choice option drawn from
         a normal distribution with a given  mean and sd"""
         if stock_distribution == 'normal_random_repeat':
-            self.resource_stock = self.__pos_normal(mean=init_stock, sd=sd_init_stock)                                  # generate random stock with given mean and standard deviation from a normal distribution
+            self.resource_stock = draw_positive_normal(mean=init_stock, sd=sd_init_stock, size=1)[0]                    # generate random stock with given mean and standard deviation from a normal distribution
             self.growth_factor = growth_factor                                                                          # set growth factor (in dynamic stock scenarios)
 
         elif stock_distribution == 'uniform_random_repeat':
             self.init_uniform_standard_stock(minimum_stock=minimum_stock, maximum_stock=maximum_stock)
             self.growth_factor = growth_factor
 
-    def __pos_normal(self, mean, sd):
-        """returns values from a normal distribution, cut off at 0 """
-        x = np.random.normal(loc=mean, scale=sd)
-        return x if x > 0 else self.__pos_normal(mean, sd)
-
     def init_uniform_standard_stock(self, minimum_stock, maximum_stock):
-        self.resource_stock = self.__pos_uniform(minimum_stock, maximum_stock)
-        print('new, reset, stock value is {}'.format(self.resource_stock))
-
-    def __pos_uniform(self, minimum, maximum):
-        x = np.random.uniform(low=minimum, high=maximum)
-        return x if x > 0 else self.__pos_uniform(minimum, maximum)
+        self.resource_stock = draw_positive_uniform(minimum=minimum_stock, maximum=maximum_stock, size=1)[0]
 
     def stock_growth(self):
         """Method placeholder for future implementation of dynamic stock, currently not great executed"""
@@ -168,3 +256,37 @@ class SpatialGridCell(DiscreteAlternative):                                 # fo
         self.location = (float('nan'), float('nan'))                                                                    # placeholder to define spatial attrbutes of the choice options
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------------ Functions to draw (positive) stock values ---------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+
+def draw_positive_normal(mean, sd, size, rng=None):
+    """returns an array of values from a normal distribution, cut off at 0 by redrawing all values <= 0,
+    uses the global numpy random state if no numpy Generator (rng) is given"""
+    if mean <= 0 and sd <= 0:
+        raise ValueError('cannot draw positive values from a normal distribution with mean {} and sd {}'
+                         .format(mean, sd))
+    random_state = np.random if rng is None else rng
+    values = np.asarray(random_state.normal(loc=mean, scale=sd, size=size), dtype=np.float64)
+    redraw = values <= 0
+    while np.any(redraw):                                                                                               # redraw only the values that were cut off
+        values[redraw] = random_state.normal(loc=mean, scale=sd, size=np.count_nonzero(redraw))
+        redraw = values <= 0
+    return values
+
+
+def draw_positive_uniform(minimum, maximum, size, rng=None):
+    """returns an array of values from a uniform distribution, cut off at 0 by redrawing all values <= 0,
+    uses the global numpy random state if no numpy Generator (rng) is given"""
+    if max(minimum, maximum) <= 0:
+        raise ValueError('cannot draw positive values from a uniform distribution between {} and {}'
+                         .format(minimum, maximum))
+    random_state = np.random if rng is None else rng
+    values = np.asarray(random_state.uniform(low=minimum, high=maximum, size=size), dtype=np.float64)
+    redraw = values <= 0
+    while np.any(redraw):                                                                                               # redraw only the values that were cut off
+        values[redraw] = random_state.uniform(low=minimum, high=maximum, size=np.count_nonzero(redraw))
+        redraw = values <= 0
+    return values
+
+# EOF
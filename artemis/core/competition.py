@@ -10,9 +10,13 @@ depending on the method of competition
 -   outputs from choice_maker.py, specifically the ChoiceMaker.make_choice method
 -   outputs from agents.py, specifically the ForagerAgent.make_choice module
 -   pooled outputs from the above
+-   for the 'vectorized' engine: an array with the chosen choice option (column) of every agent (row) in the
+    FleetState of an AgentFleet, see fleet_state.py
 
 Module Usage:
 -   the module will be used in run_model.py to introduce competition in simulations
+-   the 'vectorized' engine corrects the catch of all agents at once with competition_correction_all, using the
+    effort counts of all choice options
 
 Last Updated:
     01-10-2021
@@ -23,7 +27,7 @@ Version Number:
 
 from collections import defaultdict, OrderedDict
 from sys import exit
-import copy
+import numpy as np
 
 class CompetitionHandler:
     """class to implement competition mechanisms / feedbacks in the model"""
@@ -48,13 +52,15 @@ class CompetitionHandler:
                     "init": self.__init_absent,
                     "load": self.__load_absent,
                     "correct": self.__correct_absent,
+                    "correct_all": self.__correct_all_absent
 
                 },
             'interference-simple':                                                                                      # competition through interference accounted for by correcting the effort for the number of agents that have chosen that choice option
                 {
                     "init": self.__init_interference,
                     "load": self.__load_interference,
-                    "correct": self.__correct_interference_simple
+                    "correct": self.__correct_interference_simple,
+                    "correct_all": self.__correct_all_interference_simple
                 },
 
             'split-catch':
@@ -62,7 +68,8 @@ class CompetitionHandler:
                     # relic code = obsolete
                     "init": self.__init_split_catch,
                     "load": self.__load_split_catch,
-                    "correct": self.__correct_split_catch
+                    "correct": self.__correct_split_catch,
+                    "correct_all": self.__correct_all_split_catch
                 }
             # Enter future functionality HERE
         }
@@ -159,8 +166,8 @@ class CompetitionHandler:
 
         choice_id = self.relevant_data['agent_choices'][agent_id]
 
-        uncorrected_catch = copy.deepcopy(choice_set.discrete_alternatives[choice_id].resource_stock) \
-                            * agent_set.agents[agent_id].catchability_coefficient                                       # extract hypothetical catch if competition was absent
+        uncorrected_catch = choice_set.resource_stocks[choice_id].item() \
+                            * agent_set.agents[agent_id].catchability_coefficient                                       # extract hypothetical catch if competition was absent, choice options are identified by their index in the stock array
 
         corrected_catch, competitors_encountered, correction, hypothetical_correction = \
             self.competition_instruction[self.competition_method]['correct'](choice_id, uncorrected_catch)              # correct hypothetical catch using the competition methods specified
@@ -168,25 +175,79 @@ class CompetitionHandler:
 
         # update agent Trackers
         agent_set.update_agent_trackers(agent_id, corrected_catch, choice_id, time_id)                                  # update trackers on the agents itself
-        agent_set.update_uncorrected_catch_tracker(time_id=time_id, agent_id=agent_id,
-                                                   uncorrected_catch=uncorrected_catch)
-        agent_set.update_corrected_catch_tracker(time_id=time_id, agent_id=agent_id,
-                                                 corrected_catch=corrected_catch)
-        agent_set.update_realised_competition_tracker(time_id=time_id, agent_id=agent_id,
-                                                      realised_competition=competitors_encountered)
+        if 'uncorrected_catch' in agent_set.trackers:                                                                   # only update the trackers that are recorded
+            agent_set.update_uncorrected_catch_tracker(time_id=time_id, agent_id=agent_id,
+                                                       uncorrected_catch=uncorrected_catch)
+        if 'corrected_catch' in agent_set.trackers:
+            agent_set.update_corrected_catch_tracker(time_id=time_id, agent_id=agent_id,
+                                                     corrected_catch=corrected_catch)
+        if 'realised_competition' in agent_set.trackers:
+            agent_set.update_realised_competition_tracker(time_id=time_id, agent_id=agent_id,
+                                                          realised_competition=competitors_encountered)
 
         # Update grid cell trackers
         choice_set.catch_map[choice_id] += corrected_catch                                                              # update tracker of the choice set for total catch in a choice option
         choice_set.effort_map[choice_id] += 1                                                                           # update tracker of the choice set for effort in a choice option
-        choice_set.time_visit_map[choice_id][time_id] += 1
+        if 'nb_agents_visited' in choice_set.trackers:
+            choice_set.trackers['nb_agents_visited'][choice_set.trackers.time_step(time_id), choice_id] += 1
+
+    def competition_correction_all(self, choice_set, agent_set, chosen_alternatives, time_id):
+        """Main Functionality Method for the 'vectorized' engine, corrects the catch of all agents at once for
+        competition, given an array with the chosen choice option (column) of every agent (row) in the FleetState"""
+
+        fleet_state = agent_set.fleet_state
+        effort = np.bincount(chosen_alternatives, minlength=fleet_state.nb_alternatives)                                # number of agents foraging in each choice option
+        self.relevant_data['effort_counts'] = effort                                                                    # remembered for update_choice_set_competition_trackers_all
+
+        uncorrected_catch = choice_set.resource_stocks[chosen_alternatives] * fleet_state.catchability                  # extract hypothetical catch if competition was absent, columns of the FleetState follow the order of the ChoiceSet
+
+        correction, hypothetical_correction, competitors_encountered = \
+            self.competition_instruction[self.competition_method]['correct_all'](effort)                                # corrections per choice option, using the competition method specified
+        corrected_catch = uncorrected_catch * correction[chosen_alternatives]
+
+        # update agent Trackers
+        agent_set.update_agent_trackers_all(chosen_alternatives, corrected_catch, time_id)                              # update trackers of all agents at once
+        agent_set.update_catch_trackers_all(time_id=time_id,
+                                            uncorrected_catch=uncorrected_catch,
+                                            corrected_catch=corrected_catch,
+                                            realised_competition=competitors_encountered[chosen_alternatives])
+
+        # Update grid cell trackers, the columns of the FleetState are the choice option indices
+        catch_per_alternative = np.bincount(chosen_alternatives, weights=corrected_catch,
+                                            minlength=fleet_state.nb_alternatives)
+        choice_set.catch_map += catch_per_alternative                                                                   # update tracker of the choice set for total catch in a choice option
+        choice_set.effort_map += effort                                                                                 # update tracker of the choice set for effort in a choice option
+        if 'nb_agents_visited' in choice_set.trackers:
+            choice_set.trackers['nb_agents_visited'][choice_set.trackers.time_step(time_id)] += effort
+
+    def update_choice_set_competition_trackers_all(self, choice_set, time_id):
+        """'vectorized' engine version of update_choice_set_competition_trackers, using the effort counts
+        of the last competition_correction_all call instead of correcting every choice option separately"""
+        correction, hypothetical_correction, _ = \
+            self.competition_instruction[self.competition_method]['correct_all'](self.relevant_data['effort_counts'])
+
+        time_step = choice_set.trackers.time_step(time_id)
+        if 'competition_correction' in choice_set.trackers:
+            choice_set.trackers['competition_correction'][time_step] = correction
+        if 'hypothetical_competition_correction' in choice_set.trackers:
+            choice_set.trackers['hypothetical_competition_correction'][time_step] = hypothetical_correction
+
+    def records_choice_set_competition_trackers(self, choice_set):
+        """returns if any of the competition trackers of the choice set is recorded"""
+        return 'competition_correction' in choice_set.trackers or \
+            'hypothetical_competition_correction' in choice_set.trackers
 
     def update_choice_set_competition_trackers(self, choice_set, time_id):
+        time_step = choice_set.trackers.time_step(time_id)
         for choice_id in choice_set.discrete_alternatives:
             corrected_catch, competitors_encountered, correction, hypothetical_correction = \
                 self.competition_instruction[self.competition_method]['correct'](choice_id, uncorrected_catch=1)
 
-            choice_set.competition_correction[time_id][choice_id] = correction
-            choice_set.hypothetical_competition_correction[time_id][choice_id] = hypothetical_correction
+            if 'competition_correction' in choice_set.trackers:
+                choice_set.trackers['competition_correction'][time_step, choice_id] = correction
+            if 'hypothetical_competition_correction' in choice_set.trackers:
+                choice_set.trackers['hypothetical_competition_correction'][time_step, choice_id] = \
+                    hypothetical_correction
 
     def __correct_absent(self, choice_id, uncorrected_catch):
         """empty function to prevent errors, does not correct catch in any way but adds a tag"""
@@ -211,13 +272,36 @@ class CompetitionHandler:
     def __correct_split_catch(self, choice_id, uncorrected_catch):
         """method to correct catch by dividing over the number of competitors, creates very strong competition"""
         number_of_competitors = self.relevant_data['effort_tracker'][choice_id]                                         # identify how many competitors forage in the same choice from the tracker variables
-        correction = 1/number_of_competitors
+        correction = 1/number_of_competitors if number_of_competitors > 0 else float('nan')                             # no correction is defined for choice options nobody foraged in (only asked for by the choice set trackers)
         hypothetical_correction = 1/(number_of_competitors + 1)
 
         corrected_catch = uncorrected_catch * correction                                                                # prone to DividedByZeroError, but as this method should never be called if no foraging occurs in a choice option, this should be a nice test for functioning
         competitors_encountered = number_of_competitors - 1                                                             # generate interference tag for later use in reporting
         return corrected_catch, competitors_encountered, correction, hypothetical_correction
 
+    def __correct_all_absent(self, effort):
+        """batch version of __correct_absent, returns the correction, hypothetical correction and
+        competitors encountered for every choice option given the effort in each choice option"""
+        correction = np.ones(len(effort))
+        hypothetical_correction = np.ones(len(effort))
+        competitors_encountered = np.full(len(effort), -99)                                                            # same tag as __correct_absent
+        return correction, hypothetical_correction, competitors_encountered
+
+    def __correct_all_interference_simple(self, effort):
+        """batch version of __correct_interference_simple"""
+        interference_factor = float(self.relevant_data['interference_factor'])                                          # float base, so the exponent of -1 for unvisited choice options is allowed
+        competitors_encountered = effort - 1
+        correction = np.power(interference_factor, competitors_encountered)
+        hypothetical_correction = np.power(interference_factor, effort)
+        return correction, hypothetical_correction, competitors_encountered
+
+    def __correct_all_split_catch(self, effort):
+        """batch version of __correct_split_catch, the correction of unvisited choice options is not defined (nan)"""
+        correction = np.divide(1, effort, out=np.full(len(effort), np.nan), where=effort > 0)
+        hypothetical_correction = 1 / (effort + 1)
+        competitors_encountered = effort - 1
+        return correction, hypothetical_correction, competitors_encountered
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 # --------------------- Methods to reset the saved content to start from empty relevant data--------------------------
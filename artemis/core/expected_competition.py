@@ -0,0 +1,76 @@
+"""
+This Module is used to calculate the average number of competitors every agent expects to meet when choosing a choice
+option (ExpectedCompetition object), as recorded in the 'average_expected_competitors' tracker of an AgentFleet.
+
+The chance that agent i chooses choice option j follows from its heatmap H and explore probability e:
+    P_ij = (1 - e_i) * H_ij / sum_j(H_ij) + e_i / n_options
+and the average number of competitors agent i expects is the chance of meeting every other agent, averaged over all
+choice options:
+    sum_j(P_ij * (T_j - P_ij)) / n_options,     with T_j = sum_i(P_ij) the expected number of agents in option j
+
+The ExpectedCompetition object keeps P, T and the self encounters sum_j(P_ij^2) between time steps, and only
+recomputes the rows of the agents whose heatmap has changed, adjusting the running column totals T by the change of
+those rows. If most rows have changed, everything is recomputed at once, which is as cheap and keeps the running
+totals from drifting
+
+Module inputs:
+-   the heatmaps and explore probabilities of the agents in an AgentFleet from agents.py
+
+Module Usage:
+-   agents.py uses the module to update the average expected competitors tracker of an AgentFleet
+
+Last Updated:
+    18-10-2026
+
+Version Number:
+    0.1
+"""
+
+import numpy as np
+
+
+class ExpectedCompetition:
+    """Class to keep the choice probabilities of all agents, and recompute only the rows of changed heatmaps"""
+
+    def __init__(self, explore_probability, full_update_fraction=0.5):
+        self.explore_probability = np.asarray(explore_probability, dtype=np.float64)[:, np.newaxis]                     # explore probability of every agent (row)
+        self.nb_agents = len(self.explore_probability)
+        self.full_update_fraction = full_update_fraction                                                                # recompute all rows if at least this fraction of the rows has changed
+        self.prob_matrix = None                                                                                         # chance of every agent (row) choosing every choice option (column)
+        self.option_totals = None                                                                                       # expected number of agents in every option
+        self.self_encounters = None                                                                                     # chance of an agent meeting itself, to disregard
+
+    def needs_full_update(self, nb_changed_rows):
+        """returns True if all rows should be recomputed, given the number of rows that have changed"""
+        return self.prob_matrix is None or nb_changed_rows >= self.full_update_fraction * self.nb_agents
+
+    def update_all(self, heatmaps):
+        """recomputes the choice probabilities of all agents from their heatmaps (a row per agent)"""
+        self.prob_matrix = self.__choice_probabilities(heatmaps, self.explore_probability)
+        self.option_totals = np.sum(self.prob_matrix, axis=0)
+        self.self_encounters = np.einsum('ij,ij->i', self.prob_matrix, self.prob_matrix)
+
+    def update_rows(self, rows, heatmaps):
+        """recomputes the choice probabilities of the agents in the given rows from their heatmaps (a row per given row)
+        and adjusts the expected number of agents in every option by the change"""
+        new_rows = self.__choice_probabilities(heatmaps, self.explore_probability[rows])
+        self.option_totals += np.sum(new_rows, axis=0) - np.sum(self.prob_matrix[rows], axis=0)
+        self.prob_matrix[rows] = new_rows
+        self.self_encounters[rows] = np.einsum('ij,ij->i', new_rows, new_rows)
+
+    def average_expected_competitors(self):
+        """returns the average number of competitors every agent expects to meet, without forming the agent x agent
+        encounter matrix"""
+        number_of_options = self.prob_matrix.shape[1]
+        return (self.prob_matrix @ self.option_totals - self.self_encounters) / number_of_options
+
+    @staticmethod
+    def __choice_probabilities(heatmaps, explore_probability):
+        """returns the chance of choosing every choice option, given the heatmaps and explore probabilities"""
+        number_of_options = heatmaps.shape[1]
+        prob_matrix = heatmaps / np.sum(heatmaps, axis=1, keepdims=True)                                                # divide heatmap entries by sum of entries to gain proportional weights as probability of choosing an option
+        prob_matrix *= (1 - explore_probability)                                                                        # correct for the fact that probability of choosing an option based on the heatmap is not 100%
+        prob_matrix += explore_probability/number_of_options                                                            # add the chance of choosing the option at random through exploration
+        return prob_matrix
+
+# EOF
@@ -0,0 +1,163 @@
+"""
+This Module is used to store the state of all ForagerAgents in an AgentFleet as a struct-of-arrays (FleetState object),
+instead of a separate heatmap dictionary for every single ForagerAgent.
+
+The FleetState object contains:
+-   an (n_agents, n_alternatives) float array with the heatmap (catch expectation) of every agent
+-   an (n_agents, n_alternatives) boolean array marking which heatmap entries an agent has knowledge on
+-   (n_agents,) arrays with the catchability coefficient and explore probability of every agent
+-   (n_agents, n_alternatives) arrays with the catch and effort of every agent in every choice option and
+    (n_agents,) and (n_agents, n_time_steps) arrays with the total catch and catch per time step of every agent
+-   the rows of the agents using each choice method, so choices can be made per choice method in a single batch
+
+Individual ForagerAgent objects access their own row of the FleetState through ArrayRowView objects, which behave
+like the heatmap dictionary and the catch and effort tracker dictionaries of the default ('dict') engine, so all
+existing agent functionality keeps working. The known mask is kept up to date by the KnownAlternatives of every agent
+
+Module inputs:
+-   the ids of the DiscreteAlternatives in a ChoiceSet object from choice_set.py to define the columns of the arrays
+
+Module Usage:
+-   agents.py uses the module as storage of the AgentFleet and ForagerAgent objects if the 'array' or 'vectorized'
+    engine is chosen
+-   choice_making.py uses the module to make the choices of all agents at once (FleetChoiceMaker)
+
+Last Updated:
+    18-10-2026
+
+Version Number:
+    0.1
+"""
+
+from collections.abc import MutableMapping
+import numpy as np
+
+
+class FleetState:
+    """Class to contain the state of all agents in a fleet as arrays, with one row per agent
+    and one column per choice option"""
+
+    def __init__(self, alternative_ids, initial_capacity=16):
+        self.alternative_ids = list(alternative_ids)                                                                    # column labels of the arrays
+        self.alternative_index = {alternative_id: column for column, alternative_id in enumerate(self.alternative_ids)} # lookup from choice option id to column
+        self.nb_alternatives = len(self.alternative_ids)
+        self.agent_ids = []                                                                                             # row labels of the arrays
+        self.agent_index = {}                                                                                           # lookup from agent id to row
+        self.nb_agents = 0
+        self.time_ids = []                                                                                              # column labels of the time step arrays, filled when finalized
+        self.time_index = {}                                                                                            # lookup from time step id to column
+
+        capacity = max(int(initial_capacity), 1)
+        self.heatmap = np.zeros((capacity, self.nb_alternatives), dtype=np.float64)                                     # catch expectation of every agent in every choice option
+        self.known = np.zeros((capacity, self.nb_alternatives), dtype=bool)                                             # mask of the heatmap entries an agent has knowledge on
+        self.catchability = np.zeros(capacity, dtype=np.float64)                                                        # catchability coefficient of every agent
+        self.explore_probability = np.zeros(capacity, dtype=np.float64)                                                 # explore probability of every agent
+        self.forage_catch = np.zeros((capacity, self.nb_alternatives), dtype=np.float64)                                # total catch of every agent from every choice option
+        self.forage_effort = np.zeros((capacity, self.nb_alternatives), dtype=np.int64)                                 # number of visits of every agent to every choice option
+        self.total_catch = np.zeros(capacity, dtype=np.float64)                                                         # total catch of every agent
+        self.time_step_catch = np.zeros((capacity, 0), dtype=np.float64)                                                # catch of every agent in every time step, sized when finalized
+        self.choice_methods = []                                                                                        # choice method of every agent
+        self.choice_method_rows = {}                                                                                    # rows of the agents per choice method, filled when finalized
+        self._finalized = False
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------------------ Methods to set up the FleetState ------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def add_agent(self, agent_id, catchability_coefficient, explore_probability, choice_method='random'):
+        """reserves a row for a new agent and returns the index of that row"""
+        if self._finalized:
+            raise ValueError('FleetState already finalized; cannot add more agents.')
+
+        if self.nb_agents == len(self.catchability):                                                                    # grow the arrays by doubling, so adding agents one by one stays cheap
+            self.__resize(2 * len(self.catchability))
+
+        row = self.nb_agents
+        self.agent_ids.append(agent_id)
+        self.agent_index[agent_id] = row
+        self.catchability[row] = catchability_coefficient
+        self.explore_probability[row] = explore_probability
+        self.choice_methods.append(choice_method)
+        self.nb_agents += 1
+        return row
+
+    def finalize(self, time_ids=()):
+        """trims the arrays to the number of agents added and sizes the time step arrays,
+        after which no more agents can be added"""
+        self.__resize(self.nb_agents)
+        self.time_ids = list(time_ids)
+        self.time_index = {time_id: column for column, time_id in enumerate(self.time_ids)}
+        self.time_step_catch = np.zeros((self.nb_agents, len(self.time_ids)), dtype=np.float64)
+        choice_methods = np.array(self.choice_methods, dtype=object)
+        self.choice_method_rows = {choice_method: np.flatnonzero(choice_methods == choice_method)
+                                   for choice_method in dict.fromkeys(self.choice_methods)}
+        self._finalized = True
+
+    def __resize(self, capacity):
+        self.heatmap = self.__resized(self.heatmap, capacity)
+        self.known = self.__resized(self.known, capacity)
+        self.catchability = self.__resized(self.catchability, capacity)
+        self.explore_probability = self.__resized(self.explore_probability, capacity)
+        self.forage_catch = self.__resized(self.forage_catch, capacity)
+        self.forage_effort = self.__resized(self.forage_effort, capacity)
+        self.total_catch = self.__resized(self.total_catch, capacity)
+        self.time_step_catch = self.__resized(self.time_step_catch, capacity)
+
+    def __resized(self, array, capacity):
+        resized = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        resized[:self.nb_agents] = array[:self.nb_agents]
+        return resized
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------------------ Methods to access the FleetState ------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def heatmap_view(self, agent_index):
+        """returns a dictionary-like view on the heatmap row of a single agent,
+        which choice options the agent has knowledge on is kept in the known mask"""
+        return ArrayRowView(self, 'heatmap', agent_index, 'alternative')
+
+    def alternative_view(self, array_name, agent_index):
+        """returns a dictionary-like view, keyed by choice option id, on the row of a single agent in an array"""
+        return ArrayRowView(self, array_name, agent_index, 'alternative')
+
+    def time_view(self, array_name, agent_index):
+        """returns a dictionary-like view, keyed by time step id, on the row of a single agent in an array"""
+        return ArrayRowView(self, array_name, agent_index, 'time')
+
+
+class ArrayRowView(MutableMapping):
+    """Dictionary-like view on a single row of a FleetState array, keyed by choice option id or time step id.
+    Arrays are looked up by name on every access, so views stay valid when the FleetState arrays grow"""
+
+    __slots__ = ('_state', '_array_name', '_row', '_labels_name', '_index_name')
+
+    def __init__(self, fleet_state, array_name, agent_index, axis='alternative'):
+        self._state = fleet_state
+        self._array_name = array_name
+        self._row = agent_index
+        self._labels_name = axis + '_ids'
+        self._index_name = axis + '_index'
+
+    def _column(self, key):
+        return getattr(self._state, self._index_name)[key]
+
+    def __getitem__(self, key):
+        return getattr(self._state, self._array_name)[self._row, self._column(key)].item()
+
+    def __setitem__(self, key, value):
+        getattr(self._state, self._array_name)[self._row, self._column(key)] = value
+
+    def __delitem__(self, key):
+        getattr(self._state, self._array_name)[self._row, self._column(key)] = 0
+
+    def __iter__(self):
+        return iter(getattr(self._state, self._labels_name))
+
+    def __len__(self):
+        return len(getattr(self._state, self._labels_name))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(self))
+
+# EOF
@@ -0,0 +1,110 @@
+"""
+This Module is used to keep search trees over the entries of an agent heatmap, so choices based on the heatmap do not
+need to go over all choice options for every decision. A tree is updated for every single heatmap entry that changes,
+instead of being rebuilt from the full heatmap:
+-   FenwickSampler      a Fenwick (binary indexed) tree over the heatmap entries as weights, to draw a choice option
+                        with a probability proportional to its heatmap entry
+-   MaxTree             a tournament tree over the heatmap entries, to find the choice option with the largest entry
+
+Updating an entry takes O(log n_options) time for both trees, drawing a choice option O(log n_options) time and
+finding the largest entry O(1) time, against O(n_options) when all entries are gone over for every decision
+
+Module inputs:
+-   the heatmap entries of a ForagerAgent, in choice set order
+
+Module Usage:
+-   choice_making.py uses the module for the heatmap choice methods of the ChoiceMaker
+
+Last Updated:
+    18-10-2026
+
+Version Number:
+    0.1
+"""
+
+
+class FenwickSampler:
+    """Class to draw indices with a probability proportional to their (non-negative) weight, from a Fenwick tree"""
+
+    __slots__ = ('weights', 'tree', 'size', 'top_step')
+
+    def __init__(self, weights):
+        self.weights = [float(weight) for weight in weights]                                                            # weight of every index
+        self.size = len(self.weights)
+        self.tree = [0.0] + self.weights                                                                                # tree[i] holds the sum of the weights of indices (i - lowest set bit of i, i], 1-based
+        for i in range(1, self.size + 1):                                                                               # build the tree in O(n) by adding every node to its parent
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+        self.top_step = 1 << (self.size.bit_length() - 1) if self.size else 0                                           # largest power of 2 within the size, first step of the search
+
+    def update(self, index, weight):
+        """sets the weight of an index"""
+        weight = float(weight)
+        delta = weight - self.weights[index]
+        if delta == 0:
+            return
+        self.weights[index] = weight
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def total(self):
+        """returns the sum of all weights"""
+        total = 0.0
+        i = self.size
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def sample(self, random_number):
+        """returns the index at the position random_number (in [0, 1)) of the cumulative weights: the first index for
+        which the sum of the weights up to and including that index exceeds random_number * total weight"""
+        total = self.total()
+        if not total > 0:
+            raise ValueError('Total of weights must be greater than zero')
+        target = random_number * total
+        position = 0
+        step = self.top_step
+        while step:
+            next_position = position + step
+            if next_position <= self.size and self.tree[next_position] <= target:
+                position = next_position
+                target -= self.tree[next_position]
+            step >>= 1
+        return min(position, self.size - 1)                                                                             # rounding may put the target beyond the last index
+
+
+class MaxTree:
+    """Class to find the index with the largest value, from a tournament tree in which every node holds the index that
+    wins the match between its two children. Ties resolve to the lowest index, as max() over a sequence does"""
+
+    __slots__ = ('values', 'winners', 'leaves')
+
+    def __init__(self, values):
+        self.values = [float(value) for value in values]                                                                # value of every index
+        self.leaves = 1 << max(len(self.values) - 1, 0).bit_length()                                                    # number of leaves, a power of 2 of at least the number of values
+        self.values += [float('-inf')] * (self.leaves - len(self.values))                                               # padding leaves never win from a real index
+        self.winners = [0] * self.leaves + list(range(self.leaves))                                                     # node i has children 2i and 2i + 1, the leaves start at node self.leaves
+        for node in range(self.leaves - 1, 0, -1):
+            self.winners[node] = self.__match(self.winners[2 * node], self.winners[2 * node + 1])
+
+    def update(self, index, value):
+        """sets the value of an index, and replays the matches on the path from its leaf to the root"""
+        self.values[index] = float(value)
+        node = (self.leaves + index) >> 1
+        while node:
+            self.winners[node] = self.__match(self.winners[2 * node], self.winners[2 * node + 1])
+            node >>= 1
+
+    def argmax(self):
+        """returns the (lowest) index with the largest value"""
+        return self.winners[1] if self.leaves > 1 else 0
+
+    def __match(self, left, right):
+        """returns the winner of two indices, the left index is always the lowest so it wins ties"""
+        return left if self.values[left] >= self.values[right] else right
+
+# EOF
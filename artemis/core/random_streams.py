@@ -0,0 +1,88 @@
+"""
+This Module is used to provide every component of the model that draws random numbers (e.g. the ChoiceMaker objects,
+the AgentOrderer) with its own independent stream of random numbers, instead of the global random and numpy.random
+states. All streams of an iteration are spawned from a single numpy.random.SeedSequence, so an iteration gives the
+same results for the same seed, regardless of what other iterations (in the same or other processes) draw.
+
+Every stream (RandomStream object) wraps a numpy Generator, which is used directly for batched (array) draws, and
+draws uniform numbers from it in batches to offer the per call functions of the random module (random, choice,
+choices, shuffle) at a comparable cost per call.
+
+Module inputs:
+-   a seed (or numpy.random.SeedSequence) per iteration, see artemis.py
+
+Module Usage:
+-   artemis.py makes the RandomStreams of an iteration
+-   agents.py hands the streams to the ForagerAgent objects and their ChoiceMaker and HeatmapExchanger objects, and to
+    the AgentOrderer, GroupFormer and SocialNetwork objects
+-   choice_set.py draws the (reset) stocks of the choice options from its stream
+-   tracing.py samples the agent events it captures with its stream
+
+Last Updated:
+    18-10-2026
+
+Version Number:
+    0.1
+"""
+
+from bisect import bisect
+from itertools import accumulate
+import numpy as np
+
+COMPONENTS = ('choice_set', 'agents', 'allegiances', 'agent_ordering', 'choice_making', 'sharing', 'tracing',           # components with their own stream, the order fixes which child seed every component gets
+              'social_network')                                                                                         # new components are added at the end, so the streams of the others stay the same
+
+
+class RandomStreams:
+    """Class to contain an independent RandomStream for every component of the model in an iteration"""
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = np.random.randint(np.iinfo(np.int32).max)                                                            # drawn from the global numpy random state, so seeding numpy keeps runs reproducible
+        seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.streams = {component: RandomStream(np.random.default_rng(child_seed))
+                        for component, child_seed in zip(COMPONENTS, seed_sequence.spawn(len(COMPONENTS)))}
+
+    def __getitem__(self, component):
+        return self.streams[component]
+
+
+class RandomStream:
+    """Class to draw random numbers from a numpy Generator, with the per call functions of the random module.
+    Uniform numbers are drawn from the Generator in batches of batch_size"""
+
+    def __init__(self, generator=None, batch_size=1024):
+        if generator is None:
+            generator = np.random.default_rng(np.random.randint(np.iinfo(np.int32).max))                                # drawn from the global numpy random state, so seeding numpy keeps runs reproducible
+        self.generator = generator                                                                                      # numpy Generator, also used directly for batched draws
+        self.batch_size = batch_size
+        self.__batch = []                                                                                               # uniform numbers drawn but not used yet, used from the end
+
+    def random(self):
+        """returns a random number in [0, 1)"""
+        if not self.__batch:
+            self.__batch = self.generator.random(self.batch_size).tolist()
+        return self.__batch.pop()
+
+    def choice(self, sequence):
+        """returns a random element of a non-empty sequence"""
+        if not sequence:
+            raise IndexError('Cannot choose from an empty sequence')
+        return sequence[int(self.random() * len(sequence))]
+
+    def choices(self, population, weights, k=1):
+        """returns a list of k elements of the population, chosen with replacement with the given (relative) weights"""
+        cumulative_weights = list(accumulate(weights))
+        total = cumulative_weights[-1]
+        if not total > 0:
+            raise ValueError('Total of weights must be greater than zero')
+        last = len(cumulative_weights) - 1
+        return [population[bisect(cumulative_weights, self.random() * total, 0, last)] for _ in range(k)]
+
+    def shuffle(self, sequence):
+        """shuffles a mutable sequence in place (Fisher-Yates)"""
+        for i in range(len(sequence) - 1, 0, -1):
+            j = int(self.random() * (i + 1))
+            sequence[i], sequence[j] = sequence[j], sequence[i]
+
+# EOF
@@ -20,16 +20,21 @@ Last Updated:
 Version Number:
     0.1
 """
-import random
 import copy
+import numpy as np
+from artemis.core.random_streams import RandomStream
+from artemis.io.output.tracing import Tracer
 
 class HeatmapExchanger:
 
     def __init__(self, agent,
                  sharing_strategy='random_sharing', receiving_strategy='stubborn_receiver',
                  pick_receiver_strategy='random_choice',
-                 number_of_shared_alternatives=1, number_of_agents_shared_with=1):
+                 number_of_shared_alternatives=1, number_of_agents_shared_with=1, random_stream=None,
+                 tracer=None):
 
+        self.random_stream = RandomStream() if random_stream is None else random_stream                                 # stream of random numbers to pick receivers and shared data with
+        self.tracer = Tracer() if tracer is None else tracer                                                            # object reporting the data shared
         self.sharing_strategy = sharing_strategy
         self.pick_receiver_strategy = pick_receiver_strategy
         self.receiving_strategy = receiving_strategy
@@ -37,8 +42,7 @@ class HeatmapExchanger:
         self.relevant_data = {}                                                                                         # initialise empty data for functionality
         self.relevant_data = self.__init_relevant_data(agent,                                                           # fill relevant data with the data accessed from other objects
                                                        number_of_shared_alternatives,
-                                                       number_of_agents_shared_with,
-                                                       other_agent_indices=tuple())
+                                                       number_of_agents_shared_with)
 
 # ----------------------------------------------------------------------------------------------------------------------
 # -------------------------------------------- Define General Functionality --------------------------------------------
@@ -76,7 +80,12 @@ class HeatmapExchanger:
                         "static_group_choice":
                             {
                                 'init': self.__init_other_agents_static_group_choice,
-                                'execute': self.__pick_receiver_random
+                                'execute': self.__pick_receiver_group_member
+                            },
+                        "network_choice":
+                            {
+                                'init': self.__init_other_agents_network_choice,
+                                'execute': self.__pick_receiver_neighbour
                             }
                         # INSERT FURTHER RECEIVER PICKING FUNCTIONALITY HERE
                     },
@@ -118,7 +127,7 @@ class HeatmapExchanger:
 # --------------------------- Initialisation of Strategy Specific Sharing Functionality --------------------------------
 # ----------------------------------------------------------------------------------------------------------------------
 
-    def __init_relevant_data(self, agent, number_of_shared_alternatives, number_of_agents_shared_with, other_agent_indices):
+    def __init_relevant_data(self, agent, number_of_shared_alternatives, number_of_agents_shared_with):
         """returns references to all data/attributes from other objects needed to share or receive data"""
         self.relevant_data['agent_id'] = agent.id
         sharing_relevant = self.functionality['sharing'][self.sharing_strategy]['init'](agent)                          # generate references to the relevant data for the specified sharing strategy
@@ -141,7 +150,7 @@ class HeatmapExchanger:
         relevant_data = dict()
         relevant_data['agent_id'] = agent.id
         relevant_data['heatmap'] = agent.heatmap
-        relevant_data['known_alternatives'] = agent.list_of_known_alternatives
+        relevant_data['known_alternatives'] = agent.known_alternatives
         return relevant_data
 
     def __init_relevant_last_event_sharing(self, agent):
@@ -158,7 +167,7 @@ class HeatmapExchanger:
         relevant_data['agent_id'] = agent.id
         relevant_data['heatmap'] = agent.heatmap
         relevant_data['group_allegiance'] = "NOT IMPLEMENTED"
-        relevant_data['known_alternatives'] = agent.list_of_knowns_alternatives
+        relevant_data['known_alternatives'] = agent.known_alternatives
         return relevant_data
 
     def __init_relevant_external_parameters(self, number_of_alternatives_shared=1, number_of_agents_shared_with=1):
@@ -171,21 +180,18 @@ class HeatmapExchanger:
 # ----------------------------------------------------------------------------------------------------------------------
 
     def __init_other_agents_random_pick(self, agent_set):
-        """Methods for initiliazing a list of agents to pick from"""
-        list_of_agents = list(agent_set.agents.keys())                                                                  # agents to pick as receiver include all agents
-        self.relevant_data['other_agent_indices'] = \
-            [x for x in list_of_agents if x is not self.relevant_data['agent_id']]                                      # exclude agent itself as potential receiver and load result into relevant data
+        """Methods for initiliazing the agents to pick from: all agent indices except the agent itself"""
+        self.relevant_data['receiver_pool'] = range(len(agent_set.agents))                                              # agents to pick as receiver include all agents, no list is stored per agent
+        self.relevant_data['pool_position'] = self.relevant_data['agent_id']                                            # position of the agent itself in the pool, skipped when picking a receiver
 
     def __init_other_agents_static_group_choice(self, agent_set):
-        input_data = agent_set.group_former.relevant_data                                                               # access the data in contained in the GroupFormer object
-        personal_id = self.relevant_data['agent_id']                                                                    # access personal id
-        personal_allegiance = input_data['personal_allegiances'][personal_id]                                           # identify which group the agent belongs to
-        group_memberships = input_data['overview_allegiances']                                                          # access data with what agents belong to what groups
-        list_of_agents = group_memberships[personal_allegiance]                                                         # identify what agents belong to the group the agent belongs to
+        """the agents to pick from are the other members of the group of the agent, as kept by the GroupFormer, so
+        moves between groups are followed without updating the agents"""
+        self.relevant_data['group_former'] = agent_set.group_former
 
-        self.relevant_data['other_agent_indices'] = \
-            [x for x in list_of_agents if x is not self.relevant_data['agent_id']]                                      # exclude agent itself as potential receiver and load result into relevant data
-        self.relevant_data['group_allegiance'] = personal_allegiance
+    def __init_other_agents_network_choice(self, agent_set):
+        """the agents to pick from are the neighbours of the agent in the social network of the agent set"""
+        self.relevant_data['receiver_pool'] = agent_set.social_network.neighbours(self.relevant_data['agent_id'])       # view on the links of the network, no list is stored per agent
 
 # ----------------------------------------------------------------------------------------------------------------------
 # -------------------------- Initialisation of Strategy Specific Receiving Functionality -------------------------------
@@ -198,16 +204,22 @@ class HeatmapExchanger:
     def __init_relevant_willing_receiver(self, agent):
         relevant_data = dict()
         relevant_data['heatmap'] = agent.heatmap
+        relevant_data['known_alternatives'] = agent.known_alternatives
+        relevant_data['mark_heatmap_changed'] = agent.mark_heatmap_changed
         return relevant_data
 
     def __init_relevant_combine_receiver(self, agent):
         relevant_data = dict()
         relevant_data['heatmap'] = agent.heatmap
+        relevant_data['known_alternatives'] = agent.known_alternatives
+        relevant_data['mark_heatmap_changed'] = agent.mark_heatmap_changed
         return relevant_data
 
     def __init_relevant_stubborn_receiver(self, agent):
         relevant_data = dict()
         relevant_data['heatmap'] = agent.heatmap
+        relevant_data['known_alternatives'] = agent.known_alternatives
+        relevant_data['mark_heatmap_changed'] = agent.mark_heatmap_changed
         return relevant_data
 
     def __init_relevant_recency_receiver(self, agent):
@@ -219,7 +231,9 @@ class HeatmapExchanger:
 # ---------------------------------------  Main Method to Provide Heatmap Data ----------------------------------------
 # ----------------------------------------------------------------------------------------------------------------------
 
-    def provide_data(self, agent_set):
+    def provide_data(self, agent_set, write_buffer=None):
+        """shares data with the picked receiver(s). If a write_buffer (list) is given, the shared data is appended to it
+        as (receiver id, shared data) instead of being received at once, so it can be merged after all agents shared"""
         share_partner_counter = 0                                                                                       # initialise counter to loop over the agents data will be shared to
         while share_partner_counter < self.relevant_data['number_of_agents_shared_with']:                               # loop over all agents that are picked to receive data
 
@@ -230,13 +244,21 @@ class HeatmapExchanger:
 #                                                               self.sharing_strategy))
             shared_data = self.functionality['sharing'][self.sharing_strategy]['execute']()                             # pick data to be given to the considered receiver agent
 #
-            receiver_agent = agent_set.agents[picked_receiver].heatmap_exchanger                                        # shorten the reference to the receiver agents Heatmap exchanger tool for visual aid in the script
-#            print('<{}> Receiving data according to <{}>'.format(receiver_agent.relevant_data['agent_id'],
-#                                                                 receiver_agent.receiving_strategy))
-            receiver_agent.functionality['receiving'][receiver_agent.receiving_strategy]['execute'](shared_data)        # make the receiver agent accept/reject the given data based on their receiving strategy
+            if write_buffer is not None:
+                write_buffer.append((picked_receiver, shared_data))                                                     # the receiver accepts/rejects the data when the buffer is merged
+            else:
+                receiver_agent = agent_set.agents[picked_receiver].heatmap_exchanger                                    # shorten the reference to the receiver agents Heatmap exchanger tool for visual aid in the script
+#                print('<{}> Receiving data according to <{}>'.format(receiver_agent.relevant_data['agent_id'],
+#                                                                     receiver_agent.receiving_strategy))
+                receiver_agent.receive_data(shared_data)                                                                # make the receiver agent accept/reject the given data based on their receiving strategy
 
             self.__save_received_timestamp(shared_data)                                                                 # TODO: CHECK WHAT I WANTED TO DO HERE
             share_partner_counter += 1                                                                                  # proceed to pick next receiver agent and the data to be shared with that agent (if more than 1 share agent)
+
+    def receive_data(self, shared_data):
+        """accepts/rejects the data shared by another agent, based on the receiving strategy"""
+        self.functionality['receiving'][self.receiving_strategy]['execute'](shared_data)
+
 # ----------------------------------------------------------------------------------------------------------------------
 # ----------------------------------------  Strategy Choice for Data Sharing -------------------------------------------
 # ----------------------------------------------------------------------------------------------------------------------
@@ -256,7 +278,7 @@ class HeatmapExchanger:
             raise TypeError("number can only be an integer or ALL")
 
         elif self.relevant_data['number_of_shared_alternatives'] == 'ALL':                                              # share all data
-            shared_alternatives_indices = self.relevant_data['known_alternatives']                                      # to be shared indices are all indices memory has an entry on
+            shared_alternatives_indices = list(self.relevant_data['known_alternatives'])                                # to be shared indices are all indices memory has an entry on
             for alternative in shared_alternatives_indices:
                 shared_alternatives_data.append(self.relevant_data['heatmap'][alternative])
 
@@ -268,12 +290,12 @@ class HeatmapExchanger:
 
             # set number of alternatives to be shared, including uncertainties in this number
             number_of_shared_alternatives = certain_shares
-            if random.random() < probability_share_additional:                                                          # check if a ranomd number between 0 and 1 is larger than the probability of sharing an extra alternative
+            if self.random_stream.random() < probability_share_additional:                                              # check if a ranomd number between 0 and 1 is larger than the probability of sharing an extra alternative
                 number_of_shared_alternatives += 1                                                                      # share another alternative
 
             alternative_counter = 0
             while alternative_counter < number_of_shared_alternatives:
-                shared_alternative = random.choice(self.relevant_data['known_alternatives'])                            # pick a random choice option index the agents memory has an entry on
+                shared_alternative = self.random_stream.choice(self.relevant_data['known_alternatives'])                # pick a random choice option index the agents memory has an entry on
                 if shared_alternative not in shared_alternatives_indices:                                               # check if we are not already sharing this choice option
                     shared_alternatives_indices.append(shared_alternative)                                              # attach the choice option index from the randomly chosen entry
                     shared_alternatives_data.append(self.relevant_data['heatmap'][shared_alternative])                  # attach the choice option contents from the randomly chosen entry
@@ -283,7 +305,9 @@ class HeatmapExchanger:
 
     def __share_last_event_sharing(self):
         shared_alternatives = copy.deepcopy(self.relevant_data['choice_maker'].last_choice_id)
-        print('{} is now sharing last forage event data on {}'.format(self.relevant_data['agent_id'], shared_alternatives))
+        if self.tracer.traces_agents:
+            self.tracer.event('agent', 'share', '{agent_id} is now sharing last forage event data on {alternative_id}',
+                              agent_id=self.relevant_data['agent_id'], alternative_id=shared_alternatives)
         shared_alternative_data = self.relevant_data['heatmap'][shared_alternatives]
         return tuple((tuple([shared_alternatives]), tuple([shared_alternative_data])))
 
@@ -292,7 +316,29 @@ class HeatmapExchanger:
 # ----------------------------------------------------------------------------------------------------------------------
 
     def __pick_receiver_random(self):
-        receiver_agent = random.choice(self.relevant_data['other_agent_indices'])
+        """picks a random agent from the receiver pool other than the agent itself, by drawing a position among the
+        other agents and shifting it past the position of the agent itself"""
+        receiver_pool = self.relevant_data['receiver_pool']
+        if len(receiver_pool) < 2:
+            raise IndexError('Cannot choose from an empty sequence')
+        picked_position = int(self.random_stream.random() * (len(receiver_pool) - 1))                                   # as RandomStream.choice over the other agents
+        if picked_position >= self.relevant_data['pool_position']:
+            picked_position += 1
+        receiver_agent = receiver_pool[picked_position]
+        return receiver_agent
+
+    def __pick_receiver_group_member(self):
+        """picks a random agent from the other members of the group of the agent"""
+        receiver_agent = self.relevant_data['group_former'].pick_other_member(self.relevant_data['agent_id'],
+                                                                              self.random_stream.random())
+        return receiver_agent
+
+    def __pick_receiver_neighbour(self):
+        """picks a random agent from the neighbours of the agent, which never include the agent itself"""
+        receiver_pool = self.relevant_data['receiver_pool']
+        if len(receiver_pool) == 0:
+            raise IndexError('Cannot choose from an empty sequence')
+        receiver_agent = receiver_pool[int(self.random_stream.random() * len(receiver_pool))].item()
         return receiver_agent
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -314,6 +360,8 @@ class HeatmapExchanger:
             received_index = received_alternative_indices[received_counter]                                             # get index of a single shared choice option
             received_data = received_alternative_data[received_counter]
             self.relevant_data['heatmap'][received_index] = received_data                                           # fill the empty choice option entry with the received data
+            self.relevant_data['known_alternatives'].add(received_index)
+            self.relevant_data['mark_heatmap_changed'](received_index)                                                  # let the agent know the heatmap entry has changed
 
             received_counter += 1
 
@@ -332,13 +380,14 @@ class HeatmapExchanger:
             received_data = received_alternative_data[received_counter]                                                 # get contents of a single shared choice option
 
             # add knowledge if the alternative is unknown
-            if isinstance(self.relevant_data['heatmap'][received_index], int):                                          # check if the receiving agent already has an entry for that choice: NO
+            if self.relevant_data['known_alternatives'].add(received_index):                                            # check if the receiving agent already has an entry for that choice: NO
                 self.relevant_data['heatmap'][received_index] = received_data                                           # fill the empty choice option entry with the received data
 
             # When the receiving agent already has knowledge on the shared knowledge, take the average of both
-            elif isinstance(self.relevant_data['heatmap'][received_index], float):                                      # check if the receiving agent already has an entry for that choice: YES
+            else:                                                                                                       # the receiving agent already has an entry for that choice
                 self.relevant_data['heatmap'][received_index] = \
                     (received_data + self.relevant_data['heatmap'][received_index])/2                                   # take average of newly shared data and the information already known from other data
+            self.relevant_data['mark_heatmap_changed'](received_index)                                                  # let the agent know the heatmap entry has changed
 
             received_counter += 1
 
@@ -354,8 +403,9 @@ class HeatmapExchanger:
             received_data = received_alternative_data[received_counter]                                                 # get contents of a single shared choice option
 
             # add knowledge if the alternative is unknown
-            if isinstance(self.relevant_data['heatmap'][received_index], int):                                          # check if the receiving agent already has an entry for that choice: NO
+            if self.relevant_data['known_alternatives'].add(received_index):                                            # check if the receiving agent already has an entry for that choice: NO
                 self.relevant_data['heatmap'][received_index] = received_data
+                self.relevant_data['mark_heatmap_changed'](received_index)                                              # let the agent know the heatmap entry has changed
 
             received_counter += 1
 
@@ -370,3 +420,278 @@ class HeatmapExchanger:
 
     def __save_received_timestamp(self, shared_data):  # TODO IMPLEMENTED AGE OF MEMORY FUNCTIONALITY
         pass
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Batched heatmap exchange for all agents in a FleetState at once
+# ----------------------------------------------------------------------------------------------------------------------
+
+class FleetHeatmapExchanger:
+    """Exchanges the heatmap data of all agents in a FleetState in a single batch, using numpy.
+    All (sender, receiver, choice option) triples of a time step are drawn at once and the receiving strategies are
+    applied as scatter operations on the heatmap array. Shared data is read from the heatmaps as they are at the start
+    of the exchange, so data received in a time step is only passed on in the next time step. Where several senders
+    share the same choice option with a receiver, they are applied in the order of the agents, as in HeatmapExchanger"""
+
+    def __init__(self):
+        self.functionality = self.__init_functionality()
+        self.relevant_data = {}                                                                                         # settings and receiver pools of all agents, filled by prepare
+
+    def __init_functionality(self):
+        """define a dictionary with the batched version of every sharing, receiver picking and receiving strategy
+        supported by the HeatmapExchanger"""
+        functionality = \
+            {
+                "sharing":
+                    {
+                        "no_sharing": self.__share_all_no_sharing,
+                        "random_sharing": self.__share_all_random_sharing,
+                        "last_event_sharing": self.__share_all_last_event_sharing
+                        # INSERT FURTHER SHARING FUNCTIONALITY HERE
+                    },
+                "pick_receiver":
+                    {
+                        "random_choice": self.__init_pools_random_choice,
+                        "static_group_choice": self.__init_pools_static_group_choice,
+                        "network_choice": self.__init_pools_network_choice
+                        # INSERT FURTHER RECEIVER PICKING FUNCTIONALITY HERE
+                    },
+                "receiving":
+                    {
+                        "no_receiver": self.__receive_all_no_receiver,
+                        "willing_receiver": self.__receive_all_willing_receiver,
+                        "combine_receiver": self.__receive_all_combine_receiver,
+                        "stubborn_receiver": self.__receive_all_stubborn_receiver,
+                        "recency_receiver": self.__receive_all_no_receiver                                              # UNIMPLEMENTED, as in HeatmapExchanger
+                        # INSERT FURTHER RECEIVING FUNCTIONALITY HERE
+                    }
+            }
+        return functionality
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Initialisation of the settings of all agents
+# ----------------------------------------------------------------------------------------------------------------------
+    def prepare(self, agent_set):
+        """loads the sharing settings of every agent (row) in the FleetState of the agent_set, and the agents every
+        agent may pick as receiver, after the group allegiances of the agent_set are set"""
+        exchangers = [agent_set.agents[agent_id].heatmap_exchanger for agent_id in agent_set.fleet_state.agent_ids]
+        for kind, attribute in (('sharing', 'sharing_strategy'), ('pick_receiver', 'pick_receiver_strategy'),
+                                ('receiving', 'receiving_strategy')):
+            strategies = [getattr(exchanger, attribute) for exchanger in exchangers]
+            unsupported = set(strategies) - set(self.functionality[kind])
+            if unsupported:
+                raise NotImplementedError('{} strategies {} are not supported in a batch, supported strategies are:\t{}'
+                                          .format(kind, sorted(unsupported), list(self.functionality[kind].keys())))
+            strategy_array = np.array(strategies, dtype=object)
+            self.relevant_data[kind] = {strategy: np.flatnonzero(strategy_array == strategy)
+                                        for strategy in dict.fromkeys(strategies)}                                      # rows of the agents per strategy
+
+        number_of_shared = [exchanger.relevant_data['number_of_shared_alternatives'] for exchanger in exchangers]
+        for number in number_of_shared:
+            if not isinstance(number, (int, float)) and number != 'ALL':
+                raise TypeError("number can only be an integer or ALL")
+        self.relevant_data['share_all'] = np.array([number == 'ALL' for number in number_of_shared])
+        self.relevant_data['number_of_shared_alternatives'] = \
+            np.array([0 if number == 'ALL' else number for number in number_of_shared], dtype=np.float64)
+        number_of_receivers = [exchanger.relevant_data['number_of_agents_shared_with'] for exchanger in exchangers]
+        self.relevant_data['number_of_agents_shared_with'] = np.ceil(number_of_receivers).astype(np.int64)              # agents keep sharing while their counter is below the number, as in HeatmapExchanger
+
+        pools = []                                                                                                      # the agents every agent may pick as receiver, as (members, position of the agent itself or number of members if it is not a member) per agent
+        nb_agents = agent_set.fleet_state.nb_agents
+        pool_of_agent = [None] * nb_agents
+        for strategy, rows in self.relevant_data['pick_receiver'].items():
+            for row, pool in self.functionality['pick_receiver'][strategy](agent_set, rows):
+                pool_of_agent[row] = pool
+        self.relevant_data['pool_start'] = np.zeros(nb_agents, dtype=np.int64)
+        self.relevant_data['pool_size'] = np.zeros(nb_agents, dtype=np.int64)
+        self.relevant_data['pool_position'] = np.zeros(nb_agents, dtype=np.int64)
+        self.relevant_data['picks_group_member'] = np.array([pool is None for pool in pool_of_agent], dtype=bool)       # receivers picked from the groups of the GroupFormer
+        pool_starts = {}                                                                                                # start of every distinct pool in the concatenated members
+        nb_members = 0
+        for row, pool in enumerate(pool_of_agent):
+            if pool is None:
+                continue
+            members, position = pool
+            if id(members) not in pool_starts:
+                pool_starts[id(members)] = nb_members
+                pools.append(members)
+                nb_members += len(members)
+            self.relevant_data['pool_start'][row] = pool_starts[id(members)]
+            self.relevant_data['pool_size'][row] = len(members) - (position < len(members))                             # number of other agents in the pool
+            self.relevant_data['pool_position'][row] = position
+        self.relevant_data['pool_members'] = np.concatenate(pools) if pools else np.zeros(0, dtype=np.int64)
+
+    def __init_pools_random_choice(self, agent_set, rows):
+        """every agent may pick any other agent as receiver"""
+        members = np.arange(agent_set.fleet_state.nb_agents)
+        return ((row, (members, row)) for row in rows.tolist())
+
+    def __init_pools_static_group_choice(self, agent_set, rows):
+        """every agent may pick any other agent of its own group as receiver, receivers are picked from the members
+        kept by the GroupFormer, so moves between groups are followed without rebuilding the pools"""
+        return ((row, None) for row in rows.tolist())
+
+    def __init_pools_network_choice(self, agent_set, rows):
+        """every agent may pick any of its neighbours in the social network as receiver"""
+        for row in rows.tolist():
+            members = agent_set.social_network.neighbours(row)
+            yield row, (members, len(members))                                                                          # an agent is never its own neighbour
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Main Functionality Method to exchange data between all agents
+# ----------------------------------------------------------------------------------------------------------------------
+    def exchange_all(self, agent_set, sender_order, chosen_alternatives, rng):
+        """lets every agent in sender_order share data with its receivers, given the chosen choice option (column) of
+        every agent (row) in the FleetState, drawing all random numbers needed from the numpy Generator rng"""
+        fleet_state = agent_set.fleet_state
+        sender_order = np.asarray(sender_order, dtype=np.int64)
+        senders = np.repeat(sender_order, self.relevant_data['number_of_agents_shared_with'][sender_order])             # a pair for every receiver of every sender, in the order of the agents
+        receivers = self.__pick_receivers(agent_set, senders, rng)
+
+        sender_sharing = np.empty(fleet_state.nb_agents, dtype=object)
+        for strategy, rows in self.relevant_data['sharing'].items():
+            sender_sharing[rows] = strategy
+        pair_indices, columns = [], []
+        for strategy in self.relevant_data['sharing']:
+            pairs = np.flatnonzero(sender_sharing[senders] == strategy)
+            pair_index, column = self.functionality['sharing'][strategy](fleet_state, senders, pairs,
+                                                                         chosen_alternatives, rng)
+            pair_indices.append(pair_index)
+            columns.append(column)
+        pair_index = np.concatenate(pair_indices)
+        order = np.argsort(pair_index, kind='stable')                                                                   # triples in the order of the agents, shared choice options of a pair in the order they are picked
+        pair_index, column = pair_index[order], np.concatenate(columns)[order]
+        sender, receiver = senders[pair_index], receivers[pair_index]
+        value = fleet_state.heatmap[sender, column]                                                                     # all shared data is read before any data is received
+
+        if agent_set.tracer.traces_agents and 'last_event_sharing' in self.relevant_data['sharing']:
+            for sender_id in senders[sender_sharing[senders] == 'last_event_sharing'].tolist():
+                agent_set.tracer.event('agent', 'share',
+                                       '{agent_id} is now sharing last forage event data on {alternative_id}',
+                                       agent_id=sender_id, alternative_id=chosen_alternatives[sender_id].item())
+
+        receiver_receiving = np.empty(fleet_state.nb_agents, dtype=object)
+        for strategy, rows in self.relevant_data['receiving'].items():
+            receiver_receiving[rows] = strategy
+        previously_known = fleet_state.known[receiver, column]
+        for strategy in self.relevant_data['receiving']:
+            triples = np.flatnonzero(receiver_receiving[receiver] == strategy)
+            self.functionality['receiving'][strategy](fleet_state, receiver[triples], column[triples], value[triples],
+                                                      previously_known[triples])
+
+        newly_known = np.flatnonzero(~previously_known & fleet_state.known[receiver, column])
+        for receiver_id, new_known in dict.fromkeys(zip(receiver[newly_known].tolist(),
+                                                        column[newly_known].tolist())):                                 # a choice option received from several senders becomes known once
+            agent_set.agents[receiver_id].known_alternatives.add(new_known)
+        if agent_set.changed_heatmaps is not None:
+            agent_set.changed_heatmaps[receiver] = True
+
+    def __pick_receivers(self, agent_set, senders, rng):
+        """picks a random receiver for every sender from the agents it may pick, excluding the sender itself, by
+        drawing a position among the other agents and shifting positions from that of the sender onwards by one"""
+        random_numbers = rng.random(len(senders))
+        receivers = np.empty(len(senders), dtype=np.int64)
+        from_group = self.relevant_data['picks_group_member'][senders]
+        if np.any(from_group):
+            receivers[from_group] = agent_set.group_former.pick_other_members(senders[from_group],
+                                                                              random_numbers[from_group])
+        from_pool = ~from_group
+        pool_senders = senders[from_pool]
+        pool_size = self.relevant_data['pool_size'][pool_senders]
+        if np.any(pool_size <= 0):
+            raise ValueError('no other agents to share with for agents {}'
+                             .format(sorted(set(pool_senders[pool_size <= 0].tolist()))))
+        position = (random_numbers[from_pool] * pool_size).astype(np.int64)
+        position += position >= self.relevant_data['pool_position'][pool_senders]
+        receivers[from_pool] = self.relevant_data['pool_members'][self.relevant_data['pool_start'][pool_senders]
+                                                                  + position]
+        return receivers
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Methods that pick the shared choice options of a group of (sender, receiver) pairs
+# ----------------------------------------------------------------------------------------------------------------------
+    def __share_all_no_sharing(self, fleet_state, senders, pairs, chosen_alternatives, rng):
+        """no choice options are shared"""
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    def __share_all_last_event_sharing(self, fleet_state, senders, pairs, chosen_alternatives, rng):
+        """the choice option a sender has foraged in during this time step is shared"""
+        return pairs, chosen_alternatives[senders[pairs]]
+
+    def __share_all_random_sharing(self, fleet_state, senders, pairs, chosen_alternatives, rng):
+        """all known choice options are shared, or a random number of picks among the known choice options of a
+        sender, of which picks of a choice option already shared with the receiver are left out"""
+        pair_senders = senders[pairs]
+        known_flat = np.flatnonzero(fleet_state.known)                                                                  # known entries of all agents, by row and then column
+        nb_known = np.count_nonzero(fleet_state.known, axis=1)
+        known_start = np.cumsum(nb_known) - nb_known                                                                    # position of the first known entry of every agent in known_flat
+
+        share_all = self.relevant_data['share_all'][pair_senders]
+        number_of_shared = self.relevant_data['number_of_shared_alternatives'][pair_senders]
+        nb_picks = np.where(share_all, nb_known[pair_senders],
+                            number_of_shared // 1 + (rng.random(len(pairs)) < number_of_shared % 1)).astype(np.int64)   # certain shares and a chance at an additional share, as in HeatmapExchanger
+        without_knowledge = (nb_picks > 0) & (nb_known[pair_senders] == 0)
+        if np.any(without_knowledge):
+            raise ValueError('agents {} have no knowledge to share'
+                             .format(sorted(set(pair_senders[without_knowledge].tolist()))))
+
+        pick_pair = np.repeat(np.arange(len(pairs)), nb_picks)
+        pick_rank = np.arange(len(pick_pair)) - np.repeat(np.cumsum(nb_picks) - nb_picks, nb_picks)                     # number of the pick within its pair
+        pick_sender = pair_senders[pick_pair]
+        random_position = (rng.random(len(pick_pair)) * nb_known[pick_sender]).astype(np.int64)
+        position = np.where(share_all[pick_pair], pick_rank, random_position)
+        column = known_flat[known_start[pick_sender] + position] % fleet_state.nb_alternatives
+
+        _, first_pick = np.unique(pick_pair * fleet_state.nb_alternatives + column, return_index=True)                  # leave out repeated picks of a choice option for the same pair
+        first_pick.sort()
+        return pairs[pick_pair[first_pick]], column[first_pick]
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Methods that let a group of receivers accept or reject the shared data, given as (receiver, column, value) triples
+# ----------------------------------------------------------------------------------------------------------------------
+    def __receive_all_no_receiver(self, fleet_state, receivers, columns, values, previously_known):
+        """shared data is rejected"""
+        pass
+
+    def __receive_all_willing_receiver(self, fleet_state, receivers, columns, values, previously_known):
+        """shared data is accepted as new heatmap entry, the last shared value of an entry overwrites the others"""
+        keys = receivers * fleet_state.nb_alternatives + columns
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+        fleet_state.heatmap[receivers[last], columns[last]] = values[last]
+        fleet_state.known[receivers[last], columns[last]] = True
+
+    def __receive_all_stubborn_receiver(self, fleet_state, receivers, columns, values, previously_known):
+        """shared data is accepted only for entries that were unknown, the first shared value of an entry is kept"""
+        unknown = np.flatnonzero(~previously_known)
+        keys = receivers[unknown] * fleet_state.nb_alternatives + columns[unknown]
+        _, first = np.unique(keys, return_index=True)
+        first = unknown[first]
+        fleet_state.heatmap[receivers[first], columns[first]] = values[first]
+        fleet_state.known[receivers[first], columns[first]] = True
+
+    def __receive_all_combine_receiver(self, fleet_state, receivers, columns, values, previously_known):
+        """shared data is accepted for unknown entries and averaged with known entries, one shared value after the
+        other: after k shared values v_1..v_k an entry h becomes h/2^k + sum(v_i/2^(k-i+1)), where an unknown entry
+        takes the first shared value as h"""
+        if not len(receivers):
+            return
+        keys = receivers * fleet_state.nb_alternatives + columns
+        order = np.argsort(keys, kind='stable')                                                                         # shared values of every entry together, in the order they are shared
+        sorted_keys = keys[order]
+        group_start = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        group_size = np.diff(np.r_[group_start, len(keys)])
+        group = np.repeat(np.arange(len(group_start)), group_size)
+        rank = np.arange(len(keys)) - group_start[group]                                                                # 0 for the first shared value of an entry
+
+        first = order[group_start]
+        known = previously_known[first]
+        weight = 0.5 ** (group_size[group] - rank)
+        weight[group_start[~known]] *= 2                                                                                # the first value of an unknown entry is not averaged with the entry itself
+        combined = np.bincount(group, weights=values[order] * weight, minlength=len(group_start))
+        known_first = first[known]
+        combined[known] += fleet_state.heatmap[receivers[known_first], columns[known_first]] * 0.5 ** group_size[known]
+        fleet_state.heatmap[receivers[first], columns[first]] = combined
+        fleet_state.known[receivers[first], columns[first]] = True
+
+# EOF
@@ -0,0 +1,207 @@
+"""
+This Module is used to define the social network along which agents share data, when agents pick their receivers
+with the 'network_choice' strategy. The class SocialNetwork is meant as attribute of the AgentFleet object in agents.py
+
+The (undirected) links between agents are kept as a sparse adjacency matrix in CSR (compressed sparse row) form, so
+memory grows with the number of links instead of with the square of the number of agents:
+-   indptr      array of number of agents + 1 offsets, the neighbours of agent i are indices[indptr[i]:indptr[i + 1]]
+-   indices     array with the neighbours of all agents after each other, sorted per agent
+
+A network is generated for the agents in the fleet, or loaded from a file:
+-   small_world     a ring in which every agent is linked to its mean_degree nearest agents, of which every link is
+                    rewired to a random agent with probability rewire_probability (Watts-Strogatz)
+-   scale_free      agents are added one by one and link to mean_degree / 2 agents already in the network, with a
+                    probability proportional to their number of links (Barabasi-Albert)
+-   group_block     agents link to mean_degree agents on average, of which a share between_group_share is in other
+                    groups than their own (of the GroupFormer) and the rest within their own group
+-   file            links are read from a text file with two comma separated agent indices (the position of the agent
+                    in the fleet) per line
+
+Module inputs:
+-   the AgentFleet (the number of agents and, for group_block, the groups of the GroupFormer)
+-   the network settings in fleet > receiver_choice > network_attributes of the configuration
+
+Module Usage:
+-   agents.py makes the SocialNetwork of the fleet if agents pick receivers with the 'network_choice' strategy
+-   sharing.py picks receivers among the neighbours of an agent
+
+Last Updated:
+    18-10-2026
+
+Version Number:
+    0.1
+"""
+
+import numpy as np
+from artemis.core.random_streams import RandomStream
+
+
+class SocialNetwork:
+    """Class to contain the links between agents as a sparse adjacency matrix in CSR form"""
+
+    def __init__(self, agent_set, network_type='small_world', mean_degree=4, rewire_probability=0.1,
+                 between_group_share=0.1, file=None, random_stream=None):
+
+        self.random_stream = RandomStream() if random_stream is None else random_stream                                 # stream of random numbers to generate the links with
+        self.network_type = network_type
+        self.nb_agents = len(agent_set.agents)
+        self.functionality = self.__init_functionality()
+        if network_type not in self.functionality['init']:
+            raise ValueError("network_type can only be one of {}, network_type is currently defined as {}"
+                             .format(list(self.functionality['init'].keys()), network_type))
+        self.relevant_data = {'mean_degree': mean_degree, 'rewire_probability': rewire_probability,
+                              'between_group_share': between_group_share, 'file': file}
+        sources, targets = self.functionality['init'][network_type](agent_set)
+        self.indptr, self.indices = self.__to_csr(sources, targets)
+
+    def __init_functionality(self):
+        functionality = \
+            {
+                'init':
+                    {
+                        'small_world': self.__init_small_world,
+                        'scale_free': self.__init_scale_free,
+                        'group_block': self.__init_group_block,
+                        'file': self.__init_file
+                        # INSERT FURTHER NETWORK GENERATORS HERE
+                    }
+            }
+        return functionality
+
+# ----------------------------------------------------------------------------------------------------------------------
+# --------------------------------------------- Access to the neighbours -----------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+    def neighbours(self, agent_id):
+        """returns the neighbours of an agent, as a view on the indices of the network"""
+        return self.indices[self.indptr[agent_id]:self.indptr[agent_id + 1]]
+
+    def degrees(self):
+        """returns the number of neighbours of every agent"""
+        return np.diff(self.indptr)
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------------------------- Network generators -------------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+    def __links_per_agent(self):
+        """returns the number of links every agent makes itself, half of the mean degree as every link has two ends"""
+        links_per_agent = max(1, int(round(self.relevant_data['mean_degree'] / 2)))
+        if 2 * links_per_agent >= self.nb_agents:
+            raise ValueError('mean_degree {} is too large for a network of {} agents'
+                             .format(self.relevant_data['mean_degree'], self.nb_agents))
+        return links_per_agent
+
+    def __init_small_world(self, agent_set):
+        """a ring lattice of which every link is rewired to a random other agent with probability rewire_probability"""
+        links_per_agent = self.__links_per_agent()
+        generator = self.random_stream.generator
+        sources = np.repeat(np.arange(self.nb_agents), links_per_agent)
+        ring_offsets = np.tile(np.arange(1, links_per_agent + 1), self.nb_agents)                                       # the nearest agents on one side of the ring, those on the other side make the links
+        targets = (sources + ring_offsets) % self.nb_agents
+        rewired = generator.random(len(sources)) < self.relevant_data['rewire_probability']
+        targets[rewired] = (sources[rewired] + 1                                                                        # any agent but the source itself
+                            + generator.integers(0, self.nb_agents - 1, np.count_nonzero(rewired))) % self.nb_agents
+        return sources, targets
+
+    def __init_scale_free(self, agent_set, block_size=1024):
+        """agents are added one by one, linking to agents already in the network by preferential attachment. The
+        candidate links of a block of agents are drawn at once, only links to agents picked in the block itself are
+        looked up one by one"""
+        links_per_agent = self.__links_per_agent()
+        generator = self.random_stream.generator
+        sources = np.repeat(np.arange(links_per_agent, self.nb_agents), links_per_agent)
+        targets = np.empty_like(sources)
+        targets[:links_per_agent] = np.arange(links_per_agent)                                                          # the first agent added links to all initial agents
+        link_ends = np.empty(2 * len(sources), dtype=np.int64)                                                          # both ends of every link, so a uniform pick among the ends of the links made so far is proportional to the degree
+        link_ends[0::2] = sources                                                                                       # the agent added is known for every link in advance, the agent it links to only once picked
+        link_ends[1:2 * links_per_agent:2] = targets[:links_per_agent]
+        first_links = np.arange(links_per_agent, len(sources), links_per_agent)                                         # first link of every agent added after the first
+        for block_start in range(0, len(first_links), block_size):
+            links = first_links[block_start:block_start + block_size]
+            block_links = slice(links[0].item(), links[-1].item() + links_per_agent)
+            positions = (generator.random((len(links), 2 * links_per_agent)) * 2 * links[:, np.newaxis])                # candidate link ends of every agent, more than needed as agents with many links are drawn several times
+            positions = positions.astype(np.int64)
+            picked_in_block = (positions >= 2 * block_links.start) & (positions % 2 == 1)                               # link ends of agents picked in this block, not known yet
+            candidates = link_ends[positions].tolist()
+            block_targets = []
+
+            def link_end(position):
+                if position < 2 * block_links.start or position % 2 == 0:
+                    return link_ends[position].item()
+                return block_targets[position // 2 - block_links.start]
+
+            for row, (link, needs_lookup) in enumerate(zip(links.tolist(), picked_in_block.any(axis=1).tolist())):
+                if needs_lookup:
+                    candidates[row] = [link_end(position) for position in positions[row].tolist()]
+                picked_agents = dict.fromkeys(candidates[row])                                                          # distinct agents in the order they are drawn
+                while len(picked_agents) < links_per_agent:
+                    picked_agents[link_end(int(generator.random() * 2 * link))] = None
+                block_targets += list(picked_agents)[:links_per_agent]                                                  # the first agents drawn, as when drawing one by one until enough agents are picked
+            targets[block_links] = block_targets
+            link_ends[2 * block_links.start + 1:2 * block_links.stop:2] = block_targets
+        return sources, targets
+
+    def __init_group_block(self, agent_set):
+        """every agent links to random agents, within its own group or with probability between_group_share in
+        another group"""
+        links_per_agent = self.__links_per_agent()
+        generator = self.random_stream.generator
+        group_data = agent_set.group_former.relevant_data
+        group_of_agent = np.full(self.nb_agents, -1, dtype=np.int64)
+        group_members, group_start, group_size = [], [], []
+        for group_index, members in enumerate(group_data['overview_allegiances'].values()):
+            group_of_agent[members] = group_index
+            group_start.append(sum(group_size))
+            group_size.append(len(members))
+            group_members += members
+        if np.any(group_of_agent < 0):
+            raise ValueError('agents {} are not in any group'.format(np.flatnonzero(group_of_agent < 0).tolist()))
+        group_members, group_start, group_size = np.array(group_members, dtype=np.int64), np.array(group_start), \
+            np.array(group_size)
+        position_in_group = np.empty(self.nb_agents, dtype=np.int64)
+        position_in_group[group_members] = np.arange(self.nb_agents) - np.repeat(group_start, group_size)
+
+        sources = np.repeat(np.arange(self.nb_agents), links_per_agent)
+        targets = np.empty_like(sources)
+        source_groups = group_of_agent[sources]
+        within = (generator.random(len(sources)) >= self.relevant_data['between_group_share']) \
+            & (group_size[source_groups] > 1)                                                                           # agents alone in their group only link to other groups
+        position = (generator.random(np.count_nonzero(within)) * (group_size[source_groups[within]] - 1)) \
+            .astype(np.int64)
+        position += position >= position_in_group[sources[within]]                                                      # skip the agent itself
+        targets[within] = group_members[group_start[source_groups[within]] + position]
+
+        between = np.flatnonzero(~within)
+        while len(between):                                                                                             # redraw targets in the group of the source until all are in another group
+            targets[between] = generator.integers(0, self.nb_agents, len(between))
+            between = between[group_of_agent[targets[between]] == source_groups[between]]
+            if len(between) and len(group_size) == 1:
+                raise ValueError('between_group_share {} needs more than one group'
+                                 .format(self.relevant_data['between_group_share']))
+        return sources, targets
+
+    def __init_file(self, agent_set):
+        """links read from a file with two comma separated agent indices per line"""
+        if self.relevant_data['file'] is None:
+            raise ValueError("a file with the links between agents is needed for network_type 'file'")
+        links = np.loadtxt(self.relevant_data['file'], delimiter=',', dtype=np.int64, ndmin=2)
+        if links.size and (links.min() < 0 or links.max() >= self.nb_agents):
+            raise ValueError('links in {} refer to agents outside of the {} agents in the fleet'
+                             .format(self.relevant_data['file'], self.nb_agents))
+        return links[:, 0], links[:, 1]
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ------------------------------------------ Conversion to CSR adjacency -----------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+    def __to_csr(self, sources, targets):
+        """returns the CSR adjacency (indptr, indices) of the undirected links, without links of an agent to itself
+        and without duplicate links"""
+        sources, targets = np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64)
+        not_to_itself = sources != targets
+        sources, targets = sources[not_to_itself], targets[not_to_itself]
+        links = np.unique(np.concatenate([sources, targets]) * self.nb_agents                                           # both directions of every link, as a single sorted code per link
+                          + np.concatenate([targets, sources]))
+        indptr = np.zeros(self.nb_agents + 1, dtype=np.int64)
+        np.cumsum(np.bincount(links // self.nb_agents, minlength=self.nb_agents), out=indptr[1:])
+        return indptr, links % self.nb_agents
+
+# EOF
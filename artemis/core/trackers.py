@@ -0,0 +1,51 @@
+"""
+This Module is used to store the data that is tracked over time during a simulation (e.g. the catch of every agent
+in every time step) in a TrackerStore object: NumPy arrays that are preallocated for the full duration of the model,
+with the (integer) time step as first axis, so every time step is filled by (slice) assignment instead of building
+new dictionaries
+
+Module inputs:
+-   the time step ids of a simulation, as used in run_model.py
+-   the shape (e.g. number of agents and/or choice options) and data type of every tracker
+
+Module Usage:
+-   agents.py uses the module to store the data tracked on the agents in an AgentFleet
+-   choice_set.py uses the module to store the data tracked on the choice options in a ChoiceSet
+-   raw_data_extraction.py reads the arrays directly to construct the output data
+
+Last Updated:
+    18-10-2026
+
+Version Number:
+    0.1
+"""
+
+import numpy as np
+
+
+class TrackerStore:
+    """Class to contain preallocated arrays for every tracked data series,
+    the first axis of every array is the time step"""
+
+    def __init__(self, time_ids):
+        self.time_ids = list(time_ids)                                                                                  # labels of the time steps, as used in the output data
+        self.time_index = {time_id: time_step for time_step, time_id in enumerate(self.time_ids)}                       # lookup from time step id to time step
+        self.nb_time_steps = len(self.time_ids)
+        self.trackers = {}                                                                                              # dictionary with an array for every tracker name
+
+    def add_tracker(self, name, shape=(), dtype=np.float64, fill_value=0):
+        """preallocates an array for a tracker that records a value of the given shape in every time step"""
+        self.trackers[name] = np.full((self.nb_time_steps,) + tuple(shape), fill_value, dtype=dtype)
+        return self.trackers[name]
+
+    def time_step(self, time_id):
+        """returns the time step (index on the first axis of every array) of a time step id"""
+        return self.time_index[time_id]
+
+    def __getitem__(self, name):
+        return self.trackers[name]
+
+    def __contains__(self, name):
+        return name in self.trackers
+
+# EOF
@@ -60,6 +60,18 @@ class Configuration:
     def reporting(self):
         return self._config_data['model']['reporting']
 
+    @property
+    def engine(self):
+        return self._config_data['model'].get('engine', 'dict')
+
+    @property
+    def workers(self):
+        return self._config_data['model'].get('workers', 1)
+
+    @property
+    def seed(self):
+        return self._config_data['model'].get('seed')
+
     @property
     def choice_set_size(self):
         return self._config_data['options']['nb_options']
@@ -116,6 +128,14 @@ class Configuration:
     def group_dynamics(self):
         return self._config_data['fleet']['receiver_choice']['group_attributes']['group_dynamics']
 
+    @property
+    def switch_probability(self):
+        return self._config_data['fleet']['receiver_choice']['group_attributes'].get('switch_probability', 0.1)
+
+    @property
+    def network_attributes(self):
+        return self._config_data['fleet']['receiver_choice'].get('network_attributes', {})
+
     @property
     def pick_receiver_strategy(self):
         return self._config_data['fleet']['receiver_choice']['name']
@@ -124,6 +144,46 @@ class Configuration:
     def agent_order(self):
         return self._config_data['fleet']['agent_order']
 
+    @property
+    def synchronous_sharing(self):
+        return self._config_data['fleet'].get('synchronous_sharing', False)
+
+    @property
+    def output_format(self):
+        return self._config_data.get('output', {}).get('format', 'csv')
+
+    @property
+    def output_layout(self):
+        return self._config_data.get('output', {}).get('layout', 'wide')
+
+    @property
+    def trace_level(self):
+        return self._config_data.get('tracing', {}).get('level', 'agent' if self.reporting else 'off') or 'off'       # an unquoted off in a yml file is read as False
+
+    @property
+    def trace_capture_level(self):
+        return self._config_data.get('tracing', {}).get('capture_level', 'off') or 'off'
+
+    @property
+    def trace_sample_rate(self):
+        return self._config_data.get('tracing', {}).get('sample_rate', 1.0)
+
+    @property
+    def profiling(self):
+        return self._config_data.get('profiling', {}).get('enabled', False)
+
+    @property
+    def profile_memory(self):
+        return self._config_data.get('profiling', {}).get('memory', False)
+
+    @property
+    def agent_trackers(self):
+        return self._config_data.get('trackers', {}).get('agents')
+
+    @property
+    def option_trackers(self):
+        return self._config_data.get('trackers', {}).get('options')
+
 
 class AgentConfiguration:
     """Class to contain agent configuration parameters."""
@@ -1,6 +1,6 @@
 # SEE BOTTOM FOR EXECUTION OF SCRIPT -- ALSO DEFINE PROPER SCENARIO FILE THERE
 
-from artemis.io.output.export_data import DataWriter
+from artemis.io.output.export_data import DataWriter, DataReader, FILE_EXTENSIONS
 import pandas as pd
 import re
 import copy
@@ -10,7 +10,8 @@ import statistics as stats
 
 class MeasureDeriver:
     """Class to derive statistics and measures
-    from two raw output data .csv files of ARTEMIS.py for a single run scenario"""
+    from two raw output data files of ARTEMIS.py (in any of the output formats) for a single run scenario,
+    or from three files if the data per agent in every choice option was written in the 'long' layout"""
 # ----------------------------------------------------------------------------------------------------------------------
 # Initialisation Methods
 # ----------------------------------------------------------------------------------------------------------------------
@@ -18,17 +19,32 @@ class MeasureDeriver:
     def __init__(self,
                  scenario_name,
                  output_folder_name='output/data_output/',
-                 flat_time_x_agent_file_name_template='flat_time_x_agent_results{}.csv',
-                 flat_time_x_environment_file_name_template='flat_time_x_environment_results{}.csv',
-                 inplace=True):
-
-        self.flat_time_x_agent_path_template = output_folder_name + flat_time_x_agent_file_name_template
-        self.flat_time_x_environment_path_template = output_folder_name + flat_time_x_environment_file_name_template
-
+                 flat_time_x_agent_file_name_template='flat_time_x_agent_results{}',
+                 flat_time_x_environment_file_name_template='flat_time_x_environment_results{}',
+                 inplace=True,
+                 output_format='csv',
+                 layout='wide',
+                 flat_time_x_environment_x_agent_file_name_template='flat_time_x_environment_x_agent_results{}'):
+
+        self.flat_time_x_agent_path_template = \
+            output_folder_name + flat_time_x_agent_file_name_template + FILE_EXTENSIONS[output_format]
+        self.flat_time_x_environment_path_template = \
+            output_folder_name + flat_time_x_environment_file_name_template + FILE_EXTENSIONS[output_format]
+
+        self.flat_time_x_environment_x_agent_path_template = \
+            output_folder_name + flat_time_x_environment_x_agent_file_name_template + FILE_EXTENSIONS[output_format]
+
+        self.layout = layout                                                                                            # 'wide' (a column per agent in the environment data) or 'long' (a separate file with a row per agent)
         self.functionality = self.__init_functionality()
+        self.data_reader = DataReader()
 
-        self.flat_time_x_agent_data = pd.read_csv(self.flat_time_x_agent_path_template.format(scenario_name))
-        self.flat_time_x_environment_data = pd.read_csv(self.flat_time_x_environment_path_template.format(scenario_name))
+        self.flat_time_x_agent_data = self.data_reader.read(self.flat_time_x_agent_path_template.format(scenario_name))
+        self.flat_time_x_environment_data = \
+            self.__read_environment_data(self.flat_time_x_environment_path_template.format(scenario_name),
+                                         project=not inplace)                                                           # data written back in place needs all columns, otherwise only the columns the measures are derived from are read
+        if self.layout == 'long':
+            self.flat_time_x_environment_x_agent_data = \
+                self.data_reader.read(self.flat_time_x_environment_x_agent_path_template.format(scenario_name))
 
         self.flat_time_x_environment_data['agents_visited'] = \
             self.flat_time_x_environment_data['agents_visited'].fillna('')                                              # convert nan values to empty strings to prevent bugging in later stages of the data analysis
@@ -38,10 +54,24 @@ class MeasureDeriver:
         else:
             self.output_suffix = scenario_name
 
-        self.data_writer = DataWriter(output_file_suffix=self.output_suffix)
+        self.data_writer = DataWriter(output_file_suffix=self.output_suffix, output_format=output_format)
+
+    def __read_environment_data(self, file_path, project):
+        """reads the time by environment data, if projected only
+        the id columns and the columns needed to derive the heatmap errors of every agent are read"""
+        if not project:
+            return self.data_reader.read(file_path)
 
+        columns = [column for column in self.data_reader.read_columns(file_path)
+                   if column in ('iteration_id', 'time_id', 'alternative_id', 'agents_visited',
+                                 'occurred_competition_correction', 'hypothetical_competition_correction') or
+                   (self.layout == 'wide' and column.endswith(('_catch_potential', '_catch_expectation_heatmap')))]
+        return self.data_reader.read(file_path, columns=columns)
 
     def __init_functionality(self):
+        if self.layout == 'long':
+            return self.__init_functionality_long()
+
         return \
             {
                 'flat_time_x_agent':
@@ -58,6 +88,25 @@ class MeasureDeriver:
                     }
             }
 
+    def __init_functionality_long(self):
+        """same functionality as __init_functionality, for data per agent in every choice option in the 'long' layout,
+        where agents are rows instead of columns found by their names"""
+        return \
+            {
+                'flat_time_x_agent':
+                    {
+                        "mean_absolute_error": self.__derive_statistics_long_time_x_agent_mean_absolute_error,
+                        'mean_negative_error': self.__derive_statistics_long_time_x_agent_mean_negative_error,
+                        'mean_positive_error': self.__derive_statistics_long_time_x_agent_mean_positive_error,
+                        'sd_absolute_error': self.__derive_statistics_long_time_x_agent_sd_absolute_error
+                        # INSERT FURTHER FUNCTIONALITY HERE
+                    },
+                'flat_time_x_environment':
+                    {
+                        "agent_heatmap_errors": self.__derive_statistics_long_time_x_environment_x_agent_heatmap_errors
+                    }
+            }
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Main Functionality Methods for Deriving Statistics and Measures
 # ----------------------------------------------------------------------------------------------------------------------
@@ -291,6 +340,62 @@ class MeasureDeriver:
         error = corrected_catch - row['{}_catch_expectation_heatmap'.format(agent)]
         return error
 
+# ----------------------------------------------------------------------------------------------------------------------
+# Supporting Methods Called by Main Functionality for Deriving Statistics and Measures in the 'long' layout
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def __derive_statistics_long_time_x_environment_x_agent_heatmap_errors(self):
+        """adds the heatmap error of every agent in every choice option and time step to the long data:
+        the real catch (corrected for the competition that occurred if the agent foraged in the option,
+        else for the competition one more agent would have caused) - the catch expected in the heatmap"""
+        environment_keys = ['iteration_id', 'time_id', 'alternative_id']
+        agent_keys = ['iteration_id', 'time_id', 'agent_id']
+        df = self.flat_time_x_environment_x_agent_data                                                                  # give the data to be modified an additional, shorter, name for easier readability in the script
+
+        corrections = df[environment_keys].merge(
+            self.flat_time_x_environment_data[environment_keys + ['occurred_competition_correction',
+                                                                  'hypothetical_competition_correction']],
+            on=environment_keys, how='left')                                                                            # competition corrections of the choice option in every row
+        visits = df[agent_keys].merge(self.flat_time_x_agent_data[agent_keys + ['forage_visit']],
+                                      on=agent_keys, how='left')                                                        # choice option the agent of every row foraged in
+
+        visited = visits['forage_visit'].to_numpy() == df['alternative_id'].to_numpy()
+        correction = np.where(visited, corrections['occurred_competition_correction'].to_numpy(),
+                              corrections['hypothetical_competition_correction'].to_numpy())
+        df['heatmap_error'] = df['catch_potential'].to_numpy() * correction - df['catch_expectation_heatmap'].to_numpy()
+
+    def __derive_statistics_long_time_x_agent_mean_absolute_error(self):
+        errors = self.flat_time_x_environment_x_agent_data['heatmap_error'].abs()
+        self.__attach_long_agent_statistic('mean_absolute_errors', self.__group_by_agent_and_time(errors).mean())
+
+    def __derive_statistics_long_time_x_agent_sd_absolute_error(self):
+        errors = self.flat_time_x_environment_x_agent_data['heatmap_error'].abs()
+        self.__attach_long_agent_statistic('sd_absolute_errors', self.__group_by_agent_and_time(errors).std(ddof=0))
+
+    def __derive_statistics_long_time_x_agent_mean_positive_error(self):
+        errors = self.flat_time_x_environment_x_agent_data['heatmap_error']
+        positive_errors = errors.where(errors >= 0)                                                                     # negative errors are left out of the mean, 0 if an agent has no positive errors
+        self.__attach_long_agent_statistic('mean_positive_errors',
+                                           self.__group_by_agent_and_time(positive_errors).mean().fillna(0))
+
+    def __derive_statistics_long_time_x_agent_mean_negative_error(self):
+        errors = self.flat_time_x_environment_x_agent_data['heatmap_error']
+        negative_errors = errors.where(errors < 0)                                                                      # positive errors are left out of the mean, 0 if an agent has no negative errors
+        self.__attach_long_agent_statistic('mean_negative_errors',
+                                           self.__group_by_agent_and_time(negative_errors).mean().fillna(0))
+
+    def __group_by_agent_and_time(self, data_series):
+        """groups a data series of the long data by iteration, time step and agent"""
+        df = self.flat_time_x_environment_x_agent_data
+        return data_series.groupby([df['iteration_id'], df['time_id'], df['agent_id']], sort=False)
+
+    def __attach_long_agent_statistic(self, name, statistic):
+        """adds a statistic per iteration, time step and agent as a column to the time by agent data"""
+        agent_keys = ['iteration_id', 'time_id', 'agent_id']
+        statistic = statistic.rename(name).reset_index()
+        self.flat_time_x_agent_data[name] = \
+            self.flat_time_x_agent_data[agent_keys].merge(statistic, on=agent_keys, how='left')[name].to_numpy()
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Supporting Methods Called by Main Functionality for Deriving Statistics and Measures in general
 # ----------------------------------------------------------------------------------------------------------------------
@@ -298,12 +403,15 @@ class MeasureDeriver:
     def export_data(self):
         self.__export_derivative_statistics_time_x_environment()
         self.__export_derivative_statistics_time_x_agent()
+        if self.layout == 'long':
+            self.data_writer.append(self.flat_time_x_environment_x_agent_data, 'flat_time_x_environment_x_agent_results')
+        self.data_writer.close()
 
     def __export_derivative_statistics_time_x_environment(self):
-        self.data_writer.write_csv(self.flat_time_x_environment_data, 'flat_time_x_environment_results')
+        self.data_writer.append(self.flat_time_x_environment_data, 'flat_time_x_environment_results')
 
     def __export_derivative_statistics_time_x_agent(self):
-        self.data_writer.write_csv(self.flat_time_x_agent_data, 'flat_time_x_agent_results')
+        self.data_writer.append(self.flat_time_x_agent_data, 'flat_time_x_agent_results')
 
 # ----------------------------------------------------------------------------------------------------------------------
 # EXECUTING THE SCRIPT
@@ -1,24 +1,56 @@
 """
-This Module is used to write model results to data files (e.g. .csv, .json)
+This Module is used to write model results to data files (e.g. .csv, .json, .parquet, .feather, .npz)
+and to read them back for further analysis
 
-All functionality is contained in methods and attributes of the DataWriter object
+All functionality is contained in methods and attributes of the DataWriter and DataReader objects
+
+the columnar formats store every data series with its own data type and compression:
+-   'parquet' and 'feather' need the optional pyarrow package
+-   'npz' only needs numpy: a zip archive with a .npy array for every data series in every appended part,
+    which can also be opened with numpy.load
 
 Module inputs:
 -   any data formatted as pandas.DataFrame Object
 -   the output data is defined and pre-processed in data_extraction.py to fit the prerequisites needed for this module
 
 Module Usage:
--   ARTEMIS.py uses this module as Data writer
+-   ARTEMIS.py uses this module as Data writer, streaming the output data of every iteration to the data files
+    as soon as it is extracted
+-   derive_measures.py and graphmaker.py use the DataReader to read (only the needed data series of) the data files
 
 Last Updated:
-    06-09-2021
+    18-10-2026
 
 Version Number:
-    0.1
+    0.2
 """
 
+import os
+import zipfile
+import numpy as np
 import pandas as pd
 
+try:                                                                                                                    # pyarrow is optional, only needed for the parquet and feather formats
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FILE_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather', 'npz': '.npz'}                         # file extension of every output format that can be streamed
+ARROW_FORMATS = ('parquet', 'feather')                                                                                  # output formats that need pyarrow
+NPZ_COLUMNS_ENTRY = '__columns__'                                                                                       # entry of an npz file with the names of the data series, in order
+
+
+def check_output_format(output_format):
+    """raises an error if an output format is not supported or needs a package that is not installed"""
+    if output_format not in FILE_EXTENSIONS:
+        raise NotImplementedError('output format {} is not supported, supported formats are:\t{}'.format(
+            output_format, list(FILE_EXTENSIONS)))
+    if output_format in ARROW_FORMATS and pyarrow is None:
+        raise ImportError('output format {} requires the pyarrow package'.format(output_format))
+
+
 class DataWriter:
     """contains a set of methods to export a pandas Dataframe object into output files (e.g. csv, json etc.)
     with a defined suffix text"""
@@ -27,8 +59,27 @@ class DataWriter:
 # Methods to initialise object
 # ----------------------------------------------------------------------------------------------------------------------
 
-    def __init__(self, output_file_suffix=""):
+    def __init__(self, output_file_suffix="", output_format='csv'):
+        check_output_format(output_format)
         self.output_file_suffix = output_file_suffix
+        self.output_format = output_format                                                                              # format of the files written with append
+        self.streamed_files = {}                                                                                        # columns and progress (rows written, open writer or parts written) for every file written in append mode
+        self.append_instructions = self.__init_append_instructions()
+
+    def __init_append_instructions(self):
+        return \
+            {
+                'csv': self.__append_csv,
+                'parquet': self.__append_parquet,
+                'feather': self.__append_feather,
+                'npz': self.__append_npz
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Methods to write/export data files
@@ -44,6 +95,78 @@ class DataWriter:
         else:
             raise TypeError("Method only supports pandas.Dataframe objects as input and filename as strings")           # error handling: only pandas.Dataframes are accepted and only string filenames
 
+    def append(self, pd_dataframe, filename):
+        """appends data to a file in the output format of the DataWriter, see append_csv,
+        parquet and feather files are only complete after close is called"""
+
+        if isinstance(pd_dataframe, pd.DataFrame) and isinstance(filename, str):
+            file_path = "{}{}{}".format(filename, self.output_file_suffix, FILE_EXTENSIONS[self.output_format])         # attach path to desired output folder
+            self.append_instructions[self.output_format](pd_dataframe, file_path)
+        else:
+            raise TypeError("Method only supports pandas.Dataframe objects as input and filename as strings")           # error handling: only pandas.Dataframes are accepted and only string filenames
+
+    def append_csv(self, pd_dataframe, filename):
+        """appends data to a csv file in the same way as write_csv, so the output of a simulation can be streamed to
+        disk one iteration at a time: the first call for a file (re)writes the file including the header,
+        every later call appends its rows and continues the row index,
+        giving the same file as writing all appended data at once"""
+
+        if isinstance(pd_dataframe, pd.DataFrame) and isinstance(filename, str):
+            file_path = "{}{}.csv".format(filename, self.output_file_suffix)                                            # attach path to desired output folder
+            self.__append_csv(pd_dataframe, file_path)
+        else:
+            raise TypeError("Method only supports pandas.Dataframe objects as input and filename as strings")           # error handling: only pandas.Dataframes are accepted and only string filenames
+
+    def __append_csv(self, pd_dataframe, file_path):
+        first_part = file_path not in self.streamed_files                                                               # the first part (re)writes the file with a header
+        rows_written = self.__streamed_progress(file_path, pd_dataframe, 0)
+
+        pd_dataframe.set_axis(pd.RangeIndex(rows_written, rows_written + len(pd_dataframe)))\
+            .to_csv(file_path, mode='w' if first_part else 'a', header=first_part)                                      # continue the row index of the rows written before
+        self.streamed_files[file_path] = (list(pd_dataframe.columns), rows_written + len(pd_dataframe))
+
+    def __append_parquet(self, pd_dataframe, file_path):
+        """appends data as a row group to a parquet file, keeping the file open until close is called"""
+        writer = self.__streamed_progress(file_path, pd_dataframe, None)
+        table = self.__arrow_table(pd_dataframe, writer)
+        if writer is None:
+            writer = pyarrow.parquet.ParquetWriter(file_path, table.schema, compression='zstd')
+        writer.write_table(table)
+        self.streamed_files[file_path] = (list(pd_dataframe.columns), writer)
+
+    def __append_feather(self, pd_dataframe, file_path):
+        """appends data as record batches to a feather (arrow ipc) file, keeping the file open until close is called"""
+        writer = self.__streamed_progress(file_path, pd_dataframe, None)
+        table = self.__arrow_table(pd_dataframe, writer)
+        if writer is None:
+            writer = pyarrow.ipc.new_file(file_path, table.schema,
+                                          options=pyarrow.ipc.IpcWriteOptions(compression='zstd'))
+        writer.write_table(table)
+        self.streamed_files[file_path] = (list(pd_dataframe.columns), writer)
+
+    def __append_npz(self, pd_dataframe, file_path):
+        """appends data to an npz file as one compressed .npy entry per data series,
+        named <data series>/<part>, every call adds a part and closes the file again"""
+        parts_written = self.__streamed_progress(file_path, pd_dataframe, 0)
+
+        with zipfile.ZipFile(file_path, mode='a' if parts_written else 'w', compression=zipfile.ZIP_DEFLATED) as npz:  # the archive is closed after every part, so completed parts are kept if a simulation is interrupted
+            if not parts_written:
+                self.__write_npy(npz, NPZ_COLUMNS_ENTRY, np.array(pd_dataframe.columns, dtype=str))
+            for column in pd_dataframe.columns:
+                values = pd_dataframe[column].to_numpy()
+                if values.dtype == object:                                                                              # text data series are stored as fixed width strings, so no pickling is needed to read them
+                    values = values.astype(str)
+                self.__write_npy(npz, '{}/{:06d}'.format(column, parts_written), values)
+        self.streamed_files[file_path] = (list(pd_dataframe.columns), parts_written + 1)
+
+    def close(self):
+        """finishes all files written with append, writing the footers of parquet and feather files,
+        a later append to the same file starts a new file"""
+        for columns, progress in self.streamed_files.values():
+            if hasattr(progress, 'close'):
+                progress.close()
+        self.streamed_files = {}
+
     def write_json(self, pd_dataframe, filename):
         """writes data to a json file in the output/data_output folder of the model directory, and naming the new file
         using a specified filename and a standard suffix"""
@@ -54,4 +177,118 @@ class DataWriter:
         else:
             raise TypeError("Method only supports pandas.Dataframe objects as input and filename as strings")           # error handling: only pandas.Dataframes are accepted and only string filenames
 
-# EOF
\ No newline at end of file
+# ----------------------------------------------------------------------------------------------------------------------
+# Supporting methods
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def __streamed_progress(self, file_path, pd_dataframe, default):
+        """returns the progress of a file written in append mode, or the default for a new file,
+        after checking the appended data fits the columns already written"""
+        if file_path not in self.streamed_files:
+            return default
+
+        streamed_columns, progress = self.streamed_files[file_path]
+        if list(pd_dataframe.columns) != streamed_columns:                                                              # error handling: appended data must fit the columns that were written before
+            raise ValueError("Columns of the appended data do not match the columns already written "
+                             "to {}".format(file_path))
+        return progress
+
+    @staticmethod
+    def __arrow_table(pd_dataframe, writer):
+        """converts data to an arrow table, with the data types of the file if data was written to it before"""
+        schema = writer.schema if writer is not None else None
+        return pyarrow.Table.from_pandas(pd_dataframe, schema=schema, preserve_index=False)
+
+    @staticmethod
+    def __write_npy(npz, name, values):
+        with npz.open('{}.npy'.format(name), mode='w', force_zip64=True) as entry:
+            np.lib.format.write_array(entry, np.asarray(values), allow_pickle=False)
+
+
+class DataReader:
+    """contains a set of methods to read the output files written by a DataWriter back into a pandas Dataframe object,
+    reading only the wanted data series (columns) where the file format allows it"""
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Methods to initialise object
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def __init__(self):
+        self.read_instructions = self.__init_read_instructions()
+        self.column_instructions = self.__init_column_instructions()
+
+    def __init_read_instructions(self):
+        return \
+            {
+                'csv': self.__read_csv,
+                'parquet': self.__read_parquet,
+                'feather': self.__read_feather,
+                'npz': self.__read_npz
+            }
+
+    def __init_column_instructions(self):
+        return \
+            {
+                'csv': lambda file_path: list(pd.read_csv(file_path, nrows=0).columns),
+                'parquet': lambda file_path: list(pyarrow.parquet.read_schema(file_path).names),
+                'feather': lambda file_path: list(pyarrow.ipc.open_file(file_path).schema.names),
+                'npz': lambda file_path: np.load(file_path)[NPZ_COLUMNS_ENTRY].tolist()
+            }
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Methods to read data files
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def read(self, file_path, columns=None):
+        """reads (the wanted columns of) a data file, the format is derived from the file extension,
+        time ids are read as integers in every format, as they are from csv files"""
+        output_format = self.file_format(file_path)
+        data = self.read_instructions[output_format](file_path, None if columns is None else list(columns))
+
+        if output_format != 'csv' and 'time_id' in data.columns:
+            data['time_id'] = pd.to_numeric(data['time_id'])
+        return data
+
+    def read_columns(self, file_path):
+        """reads only the names of the data series (columns) in a data file"""
+        return self.column_instructions[self.file_format(file_path)](file_path)
+
+    @staticmethod
+    def file_format(file_path):
+        """returns the output format of a file from its extension"""
+        extension = os.path.splitext(file_path)[1]
+        for output_format, format_extension in FILE_EXTENSIONS.items():
+            if extension == format_extension:
+                check_output_format(output_format)
+                return output_format
+        raise NotImplementedError('file {} is not a supported output file, supported extensions are:\t{}'.format(
+            file_path, list(FILE_EXTENSIONS.values())))
+
+    @staticmethod
+    def __read_csv(file_path, columns):
+        return pd.read_csv(file_path, usecols=columns)
+
+    @staticmethod
+    def __read_parquet(file_path, columns):
+        return pd.read_parquet(file_path, columns=columns)
+
+    @staticmethod
+    def __read_feather(file_path, columns):
+        return pd.read_feather(file_path, columns=columns)
+
+    @staticmethod
+    def __read_npz(file_path, columns):
+        """reads the wanted data series of an npz file, concatenating the parts of every data series in order"""
+        with np.load(file_path) as npz:
+            all_columns = npz[NPZ_COLUMNS_ENTRY].tolist()
+            parts = sorted(name for name in npz.files if name.startswith(all_columns[0] + '/')) if all_columns else []
+            part_ids = [name[len(all_columns[0]) + 1:] for name in parts]
+
+            data = {}
+            for column in (all_columns if columns is None else columns):
+                if column not in all_columns:                                                                           # error handling: same as reading a missing column with pandas
+                    raise ValueError('data series {} is not in {}'.format(column, file_path))
+                data[column] = np.concatenate([npz['{}/{}'.format(column, part)] for part in part_ids])
+        return pd.DataFrame(data)
+
+# EOF
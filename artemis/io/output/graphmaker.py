@@ -8,9 +8,10 @@ Module inputs:
 
 Module Usage:
 -   the GraphConstructor objects are former inputs of ARTEMIS.py, old version needs t
+-   output data files are read with the DataReader of export_data.py, reading only the data series a graph needs
 
 Last Updated:
-    01-10-2021
+    18-10-2026
 
 Version Number:
     0.1
@@ -26,6 +27,7 @@ import numpy as np
 import re
 import seaborn as sns
 from collections import defaultdict
+from artemis.io.output.export_data import DataReader, FILE_EXTENSIONS
 matplotlib.rcParams.update({'errorbar.capsize': 2})
 
 
@@ -36,12 +38,17 @@ class GraphMaker:
                  data_folder_name='output/data_output/',
                  output_folder_name='output/data_output/graphs/',
                  flat_time_x_agent_file_name_template='flat_time_x_agent_results{}.csv',
-                 flat_time_x_environment_file_name_template='flat_time_x_environment_results{}.csv'):
+                 flat_time_x_environment_file_name_template='flat_time_x_environment_results{}.csv',
+                 output_format='csv',
+                 layout='wide'):
 
         self.config_file_name = config_file
         self.config_file = pd.read_csv(config_file, sep=';')
         self.functionality = self.__init_functionality()
         self.temp_data = ""
+        self.data_reader = DataReader()                                                                                 # reads only the data series a graph needs from the output data files
+        self.file_extension = FILE_EXTENSIONS[output_format]
+        self.layout = layout                                                                                            # 'wide' (a column per agent in the environment data) or 'long' (a separate file with a row per agent)
 
         #self.data_dictionary = self.__init_data_dictionary(flat_time_x_agent_file_name_template,
         #                                                   flat_time_x_environment_file_name_template)
@@ -58,12 +65,29 @@ class GraphMaker:
         data_dictionary = {}
         for scenario in self.config_file['scenario_id'].values:
             data_dictionary[scenario]['flat_time_x_agent_results'] = \
-                pd.read_csv(flat_time_x_agent_file_name_template.format(scenario))
+                self.data_reader.read(flat_time_x_agent_file_name_template.format(scenario))
             data_dictionary[scenario]['flat_time_x_environment_results'] = \
-                pd.read_csv(flat_time_x_environment_file_name_template.format(scenario))
+                self.data_reader.read(flat_time_x_environment_file_name_template.format(scenario))
 
         return data_dictionary
 
+    def __read_scenario_data(self, file_path, columns):
+        """reads only the wanted columns of an output data file, the file path is given without file extension"""
+        return self.data_reader.read(file_path + self.file_extension, columns=list(dict.fromkeys(columns)))
+
+    def __read_long_agent_data(self, data_subfolder, scenario, x_series_name, y_series_name, time_start):
+        """reads an environment data series (x) and a data series with a value per agent (y) in the 'long' layout
+        into a single DataFrame with a row for every time step, choice option and agent"""
+        keys = ['iteration_id', 'time_id', 'alternative_id']
+        environment_data = self.__read_scenario_data(
+            'output/data_output/{}/flat_time_x_environment_results{}'.format(data_subfolder, scenario),
+            columns=keys + [x_series_name])
+        agent_data = self.__read_scenario_data(
+            'output/data_output/{}/flat_time_x_environment_x_agent_results{}'.format(data_subfolder, scenario),
+            columns=keys + [y_series_name])
+        agent_data = agent_data[agent_data['time_id'] >= time_start]
+        return agent_data.merge(environment_data, on=keys, how='left')
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Methods for making graphs
 # ----------------------------------------------------------------------------------------------------------------------
@@ -80,7 +104,9 @@ class GraphMaker:
 
         for scenario in scenarios:
             # 3) read data files (flat)
-            scenario_data = pd.read_csv('output/data_output/flat_time_x_agent_results_with_statistics_{}.csv'.format(scenario))
+            scenario_data = self.__read_scenario_data(
+                'output/data_output/flat_time_x_agent_results_with_statistics_{}'.format(scenario),
+                columns=['time_id', 'agent_id', 'mean_absolute_errors'])
             scenario_data = copy.deepcopy(scenario_data[scenario_data['agent_id'] == 'agent_012'])
             self.temp_data = scenario_data
             scenario_mae_data = copy.deepcopy(scenario_data['mean_absolute_errors'])
@@ -107,7 +133,9 @@ class GraphMaker:
         colours = ['black', 'black', 'blue', 'blue', 'red', 'red', 'green', 'green', 'yellow', 'yellow']
         for scenario in scenarios:
             # 3) read data files (flat)
-            scenario_data = pd.read_csv('output/data_output/flat_time_x_agent_results_with_statistics_{}.csv'.format(scenario))
+            scenario_data = self.__read_scenario_data(
+                'output/data_output/flat_time_x_agent_results_with_statistics_{}'.format(scenario),
+                columns=['time_id', 'agent_id', 'mean_positive_errors', 'mean_negative_errors'])
             scenario_data = copy.deepcopy(scenario_data[scenario_data['agent_id'] == 'agent_012'])
             self.temp_data = scenario_data
             scenario_mpe_data = copy.deepcopy(scenario_data['mean_positive_errors'])
@@ -134,7 +162,9 @@ class GraphMaker:
 
         for scenario in scenarios:
             # 3) read data files (flat)
-            scenario_data = pd.read_csv('output/data_output/flat_time_x_environment_results_with_statistics_{}.csv'.format(scenario))
+            scenario_data = self.__read_scenario_data(
+                'output/data_output/flat_time_x_environment_results_with_statistics_{}'.format(scenario),
+                columns=['time_id', 'agent_012_heatmap_error'])
             for time in times:
                 scenario_data_temp = copy.deepcopy(scenario_data[scenario_data['time_id'] == time])
                 scenario_data_temp = copy.deepcopy(scenario_data_temp['agent_012_heatmap_error'])
@@ -159,7 +189,9 @@ class GraphMaker:
             constructed_data_scenario = pd.DataFrame()
 
             # 3) read data files (flat)
-            scenario_data = pd.read_csv('output/data_output/flat_time_x_{}_results_with_statistics_{}.csv'.format(file_name, scenario))
+            scenario_data = self.__read_scenario_data(
+                'output/data_output/flat_time_x_{}_results_with_statistics_{}'.format(file_name, scenario),
+                columns=['time_id', x, y])
             scenario_data = scenario_data[scenario_data['time_id'] >= start_time]
             constructed_data_scenario = copy.deepcopy(scenario_data[[x, y]])
 
@@ -187,7 +219,9 @@ class GraphMaker:
             scenarios = np.unique(scenarios)
 
         for scenario in scenarios:
-            scenario_data = pd.read_csv('output/data_output/flat_time_x_{}_results_with_statistics_{}.csv'.format(file, scenario))
+            scenario_data = self.__read_scenario_data(
+                'output/data_output/flat_time_x_{}_results_with_statistics_{}'.format(file, scenario),
+                columns=['time_id', series_name])
             scenario_data = scenario_data[scenario_data['time_id'] >= start_time]
 
             scenario_data_temp = copy.deepcopy(scenario_data[series_name])
@@ -216,9 +250,10 @@ class GraphMaker:
         y_short = y_series_name.split('|')[-1]
 
         for scenario in selected_scenarios['scenario_id'].values:
-            scenario_data = pd.read_csv(
-                'output/data_output/{}/flat_time_x_{}_results{}.csv'.format(
-                    data_subfolder, file_name, scenario))
+            scenario_data = self.__read_scenario_data(
+                'output/data_output/{}/flat_time_x_{}_results{}'.format(
+                    data_subfolder, file_name, scenario),
+                columns=['time_id', x_series_name, y_series_name])
             scenario_data = scenario_data[scenario_data['time_id'] <= time_start]
             relevant_data[scenario] = pd.DataFrame()
 
@@ -255,50 +290,64 @@ class GraphMaker:
         y_short = y_series_name.split('|')[-1]
 
         for scenario in selected_scenarios['scenario_id'].values:
-            # read scenario data
-            scenario_data = pd.read_csv(
-                'output/data_output/{}/flat_time_x_{}_results{}.csv'.format(
-                    data_subfolder, file_name, scenario))
-            scenario_data = scenario_data[scenario_data['time_id'] >= time_start]
-            # prepare dataframe to build a graph from
-            relevant_data[scenario] = pd.DataFrame()
+            if self.layout == 'long':                                                                                   # agents are rows in the time by environment by agent data, so no agent columns need to be found
+                y_long_name = y_series_name.format('').strip('_')                                                       # name of the y data series without agent id (e.g. '{}_catch_expectation_heatmap' -> 'catch_expectation_heatmap')
+                scenario_data = self.__read_long_agent_data(data_subfolder, scenario, x_series_name, y_long_name,
+                                                            time_start)
+                prepared_data = pd.DataFrame()
+                prepared_data['{}_{}_bins'.format(scenario, x_short)] = \
+                    pd.cut(scenario_data[x_series_name], bins=[0, 20, 40, 60, 80, 100, 120, 140, 160, 180, 200])
+                prepared_data['{}_{}'.format(scenario, y_short)] = scenario_data[y_long_name]
+            else:
+                # read scenario data
+                scenario_data_path = 'output/data_output/{}/flat_time_x_{}_results{}'.format(
+                    data_subfolder, file_name, scenario)
+                y_columns = re.compile(re.escape(y_series_name).replace(re.escape('{}'), '.*'))                         # pattern of the y data series of every agent
+                scenario_data = self.__read_scenario_data(
+                    scenario_data_path,
+                    columns=['time_id', x_series_name] +
+                    [column for column in self.data_reader.read_columns(scenario_data_path + self.file_extension)
+                     if y_columns.fullmatch(column)])
+                scenario_data = scenario_data[scenario_data['time_id'] >= time_start]
+                # prepare dataframe to build a graph from
+                relevant_data[scenario] = pd.DataFrame()
 
-            # get a single stock bins data series
-            relevant_data[scenario]['{}_{}'.format(scenario, x_short)] = copy.deepcopy(scenario_data[x_series_name])
-            relevant_data[scenario]['{}_{}_bins'.format(scenario, x_short)] = \
-                pd.cut(relevant_data[scenario]['{}_{}'.format(scenario, x_short)],
-                       bins=[0, 20, 40, 60, 80, 100, 120, 140, 160, 180, 200])
+                # get a single stock bins data series
+                relevant_data[scenario]['{}_{}'.format(scenario, x_short)] = copy.deepcopy(scenario_data[x_series_name])
+                relevant_data[scenario]['{}_{}_bins'.format(scenario, x_short)] = \
+                    pd.cut(relevant_data[scenario]['{}_{}'.format(scenario, x_short)],
+                           bins=[0, 20, 40, 60, 80, 100, 120, 140, 160, 180, 200])
 
-            # find columns containing agents
-            # 0) define pattern to search for in column names using regular expressions
-            regex = re.compile(r'(agent_\d*)')
+                # find columns containing agents
+                # 0) define pattern to search for in column names using regular expressions
+                regex = re.compile(r'(agent_\d*)')
 
-            # 1) # get Column names
-            column_names = copy.deepcopy(list(scenario_data.columns))
+                # 1) # get Column names
+                column_names = copy.deepcopy(list(scenario_data.columns))
 
-            # 2) list comprehension in combination with regular expression to find agent names
-            agents = [re.findall(regex, column) for column in column_names]
+                # 2) list comprehension in combination with regular expression to find agent names
+                agents = [re.findall(regex, column) for column in column_names]
 
-            # 3) select only columns that refer to an a value for an individual agent (have 'agent_<##>' in the column name)
-            agents = [column for column in agents if len(column) > 0]
+                # 3) select only columns that refer to an a value for an individual agent (have 'agent_<##>' in the column name)
+                agents = [column for column in agents if len(column) > 0]
 
-            # 4) list comprehension fist instance of list in list is new list entry (re.findall returns a list with values)
-            agents = [agent[0] for agent in agents]
+                # 4) list comprehension fist instance of list in list is new list entry (re.findall returns a list with values)
+                agents = [agent[0] for agent in agents]
 
-            # 5) find only unique agents in columns (the set object can only obtain unique values)
-            agents = set(agents)
-            agents = list(agents)
-            agents.sort()
+                # 5) find only unique agents in columns (the set object can only obtain unique values)
+                agents = set(agents)
+                agents = list(agents)
+                agents.sort()
 
-            # loop over agent columns
-            prepared_data = pd.DataFrame()
-            for agent in agents:
-                temp_data = pd.DataFrame()
+                # loop over agent columns
+                prepared_data = pd.DataFrame()
+                for agent in agents:
+                    temp_data = pd.DataFrame()
 
-                temp_data['{}_{}_bins'.format(scenario, x_short)] = copy.deepcopy(relevant_data[scenario]['{}_{}_bins'.format(scenario, x_short)])
-                y_column_name = y_series_name.format(agent)
-                temp_data['{}_{}'.format(scenario, y_short)] = copy.deepcopy(scenario_data[y_column_name])
-                prepared_data = pd.concat([prepared_data, copy.deepcopy(temp_data)])
+                    temp_data['{}_{}_bins'.format(scenario, x_short)] = copy.deepcopy(relevant_data[scenario]['{}_{}_bins'.format(scenario, x_short)])
+                    y_column_name = y_series_name.format(agent)
+                    temp_data['{}_{}'.format(scenario, y_short)] = copy.deepcopy(scenario_data[y_column_name])
+                    prepared_data = pd.concat([prepared_data, copy.deepcopy(temp_data)])
 
             # create boxplot
             plot = prepared_data.boxplot(column='{}_{}'.format(scenario, y_short),
@@ -323,9 +372,10 @@ class GraphMaker:
 
         for scenario in selected_scenarios['scenario_id'].values:
             # read scenario data
-            scenario_data = pd.read_csv(
-                'output/data_output/{}/flat_time_x_{}_results{}.csv'.format(
-                    data_subfolder, file_name, scenario))
+            scenario_data = self.__read_scenario_data(
+                'output/data_output/{}/flat_time_x_{}_results{}'.format(
+                    data_subfolder, file_name, scenario),
+                columns=['time_id', x_series_name, y_series_name])
             scenario_data = scenario_data[scenario_data['time_id'] >= time_start]
             # prepare dataframe to build a graph from
             relevant_data[scenario] = pd.DataFrame()
@@ -365,9 +415,10 @@ class GraphMaker:
 
         for scenario in selected_scenarios['scenario_id'].values:
             # read scenario data
-            scenario_data = pd.read_csv(
-                'output/data_output/{}/flat_time_x_{}_results{}.csv'.format(
-                    data_subfolder, file_name, scenario))
+            scenario_data = self.__read_scenario_data(
+                'output/data_output/{}/flat_time_x_{}_results{}'.format(
+                    data_subfolder, file_name, scenario),
+                columns=['time_id', 'agent_id', 'realised_catch'])
             scenario_data = scenario_data[scenario_data['time_id'] >= time_start]
 
             # prepare dataframe to build a graph from
@@ -402,9 +453,10 @@ class GraphMaker:
 
         for scenario in selected_scenarios['scenario_id'].values:
             # read scenario data
-            scenario_data = pd.read_csv(
-                'output/data_output/{}/flat_time_x_{}_results{}.csv'.format(
-                    data_subfolder, file_name, scenario))
+            scenario_data = self.__read_scenario_data(
+                'output/data_output/{}/flat_time_x_{}_results{}'.format(
+                    data_subfolder, file_name, scenario),
+                columns=['time_id', 'agent_id', 'realised_catch'])
             scenario_data = scenario_data[scenario_data['time_id'] >= time_start]
 
             # prepare dataframe to build a graph from
@@ -448,9 +500,10 @@ class GraphMaker:
                 # select a single scenario
                 scenario = selected_scenarios[((selected_scenarios[y_name] == y_value) & (selected_scenarios[x_name] == x_value))]['scenario_id'].iloc[0]
                 # load scenario data
-                scenario_data = pd.read_csv(
-                    'output/data_output/{}/flat_time_x_{}_results{}.csv'.format(
-                        data_subfolder, file_name, scenario))
+                scenario_data = self.__read_scenario_data(
+                    'output/data_output/{}/flat_time_x_{}_results{}'.format(
+                        data_subfolder, file_name, scenario),
+                    columns=['time_id', 'agent_id', 'realised_catch'])
 
                 scenario_data = scenario_data[scenario_data['time_id'] >= time_start]
 
@@ -513,9 +566,10 @@ class GraphMaker:
                 # select a single scenario
                 scenario = selected_scenarios[((selected_scenarios[y_name] == y_value) & (selected_scenarios[x_name] == x_value))]['scenario_id'].iloc[0]
                 # load scenario data
-                scenario_data = pd.read_csv(
-                    'output/data_output/{}/flat_time_x_{}_results{}.csv'.format(
-                        data_subfolder, file_name, scenario))
+                scenario_data = self.__read_scenario_data(
+                    'output/data_output/{}/flat_time_x_{}_results{}'.format(
+                        data_subfolder, file_name, scenario),
+                    columns=['time_id', 'agent_id', 'realised_catch'])
 
                 scenario_data = scenario_data[scenario_data['time_id'] >= time_start]
 
@@ -0,0 +1,105 @@
+"""
+This Module is used to measure how much time (and memory) every phase of a model run takes, with a PhaseProfiler
+object: e.g. ordering the agents, making choices, competition and sharing in every time step of run_model.py, and
+extracting and writing the output data in artemis.py. For every phase the wall time, the number of calls and,
+if memory is tracked, the bytes allocated (the increase to the peak of traced memory during every call) are summed.
+
+Profiling is opt-in: a disabled PhaseProfiler returns the same empty context for every phase, so the phases cost a
+single function call. Tracking memory uses the tracemalloc module, which slows down the model run considerably, so
+wall times should be measured without it
+
+Module inputs:
+-   the profiling settings of the scenario config file, see config_yml.py
+
+Module Usage:
+-   artemis.py makes a PhaseProfiler for every iteration, merges them and writes the report to a json file
+-   run_model.py measures the phases of every time step
+
+Last Updated:
+    18-10-2026
+
+Version Number:
+    0.1
+"""
+
+import json
+import timeit
+import tracemalloc
+from contextlib import nullcontext
+
+
+class PhaseProfiler:
+    """Class to sum the wall time, number of calls and allocated bytes of every phase of a model run"""
+
+    def __init__(self, enabled=False, memory=False):
+        self.enabled = enabled
+        self.memory = enabled and memory                                                                                # track allocated bytes with tracemalloc
+        self.phases = {}                                                                                                # dictionary with the wall time, calls and allocated bytes of every phase
+        self.__null_phase = nullcontext()
+        self.__started_tracemalloc = False
+
+    def start(self):
+        """starts tracing memory allocations, if memory is tracked"""
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracemalloc = True
+
+    def stop(self):
+        """stops tracing memory allocations, if started by this PhaseProfiler"""
+        if self.__started_tracemalloc:
+            tracemalloc.stop()
+            self.__started_tracemalloc = False
+
+    def phase(self, name):
+        """returns a context that measures a call of the phase with the given name, phases should not be nested"""
+        if not self.enabled:
+            return self.__null_phase
+        if name not in self.phases:
+            self.phases[name] = {'wall_time': 0.0, 'calls': 0, 'allocated_bytes': 0 if self.memory else None}
+        return _PhaseTimer(self.phases[name], self.memory)
+
+    def merge(self, phases):
+        """adds the measurements of the phases of another PhaseProfiler (e.g. of another iteration)"""
+        for name, measurements in phases.items():
+            if name not in self.phases:
+                self.phases[name] = dict(measurements)
+                continue
+            self.phases[name]['wall_time'] += measurements['wall_time']
+            self.phases[name]['calls'] += measurements['calls']
+            if self.phases[name]['allocated_bytes'] is not None and measurements['allocated_bytes'] is not None:
+                self.phases[name]['allocated_bytes'] += measurements['allocated_bytes']
+
+    def write_report(self, file_path, **run_information):
+        """writes the measurements of all phases to a json file, with the given information on the run (e.g. the
+        total runtime), phases are ordered from the largest to the smallest wall time"""
+        report = dict(run_information)
+        report['memory_tracked'] = self.memory
+        report['phases'] = dict(sorted(self.phases.items(), key=lambda phase: phase[1]['wall_time'], reverse=True))
+        with open(file_path, 'w') as file:
+            json.dump(report, file, indent=4)
+
+
+class _PhaseTimer:
+    """context measuring a single call of a phase"""
+
+    __slots__ = ('measurements', 'memory', 'start_time', 'start_memory')
+
+    def __init__(self, measurements, memory):
+        self.measurements = measurements
+        self.memory = memory
+
+    def __enter__(self):
+        if self.memory:
+            tracemalloc.reset_peak()
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.start_time = timeit.default_timer()
+        return self
+
+    def __exit__(self, *exception):
+        self.measurements['wall_time'] += timeit.default_timer() - self.start_time
+        self.measurements['calls'] += 1
+        if self.memory:
+            self.measurements['allocated_bytes'] += tracemalloc.get_traced_memory()[1] - self.start_memory
+        return False
+
+# EOF
@@ -6,20 +6,22 @@ This Module is aimed at extracting data and measures from unusable data formats
 
 Module inputs:
 -   No Modules
--   Module only works on objects defined in the modules agents.py and choice_set.py
+-   Module only works on objects defined in the modules agents.py and choice_set.py,
+    data tracked over time is read from their TrackerStore objects (trackers.py)
 
 Module Usage:
 -   methods of the DataExtractor object are used in ARTEMIS.py to write output data,
     outputs generated there are then used as input for export_data.py to write .csv data files
 
 Last Updated:
-    04-01-2021
+    18-10-2026
 
 Version Number:
     0.1
 """
 
 # import external packages
+import numpy as np
 import pandas as pd
 from collections import defaultdict
 
@@ -35,6 +37,7 @@ class DataExtractor:
         aids runtime and readability"""
 
         self.functionality_extraction = self.__init_functionality_extraction()                                          # functionality to extract data as tracked by the model
+        self.tracker_requirements = self.__init_tracker_requirements()                                                  # trackers every data series is extracted from
 
     def __init_functionality_extraction(self):
         """initialises a dictionary containing all possible functionality
@@ -80,12 +83,68 @@ class DataExtractor:
                         'agent_potential_real_catch':
                             self.__extract_flat_time_environment_agent_potential_catch                                  # What could an agent (seperate data series for every agent) have caught in an individual environmental subsection / choice option / DiscreteAlternative if it had foraged there without competition
                         # INSERT FURTHER FUNCTIONALITY
+                    },
+
+                'time_x_environment_x_agent':                                                                           # data specific for individual time steps, environmental subsections and agents, as a single row per combination (long format) instead of a column per agent
+                    {
+                        'agent_perceptions':
+                            self.__extract_long_environment_agent_time_agent_perceptions,                               # What did every agent expect he was going to catch in every environmental subsection / choice option / DiscreteAlternative
+                        'agent_potential_real_catch':
+                            self.__extract_long_environment_agent_time_agent_potential_catch                            # What could every agent have caught in every environmental subsection / choice option / DiscreteAlternative if it had foraged there without competition
+                        # INSERT FURTHER FUNCTIONALITY
                     }
 
                 # INSERT POTENTIAL OTHER OUTPUT DATA TYPES HERE
             }
         return functionality
 
+    def __init_tracker_requirements(self):
+        """initialises a dictionary with the tracker every data series is extracted from,
+        as ('agents', tracker name) for the trackers of the AgentFleet
+        and ('options', tracker name) for the trackers of the ChoiceSet,
+        data series without an entry ('general') are always available"""
+        requirements = \
+            {
+                'time_x_agent':
+                    {
+                        'forage_option_visit': ('agents', 'forage_visit'),
+                        'average_expected_competition': ('agents', 'average_expected_competitors'),
+                        'realised_competition': ('agents', 'realised_competition'),
+                        'knowledge_in_heatmap': ('agents', 'knowledge_in_heatmap'),
+                        'heatmap_expectation': ('agents', 'heatmap_expectation'),
+                        'uncorrected_catch': ('agents', 'uncorrected_catch'),
+                        'realised_catch': ('agents', 'corrected_catch')
+                    },
+
+                'time_x_environment':
+                    {
+                        'id_agents_visited': ('agents', 'forage_visit'),
+                        'environmental_stock': ('options', 'resource_stock'),
+                        'nb_agents_visited': ('options', 'nb_agents_visited'),
+                        'occurred_competition_correction': ('options', 'competition_correction'),
+                        'theoretical_competition_correction': ('options', 'hypothetical_competition_correction'),
+                        'agent_perceptions': ('agents', 'heatmap'),
+                        'agent_potential_real_catch': ('options', 'resource_stock')
+                    },
+
+                'time_x_environment_x_agent':
+                    {
+                        'agent_perceptions': ('agents', 'heatmap'),
+                        'agent_potential_real_catch': ('options', 'resource_stock')
+                    }
+            }
+        return requirements
+
+    def __is_tracked(self, data_type, data_series, agent_set, choice_set=None):
+        """returns if the tracker a data series is extracted from was recorded during the simulation"""
+        if data_series not in self.tracker_requirements[data_type]:
+            return True
+
+        owner, tracker = self.tracker_requirements[data_type][data_series]
+        if owner == 'agents':
+            return tracker in agent_set.trackers
+        return tracker in choice_set.trackers
+
 # ----------------------------------------------------------------------------------------------------------------------
 # ------------------------------------------ Extract Raw Agent by Time data --------------------------------------------
 # ----------------------------------------------------------------------------------------------------------------------
@@ -95,12 +154,15 @@ class DataExtractor:
         desired outcome data can be defined as a list of names
         as a subset of the dictionary keys in the functionality dictionary,
         if 'wanted_data' is left emtpy all currently implemented data series are returned
-        if wanted data is defined, it is recommended to include 'general' as id tags for all data series"""
+        if wanted data is defined, it is recommended to include 'general' as id tags for all data series,
+        data series of trackers that were not recorded are left out of 'ALL' and raise an error when wanted"""
 
         data_output = pd.DataFrame()                                                                                    # prepare output data container
 
         if wanted_data == 'ALL':
             for data_series_extractor in self.functionality_extraction['time_x_agent']:                                 # loop over all data series we have functionality on in the functionality dictionary and add each series to the pandas.Dataframe data container
+                if not self.__is_tracked('time_x_agent', data_series_extractor, agent_set):                             # skip data series of trackers that were not recorded
+                    continue
                 data_output = self.functionality_extraction['time_x_agent'][data_series_extractor](agent_set,
                                                                                                     data_output,
                                                                                                     iteration_id)
@@ -112,6 +174,11 @@ class DataExtractor:
                         'supported functionalities are:\t{}'.format(
                             list(self.functionality_extraction['time_x_agent'].keys())))
 
+                elif not self.__is_tracked('time_x_agent', data_series_extractor, agent_set):                           # error handling: let user know the tracker of the wanted data series was not recorded
+                    raise ValueError(
+                        'defined data series {} is not available, tracker {} was not recorded'.format(
+                            data_series_extractor, self.tracker_requirements['time_x_agent'][data_series_extractor][1]))
+
                 else:                                                                                                   # loop over all wanted data series and add each series to the pandas.Dataframe data container
                     data_output = self.functionality_extraction['time_x_agent'][data_series_extractor](agent_set,
                                                                                                    data_output,
@@ -126,28 +193,14 @@ class DataExtractor:
         iteration id, time step id, agent id, agent group id"""
 
         input_data = agent_set.agents                                                                                   # define what part of the agent fleet the data is at
+        time_ids = agent_set.trackers.time_ids                                                                          # every time step tracked in the model
 
-        data_series_iteration = []                                                                                      # prepare data container for iteration id tags in the output data
-        data_series_time = []                                                                                           # prepare data container for time id tags in the output data
-        data_series_agent = []                                                                                          # prepare data container for agent id tags in the output data
-        data_series_group_allegiance = []                                                                               # prepare data container for agent group id tags in the output data
-        # data_series_catch = []
-
-        for time_id in tuple(input_data[next(iter(input_data))].time_step_catch.keys()):                                # loop over the items (time_steps) in an immutable list of time_steps as logged in the time_step_catch tracker of the first agent in the model
-            for agent in input_data:
-                data_series_iteration.append(iteration_id)                                                              # fill data container for iteration id tags in the output data
-                data_series_time.append(time_id)                                                                        # fill data container for time id tags in the output data
-                data_series_agent.append(agent)                                                                         # fill data container for agent id tags in the output data
-                data_series_group_allegiance.append(
-                    input_data[agent].heatmap_exchanger.relevant_data['group_allegiance'])                              # fill data container for agent group id tags in the output data
-                # data_series_catch.append(input_data[agent].time_step_catch[time_id])
-
-        output_data['iteration_id'] = data_series_iteration                                                             # load data container for iteration id tags to match desired output data format
-        output_data['time_id'] = data_series_time                                                                       # load data container for time id tags to match desired output data format
-        output_data['agent_id'] = data_series_agent                                                                     # load data container for agent id tags to match desired output data format
-        output_data['group_allegiance'] = data_series_group_allegiance                                                  # load data container for agent group id tags to match desired output data format
-        # output_data['catch'] = data_series_catch
-        # TODO: Catch as commented out above seems to be bugging, other tracker for catch yields other, more logical data -- DOUBLE Check functionality
+        group_names = np.asarray(agent_set.group_former.relevant_data['group_names'])                                   # agent group id tags, indexed by the group indices in the tracker
+
+        output_data['iteration_id'] = [iteration_id] * (len(time_ids) * len(input_data))                                # load data container for iteration id tags to match desired output data format
+        output_data['time_id'] = np.repeat(time_ids, len(input_data))                                                   # load data container for time id tags to match desired output data format
+        output_data['agent_id'] = agent_set.agent_labels * len(time_ids)                                                # load data container for agent id tags (labels of the agent indices) to match desired output data format
+        output_data['group_allegiance'] = group_names[agent_set.trackers['group_allegiance'].ravel()]                   # load tracker (time step x agent) of the group of every agent into desired output data format
 
         return output_data                                                                                              # return output data
 
@@ -155,30 +208,16 @@ class DataExtractor:
         """Extracts the Environment unit/Choice option/ DiscreteAlternative
         visited for every time step and agent"""
 
-        input_data = agent_set.forage_visit_tracker                                                                     # define what part of the agent fleet the data is at
-
-        data_series_forage_visits = []                                                                                  # prepare data container for the considered data series to load into the output data
-
-        for time_id in tuple(input_data.keys()):                                                                        # fill data container for the considered data by looping over time and agents in the tracker variable
-            for agent in input_data[time_id]:
-                data_series_forage_visits.append(input_data[time_id][agent])                                            # add time and agent specific data point to prepared data container
+        input_data = agent_set.trackers['forage_visit']                                                                 # define what part of the agent fleet the data is at
 
-        output_data['forage_visit'] = data_series_forage_visits                                                         # load data container into desired output data format
+        output_data['forage_visit'] = np.asarray(agent_set.alternative_labels)[input_data.ravel()]                      # translate the choice option indices to labels and load into desired output data format
 
         return output_data                                                                                              # return output data
 
     def __extract_flat_agent_time_average_expected_competition(self, agent_set, output_data=pd.DataFrame(), iteration_id=-99):
         """Extracts the average expected competition for every time step and agent - Theoretical concept"""
 
-        input_data = agent_set.average_expected_competitor_tracker                                                      # define what part of the agent fleet the data is at
-
-        data_series_competition = []                                                                                    # prepare data container for the considered data series to load into the output data
-
-        for time_id in tuple(input_data.keys()):                                                                        # fill data container for the considered data by looping over time and agents in the tracker variable
-            for agent in input_data[time_id]:
-                data_series_competition.append(input_data[time_id][agent])                                              # add time and agent specific data point to prepared data container
-
-        output_data['average_expected_competitors'] = data_series_competition                                           # load data container into desired output data format
+        output_data['average_expected_competitors'] = agent_set.trackers['average_expected_competitors'].ravel()         # load tracker (time step x agent) into desired output data format
 
         return output_data                                                                                              # return output data
 
@@ -186,15 +225,7 @@ class DataExtractor:
         """Extract the competition encountered (as number other agents foraging in the same choice)
          by every individual agent for every time step"""
 
-        input_data = agent_set.realised_competition_tracker                                                             # define what part of the agent fleet the data is at
-
-        data_series_realised_competition = []                                                                           # prepare data container for the considered data series to load into the output data
-
-        for time_id in tuple(input_data.keys()):                                                                        # fill data container for the considered data by looping over time and agents in the tracker variables
-            for agent in input_data[time_id]:
-                data_series_realised_competition.append(input_data[time_id][agent])                                     # add time and agent specific data point to prepared data container
-
-        output_data['realised_competition'] = data_series_realised_competition                                          # load data container into desired output data format
+        output_data['realised_competition'] = agent_set.trackers['realised_competition'].ravel()                        # load tracker (time step x agent) into desired output data format
 
         return output_data                                                                                              # return output data
 
@@ -202,15 +233,7 @@ class DataExtractor:
         """Extracts the heatmap fill (as number of choice options with a memory entry)
          for every time step and agent"""
 
-        input_data = agent_set.agents                                                                                   # define what part of the agent fleet the data is at
-
-        data_series_knowledge = []                                                                                      # prepare data container for the considered data series to load into the output data
-
-        for time_id in tuple(input_data[next(iter(input_data))].knowledge_evolution_tracker.keys()):                    # fill data container for the considered data by looping over time and agents in the tracker variables
-            for agent in input_data:
-                data_series_knowledge.append(len(input_data[agent].knowledge_evolution_tracker[time_id]))               # add time and agent specific data point to prepared data container
-
-        output_data['knowledge_in_heatmap'] = data_series_knowledge                                                     # load data container into desired output data format
+        output_data['knowledge_in_heatmap'] = agent_set.trackers['knowledge_in_heatmap'].ravel()                        # load tracker (time step x agent) into desired output data format
 
         return output_data                                                                                              # return output data
 
@@ -218,15 +241,7 @@ class DataExtractor:
         """Extracts the expected amount of catch (as entry in an agent's heatmap entry for the chosen choice options)
          for every time step and agent"""
 
-        input_data = agent_set.heatmap_expectation_tracker                                                              # define what part of the agent fleet the data is at
-
-        data_series_heatmap_expectation = []                                                                            # prepare data container for the considered data series to load into the output data
-
-        for time_id in tuple(input_data.keys()):                                                                        # fill data container for the considered data by looping over time and agents in the tracker variables
-            for agent in input_data[time_id]:
-                data_series_heatmap_expectation.append(input_data[time_id][agent])                                      # add time and agent specific data point to prepared data container
-
-        output_data['heatmap_expected_catch'] = data_series_heatmap_expectation                                         # load data container into desired output data format
+        output_data['heatmap_expected_catch'] = agent_set.trackers['heatmap_expectation'].ravel()                       # load tracker (time step x agent) into desired output data format
 
         return output_data                                                                                              # return output data
 
@@ -234,15 +249,7 @@ class DataExtractor:
         """Extracts the theoretical catch that would have been achieved in the absence of competition,
          for every time step and agent"""
 
-        input_data = agent_set.uncorrected_catch_tracker                                                                # define what part of the agent fleet the data is at
-
-        data_series_uncorrected_catch = []                                                                              # prepare data container for the considered data series to load into the output data
-
-        for time_id in tuple(input_data.keys()):                                                                        # fill data container for the considered data by looping over time and agents in the tracker variables
-            for agent in input_data[time_id]:
-                data_series_uncorrected_catch.append(input_data[time_id][agent])                                        # add time and agent specific data point to prepared data container
-
-        output_data['uncorrected_catch'] = data_series_uncorrected_catch                                                # load data container into desired output data format
+        output_data['uncorrected_catch'] = agent_set.trackers['uncorrected_catch'].ravel()                              # load tracker (time step x agent) into desired output data format
 
         return output_data                                                                                              # return output data
 
@@ -250,15 +257,7 @@ class DataExtractor:
         """Extracts the realised catch that is achieved
          for every time step and agent"""
 
-        input_data = agent_set.corrected_catch_tracker                                                                  # define what part of the agent fleet the data is at
-
-        data_series_realised_catch = []                                                                                 # prepare data container for the considered data series to load into the output data
-
-        for time_id in tuple(input_data.keys()):                                                                        # fill data container for the considered data by looping over time and agents in the tracker variables
-            for agent in input_data[time_id]:
-                data_series_realised_catch.append(input_data[time_id][agent])                                           # add time and agent specific data point to prepared data container
-
-        output_data['realised_catch'] = data_series_realised_catch                                                      # load data container into desired output data format
+        output_data['realised_catch'] = agent_set.trackers['corrected_catch'].ravel()                                   # load tracker (time step x agent) into desired output data format
 
         return output_data                                                                                              # return output data
 
@@ -266,31 +265,28 @@ class DataExtractor:
 # --------------------------------- Extract Raw Environment/Choice Set by Time data ------------------------------------
 # ----------------------------------------------------------------------------------------------------------------------
 
-    def get_time_x_environment_data(self, agent_set, choice_set, iteration_id):
+    def get_time_x_environment_data(self, agent_set, choice_set, iteration_id, agent_columns=True):
         """Extract unaggregated time by individual choice option/ environment subsection data
-        for all implemented functionality"""
+        for all implemented functionality,
+        if agent_columns is False the data series with a column for every agent are left out,
+        these can be extracted in long format with get_time_x_environment_x_agent_data instead"""
 
-        input_data = choice_set.stock_time_tracker                                                                      # define what part of the choice set/environment object the data is at
+        time_ids = choice_set.trackers.time_ids                                                                         # every time step tracked in the model
+        alternative_ids = list(choice_set.alternative_labels)                                                           # choice options are labelled only in the output data
 
         data_output = pd.DataFrame()                                                                                    # prepare output data container
 
         # get basic information data series (iteration data series, time series and alternative ID series)
-        data_series_iteration = []                                                                                      # prepare data container for iteration id tag data series to load into the output data container
-        data_series_time = []                                                                                           # prepare data container for time id tag data series to load into the output data
-        data_series_alternatives = []                                                                                   # prepare data container for choice_option/environment subsection tag data series to load into the output data
-
-        for time_id in input_data:                                                                                      # fill data container for the considered data by looping over time and choice options in the tracker variables
-            for alternative in choice_set.discrete_alternatives:
-                data_series_iteration.append(iteration_id)                                                              # fill data container for iteration id tags in the output data
-                data_series_time.append(time_id)                                                                        # fill data container for time id tags in the output data
-                data_series_alternatives.append(alternative)                                                            # fill data container for choice option/ environment subsection id tags in the output data
-
-        data_output['iteration_id'] = data_series_iteration                                                             # load iteration id tag data container into desired output data format
-        data_output['time_id'] = data_series_time                                                                       # load time id tag data container into desired output data format
-        data_output['alternative_id'] = data_series_alternatives                                                        # load choice option tag data container into desired output data format
+        data_output['iteration_id'] = [iteration_id] * (len(time_ids) * len(alternative_ids))                           # load iteration id tag data container into desired output data format
+        data_output['time_id'] = np.repeat(time_ids, len(alternative_ids))                                              # load time id tag data container into desired output data format
+        data_output['alternative_id'] = alternative_ids * len(time_ids)                                                 # load choice option tag data container into desired output data format
 
         # include iteration ID, time_id and alternative ID
         for data_series_extractor in self.functionality_extraction['time_x_environment']:                               # loop over all data series we have functionality on in the functionality dictionary and add each series to the pandas.Dataframe data container
+            if not self.__is_tracked('time_x_environment', data_series_extractor, agent_set, choice_set):               # skip data series of trackers that were not recorded
+                continue
+            if not agent_columns and data_series_extractor in self.functionality_extraction['time_x_environment_x_agent']:
+                continue                                                                                                # skip data series with a column per agent
 
             data_output = \
                 self.functionality_extraction['time_x_environment'][data_series_extractor](agent_set=agent_set,
@@ -301,14 +297,17 @@ class DataExtractor:
 
     def __extract_flat_environment_time_agents_visited(self, agent_set, choice_set, data_output, iteration_id):
 
-        input_data = agent_set.forage_visit_tracker                                                                     # define what part of the agent fleet the data is at
+        input_data = agent_set.trackers['forage_visit']                                                                 # define what part of the agent fleet the data is at
+        agent_ids = agent_set.agent_labels                                                                              # agents are labelled only in the output data
+        nb_alternatives = len(choice_set.discrete_alternatives)
 
         data_series_agents_visited = []                                                                                 # prepare data container for the considered data series to load into the output data
 
-        for time_id in input_data:
-            for alternative in choice_set.discrete_alternatives:                                                        # fill data container for the considered data by looping over time and choice options in the tracker variables
-                agents_visited = '|'.join([key for key, value in input_data[time_id].items() if value == alternative])  # construct data point using list comprehension (find what agents (keys) have chosen the considered choice_option/DiscretAlternative/Environment Unit (values)
-                data_series_agents_visited.append(agents_visited)                                                       # add time and choice option specific data point to prepared data container
+        for time_step_visits in input_data:
+            agents_visited = [[] for _ in range(nb_alternatives)]
+            for row, alternative in enumerate(time_step_visits.tolist()):                                               # find what agents have chosen each choice_option/DiscretAlternative/Environment Unit
+                agents_visited[alternative].append(agent_ids[row])
+            data_series_agents_visited.extend('|'.join(agents) for agents in agents_visited)                            # add time and choice option specific data points to prepared data container
 
         data_output['agents_visited'] = data_series_agents_visited                                                      # load data container into desired output data format
 
@@ -318,15 +317,7 @@ class DataExtractor:
         """Extracts the resource stock that is present
          for every time step and individual Choice Option/Environment Unit/ DiscreteAlternative"""
 
-        input_data = choice_set.stock_time_tracker                                                                      # define what part of the choice set/environment object the data is at
-
-        data_series_stock = []                                                                                          # prepare data container for the considered data series to load into the output data
-
-        for time_id in input_data:                                                                                      # fill data container for the considered data by looping over time and choice options in the tracker variables
-            for alternative in input_data[time_id]:
-                data_series_stock.append(input_data[time_id][alternative])                                              # add time and choice option specific data point to prepared data container
-
-        data_output['real_stock'] = data_series_stock                                                                   # load data container into desired output data format
+        data_output['real_stock'] = choice_set.trackers['resource_stock'].ravel()                                       # load tracker (time step x choice option) into desired output data format
 
         return data_output                                                                                              # return output data
 
@@ -334,15 +325,7 @@ class DataExtractor:
         """Extracts the number of agents that has visited
          for every time step and individual Choice Option/Environment Unit/ DiscreteAlternative"""
 
-        input_data = choice_set.time_visit_map                                                                          # define what part of the choice set/environment object the data is at
-
-        data_series_nb_agents = []                                                                                      # prepare data container for the considered data series to load into the output data
-
-        for time_id in input_data[next(iter(input_data))]:
-            for alternative in input_data:
-                data_series_nb_agents.append(input_data[alternative][time_id])
-
-        data_output['nb_agents_visited'] = data_series_nb_agents                                                        # load data container into desired output data format
+        data_output['nb_agents_visited'] = choice_set.trackers['nb_agents_visited'].ravel()                             # load tracker (time step x choice option) into desired output data format
 
         return data_output                                                                                              # return output data
 
@@ -350,15 +333,8 @@ class DataExtractor:
                                                                         iteration_id):
         """Extracts the correction factor that was used to correct catch for any forager having foraged
         for every time step and any given individual Choice Option/Environment Unit/ DiscreteAlternative """
-        input_data = choice_set.competition_correction                                                                  # define what part of the choice set/environment object the data is at
 
-        data_series_competition_correction = []                                                                         # prepare data container for the considered data series to load into the output data
-
-        for time_id in input_data:                                                                                      # fill data container for the considered data by looping over time and choice options in the tracker variables
-            for alternative in input_data[time_id]:
-                data_series_competition_correction.append(input_data[time_id][alternative])                             # add time and choice option specific data point to prepared data container
-
-        data_output['occurred_competition_correction'] = data_series_competition_correction                             # load data container into desired output data format
+        data_output['occurred_competition_correction'] = choice_set.trackers['competition_correction'].ravel()          # load tracker (time step x choice option) into desired output data format
 
         return data_output                                                                                              # return output data
 
@@ -368,15 +344,9 @@ class DataExtractor:
         if the number of agents foraging in any given  Choice Option/Environment Unit/ DiscreteAlternative was increased
         by one,
         for every time step and any given individual Choice Option/Environment Unit/ DiscreteAlternative """
-        input_data = choice_set.hypothetical_competition_correction                                                     # define what part of the choice set/environment object the data is at
-
-        data_series_hypothetical_competition_correction = []                                                            # prepare data container for the considered data series to load into the output data
 
-        for time_id in input_data:                                                                                      # fill data container for the considered data by looping over time and choice options in the tracker variables
-            for alternative in input_data[time_id]:
-                data_series_hypothetical_competition_correction.append(input_data[time_id][alternative])                # add time and choice option specific data point to prepared data container
-
-        data_output['hypothetical_competition_correction'] = data_series_hypothetical_competition_correction            # load data container into desired output data format
+        data_output['hypothetical_competition_correction'] = \
+            choice_set.trackers['hypothetical_competition_correction'].ravel()                                          # load tracker (time step x choice option) into desired output data format
 
         return data_output                                                                                              # return output data
 
@@ -385,16 +355,11 @@ class DataExtractor:
         """Extracts the catch for every agent (separate data series/column) expects to achieve when fishing,
          for every time step and individual Choice Option/Environment Unit/ DiscreteAlternative"""
 
-        input_data = agent_set.heatmap_tracker                                                                          # define what part of the agent fleet the data is at
+        input_data = agent_set.trackers['heatmap']                                                                      # define what part of the agent fleet the data is at (time step x agent x choice option)
 
         dict_output = {}
-        for agent in agent_set.agents:                                                                                  # loop over every agent to get a seperate data series for every individual agent
-            agent_expected_catch_series = []                                                                            # prepare data container for the considered data series to load into the output data
-            for time in input_data:                                                                                     # fill data container for the considered data by looping over time and choice options in the tracker variables
-                for alternative in input_data[time][agent]:
-                    agent_expected_catch_series.append(input_data[time][agent][alternative])                            # add time and choice option specific data point to prepared data container
-
-            dict_output[agent + '_catch_expectation_heatmap'] = agent_expected_catch_series                             # load data container (for a specific agent) into desired output data format
+        for row, agent in enumerate(agent_set.agent_labels):                                                            # loop over every agent to get a seperate data series for every individual agent
+            dict_output[agent + '_catch_expectation_heatmap'] = input_data[:, row, :].ravel()                           # load data series (for a specific agent) into desired output data format
 
         data_append = pd.DataFrame(dict_output)
         # TODO: merge on agent/time columns (instead of index) would be better.
@@ -406,23 +371,72 @@ class DataExtractor:
         (not taking into account competition),
         for every time step and individual Choice Option/Environment Unit/ DiscreteAlternative"""
 
-        input_data = agent_set.catch_potential_tracker                                                                  # define what part of the agent fleet the data is at
+        input_data = choice_set.trackers['resource_stock'].ravel()                                                      # the stock at the start of a time step is the stock agents forage on in that time step
 
         dict_output = {}
-        for agent in agent_set.agents:                                                                                  # loop over every agent to get a seperate data series for every individual agent
-            agent_catch_potential_series = []                                                                           # prepare data container for the considered data series to load into the output data
-            for time in input_data:                                                                                     # fill data container for the considered data by looping over time and choice options in the tracker variables
-                for alternative in input_data[time][agent]:
-                    agent_catch_potential_series.append(input_data[time][agent][alternative])                           # add time and choice option specific data point to prepared data container
-
-            dict_output[agent + '_catch_potential'] = agent_catch_potential_series                                      # load data container (for a specific agent) into desired output data format
+        for agent_id, agent in agent_set.agents.items():                                                                # loop over every agent to get a seperate data series for every individual agent
+            dict_output[agent_set.agent_labels[agent_id] + '_catch_potential'] = \
+                input_data * agent.catchability_coefficient                                                             # load data series (for a specific agent) into desired output data format
             # TODO: Quick and dirty fix does not take competition into account
-        
+
         data_append = pd.DataFrame(dict_output)
         # TODO: merge on agent/time columns (instead of index) would be better.
         data_output = data_output.merge(data_append, left_index=True, right_index=True)
         return data_output                                                                                              # return output data
 
+# ----------------------------------------------------------------------------------------------------------------------
+# ---------------------------- Extract Raw Environment/Choice Set by Agent by Time data --------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+
+    def get_time_x_environment_x_agent_data(self, agent_set, choice_set, iteration_id):
+        """Extract unaggregated time by individual choice option/ environment subsection by individual agent data
+        in long format (a row for every time step, choice option and agent, ordered in that way),
+        built directly from the (time step x agent x choice option) tracker arrays"""
+
+        time_ids = choice_set.trackers.time_ids                                                                         # every time step tracked in the model
+        alternative_ids = list(choice_set.alternative_labels)                                                           # choice options are labelled only in the output data
+        agent_ids = list(agent_set.agent_labels)                                                                        # agents are labelled only in the output data
+        nb_rows = len(time_ids) * len(alternative_ids) * len(agent_ids)
+
+        data_output = pd.DataFrame()                                                                                    # prepare output data container
+
+        # get basic information data series (iteration data series, time series, alternative ID and agent ID series)
+        data_output['iteration_id'] = np.full(nb_rows, iteration_id)                                                    # load iteration id tag data container into desired output data format
+        data_output['time_id'] = np.repeat(time_ids, len(alternative_ids) * len(agent_ids))                             # load time id tag data container into desired output data format
+        data_output['alternative_id'] = np.tile(np.repeat(alternative_ids, len(agent_ids)), len(time_ids))             # load choice option tag data container into desired output data format
+        data_output['agent_id'] = np.tile(agent_ids, len(time_ids) * len(alternative_ids))                              # load agent tag data container into desired output data format
+
+        for data_series_extractor in self.functionality_extraction['time_x_environment_x_agent']:                       # loop over all data series we have functionality on in the functionality dictionary and add each series to the pandas.Dataframe data container
+            if not self.__is_tracked('time_x_environment_x_agent', data_series_extractor, agent_set, choice_set):       # skip data series of trackers that were not recorded
+                continue
+
+            data_output = \
+                self.functionality_extraction['time_x_environment_x_agent'][data_series_extractor](
+                    agent_set=agent_set, choice_set=choice_set, data_output=data_output, iteration_id=iteration_id)
+        return data_output                                                                                              # return output data
+
+    def __extract_long_environment_agent_time_agent_perceptions(self, agent_set, choice_set, data_output, iteration_id):
+        """Extracts the catch every agent expects to achieve when fishing,
+        for every time step, individual Choice Option/Environment Unit/ DiscreteAlternative and agent"""
+
+        input_data = agent_set.trackers['heatmap']                                                                      # define what part of the agent fleet the data is at (time step x agent x choice option)
+
+        data_output['catch_expectation_heatmap'] = input_data.transpose(0, 2, 1).ravel()                                # reorder to (time step x choice option x agent) and load into desired output data format
+
+        return data_output                                                                                              # return output data
+
+    def __extract_long_environment_agent_time_agent_potential_catch(self, agent_set, choice_set, data_output,
+                                                                      iteration_id):
+        """Extracts the catch that every agent could have achieved when fishing (not taking into account competition),
+        for every time step, individual Choice Option/Environment Unit/ DiscreteAlternative and agent"""
+
+        stock = choice_set.trackers['resource_stock']                                                                   # the stock at the start of a time step is the stock agents forage on in that time step (time step x choice option)
+        catchability = np.array([agent.catchability_coefficient for agent in agent_set.agents.values()])
+
+        data_output['catch_potential'] = (stock[:, :, np.newaxis] * catchability).ravel()                               # (time step x choice option x agent) potential catch, loaded into desired output data format
+
+        return data_output                                                                                              # return output data
+
 # ----------------------------------------------------------------------------------------------------------------------
 # ---------------- Junk/ Remnant methods that need to be checked if still usable/necessary/salvageable -----------------
 # ----------------------------------------------------------------------------------------------------------------------
@@ -431,10 +445,9 @@ class DataExtractor:
     def extract_average_expected_competition(self, agent_set):
         """extract data series on Theoretical expected competition over time for every agent"""
 
-        data_output = pd.DataFrame(agent_set.average_expected_competitor_tracker).transpose()                           # make a pd.Dataframe from the data on the average number of competitors in a given choice option
-        data_output.insert(loc=0, column='time_step_id', value=data_output.index)                                       # repair small error in tracker->pd.dataframe conversion --> get time_step column from index
-        data_output.reset_index(inplace=True)                                                                           # reset index values to default indices
-        data_output.drop(columns='index', inplace=True)                                                                 # remove newly created redundant column 'index'
+        data_output = pd.DataFrame(agent_set.trackers['average_expected_competitors'],
+                                   columns=list(agent_set.agent_labels))                                                # make a pd.Dataframe from the data on the average number of competitors in a given choice option
+        data_output.insert(loc=0, column='time_step_id', value=agent_set.trackers.time_ids)                             # get time_step column from the tracked time step ids
 
         return data_output
 
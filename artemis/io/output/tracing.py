@@ -0,0 +1,97 @@
+"""
+This Module is used to report on the progress of a model run (e.g. the start of every time step, the choice of every
+agent) with a Tracer object, instead of print statements in the model loops. Every event has a level:
+-   'iteration'     the start of an iteration
+-   'time_step'     the start of a time step
+-   'agent'         events of single agents (e.g. choices, exploring, sharing)
+
+Events up to the print level are printed and events up to the capture level are captured as records, a sample of
+the agent events if a sample rate below 1 is given. Events of disabled levels cost a single attribute check
+(e.g. tracer.traces_agents) in the model loops, as their messages are never formatted.
+Agents and choice options are reported by their index in the model, which is translated to their label (e.g.
+'alternative_07') once label tables are set
+
+Module inputs:
+-   the tracing settings of the scenario config file, see config_yml.py
+
+Module Usage:
+-   artemis.py makes a Tracer for every iteration and writes the captured events to a data file
+-   run_model.py, agents.py, choice_making.py and sharing.py report events to the Tracer
+
+Last Updated:
+    18-10-2026
+
+Version Number:
+    0.1
+"""
+
+import pandas as pd
+from artemis.core.random_streams import RandomStream
+
+TRACE_LEVELS = {'off': 0, 'iteration': 1, 'time_step': 2, 'agent': 3}                                                  # every level includes the events of the levels before it
+EVENT_COLUMNS = ['iteration_id', 'time_id', 'level', 'event', 'agent_id', 'alternative_id', 'message']                 # columns of the captured events
+
+
+class Tracer:
+    """Class to print and capture the events of a model run up to a given level"""
+
+    def __init__(self, level='off', capture_level='off', sample_rate=1.0, random_stream=None):
+        for trace_level in (level, capture_level):
+            if trace_level not in TRACE_LEVELS:
+                raise ValueError('trace level {} is not supported, supported levels are: {}'
+                                 .format(trace_level, list(TRACE_LEVELS)))
+        self.print_level = TRACE_LEVELS[level]                                                                          # events up to this level are printed
+        self.capture_level = TRACE_LEVELS[capture_level]                                                                # events up to this level are captured
+        self.sample_rate = sample_rate                                                                                  # fraction of the agent events that is captured
+        self.random_stream = RandomStream() if random_stream is None else random_stream                                 # stream of random numbers to sample agent events with
+        self.events = []                                                                                                # captured events, as tuples in the order of EVENT_COLUMNS
+        self.iteration_id = ''
+        self.time_id = ''
+        self.agent_labels = None                                                                                        # label of every agent index, None to report indices as they are
+        self.alternative_labels = None                                                                                  # label of every choice option index, None to report indices as they are
+
+        enabled_level = max(self.print_level, self.capture_level)
+        self.traces_iterations = enabled_level >= TRACE_LEVELS['iteration']                                             # flags to check before reporting an event, so disabled levels cost nothing more
+        self.traces_time_steps = enabled_level >= TRACE_LEVELS['time_step']
+        self.traces_agents = enabled_level >= TRACE_LEVELS['agent']
+
+    def set_time(self, iteration_id=None, time_id=None):
+        """sets the iteration and/or time step of the events that follow"""
+        if iteration_id is not None:
+            self.iteration_id = iteration_id
+        if time_id is not None:
+            self.time_id = time_id
+
+    def set_labels(self, agent_labels=None, alternative_labels=None):
+        """sets the tables to translate agent and choice option indices to labels with"""
+        self.agent_labels = agent_labels
+        self.alternative_labels = alternative_labels
+
+    def event(self, level, event, message, agent_id='', alternative_id='', **fields):
+        """prints and/or captures an event, message is formatted with the iteration_id, time_id, agent_id and
+        alternative_id of the event and any further fields (e.g. group), only if the event is printed or captured"""
+        level_number = TRACE_LEVELS[level]
+        printed = level_number <= self.print_level
+        captured = level_number <= self.capture_level and \
+            (level != 'agent' or self.sample_rate >= 1 or self.random_stream.random() < self.sample_rate)
+        if not (printed or captured):
+            return
+
+        if self.agent_labels is not None and agent_id != '':
+            agent_id = self.agent_labels[agent_id]
+        if self.alternative_labels is not None and alternative_id != '':
+            alternative_id = self.alternative_labels[alternative_id]
+        message = message.format(iteration_id=self.iteration_id, time_id=self.time_id, agent_id=agent_id,
+                                 alternative_id=alternative_id, **fields)
+        if printed:
+            print(message)
+        if captured:
+            self.events.append((self.iteration_id, self.time_id, level, event, agent_id, alternative_id, message))
+
+    def get_events_data(self):
+        """returns a dataframe with the captured events, and clears them"""
+        events_data = pd.DataFrame(self.events, columns=EVENT_COLUMNS)
+        self.events = []
+        return events_data
+
+# EOF
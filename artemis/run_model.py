@@ -13,8 +13,7 @@ Version Number:
 0.2
 """
 
-import random
-import copy
+from artemis.io.output.profiling import PhaseProfiler
 
 class ModelRunner:
 
@@ -32,70 +31,99 @@ class ModelRunner:
                   stock_reset_chance,                                                                                   # the chance a stock is reste at the end of time step
                   iteration_id,                                                                                         # for reporting on iterations
                   min_stock,                                                                                            # the minimum value of a reset stock if the stock is reset as drwan from a uniform distribution
-                  max_stock):                                                                                           # the maximum value of a reset stock if the stock is reset as drwan from a uniform distribution
-
+                  max_stock,                                                                                            # the maximum value of a reset stock if the stock is reset as drwan from a uniform distribution
+                  tracer=None,                                                                                          # object reporting the progress of the simulation, by default that of the fleet
+                  profiler=None):                                                                                       # object measuring the phases of every time step, by default disabled
+
+        # random numbers are drawn from the random streams of the fleet and the choice set (see random_streams.py)
+        if tracer is None:
+            tracer = fleet.tracer
+        if profiler is None:
+            profiler = PhaseProfiler()
         # loop for every time step
         time_tracker = 0                                                                                                # set a counter for time steps
         while time_tracker < duration:                                                                                  # begin looping over all time steps in the model
-            print('---------------------------------------------------------------------------------------------------',
-                  '\nStarting time step no.{} in iteration no. {}\n'.format(str(time_tracker), iteration_id),
-                  "---------------------------------------------------------------------------------------------------"
-                  )
             time_id = str(time_tracker).zfill(len(str(duration)))                                                       # construct the time step id in text
+            tracer.set_time(iteration_id=iteration_id, time_id=time_id)
+            if tracer.traces_time_steps:
+                tracer.event('time_step', 'time_step_start',
+                             '---------------------------------------------------------------------------------------------------'
+                             ' \nStarting time step no.{time_id} in iteration no. {iteration_id}\n '
+                             '---------------------------------------------------------------------------------------------------')
             
-            fleet.order_agents()                                                                                        # shuffle agent foraging order for equal opportunities
-            fleet.update_memory_trackers(time_id)                                                                       # record knowledge on the choice options/ environmental units /  DiscreteALternatives at the start of a time period
-            fleet.update_average_expected_competitor_tracker(time_id)                                                   # update tracker for the average expected amount of competitors
-            choice_set.update_environmental_stock_tracker(time_id=time_id)                                              # save real stock ofevrry subunit of the environment (e.g. grid cell) into a tracker
-
-            # loop for every agent
-            for agent in fleet.agent_index_list:                                                                        # begin choosing a forage option (e.g. grid cell) that every agent wil forage in
-
-                fleet.update_heatmap_tracker(time_id=time_id, agent_id=agent)                                           # save current perception of the full environment (heatmap) into a tracker
-                fleet.update_catch_potential_tracker(time_id=time_id, agent_id=agent, choice_set=choice_set)
-
-                alternative_index = fleet.agents[agent].make_choice(choice_set)                                         # agent chooses a forage option/location (e.g. Grid cell)
-                fleet.update_forage_visit_tracker(time_id=time_id,
-                                                     agent_id=agent,
-                                                     chosen_alternative=alternative_index)                              # update the tracker that keeps track of where agents have gone to: TODO: QUICK and DIRTY implemented fo rnow
-                fleet.update_heatmap_expectation_tracker(time_id=time_id, agent_id=agent,                               # load the (a priori) expected catch in the chosen forage option (e.g. Grid Cell) to the fleet tracker
-                                                         expected_catch=copy.deepcopy(
-                                                             fleet.agents[agent].heatmap[alternative_index]))
-                competition_handler.load_competition_data(alternative_index, agent)                                     # load the id of the chosen alternative to the object that will introduce competition between agents
-
-            for agent in fleet.agent_index_list:                                                                        # Second agent loop to execute foraging --> second loop is needed to account for competition
-                competition_handler.competition_correction(choice_set, fleet, agent, time_id=time_id)                   # Catch is corrected for competition effects and trackers are updated, if harvest removal is on, the stock is also reduced
-                fleet.agents[agent].heatmap_exchanger.provide_data(fleet)                                               # share data with other agent(s)
-
-            # growth of the resource stock
-            # TODO: Migrate functionality to new object StockDynamicHandler
-            for alternative in choice_set.discrete_alternatives:                                                        # loop over all choice options to allow resource stock growth, if enabled
-                choice_set.discrete_alternatives[alternative].stock_growth()
-
-            # reset the stocks if chosen for a static stock format - otherwise keep old stock
-            # TODO: migrate if-statement(s) functionality to library dictionary in new object StockDynamicHandler
-            if stock_reset_scenario == 'normal_random_repeat':                                                          # if statement for repeating stocks
-                alternative_tracker = 0                                                                                 # initialise counter for loop functionality
-                nb_alternatives = len(choice_set.discrete_alternatives)                                                 # extract a list of choice option IDs
-                while alternative_tracker < nb_alternatives:                                                            # Loop over all choice options
-                    if random.random() < stock_reset_chance:                                                            # if a random number between 0 and 1 is below the stock reset chance, we reset the stock
-                        alternative_id = "alternative_" + str(alternative_tracker).zfill(len(str(nb_alternatives)))     # transform counter variable into actual choice option ID.
-                        choice_set.discrete_alternatives[alternative_id].\
-                            initialize_standard_stock(init_stock=init_stock, sd_init_stock=sd_init_stock,
-                                                      stock_distribution=stock_reset_scenario)                          # reinitialise stock drawn from a normal distribution with goven mean and init stock
-                    alternative_tracker += 1                                                                            # proceed to next choice option
-
-            elif stock_reset_scenario == 'uniform_random_repeat':                                                       # if statement for repeating stocks
-                alternative_tracker = 0                                                                                 # initialise counter for loop functionality
-                nb_alternatives = len(choice_set.discrete_alternatives)                                                 # extract a list of choice option IDs
-                while alternative_tracker < nb_alternatives:                                                            # Loop over all choice options
-                    if random.random() < stock_reset_chance:                                                            # if a random number between 0 and 1 is below the stock reset chance, we reset the stock
-                        alternative_id = "alternative_" + str(alternative_tracker).zfill(len(str(nb_alternatives)))     # transform counter variable into actual choice option ID.
-                        choice_set.discrete_alternatives[alternative_id].\
-                            init_uniform_standard_stock(max_stock, min_stock)                                           # reinitialise stock drawn from uniform distribution with given max and and min stock
-                    alternative_tracker += 1
-
-            competition_handler.update_choice_set_competition_trackers(choice_set=choice_set, time_id=time_id)
+            with profiler.phase('ordering'):
+                fleet.order_agents()                                                                                    # shuffle agent foraging order for equal opportunities
+            # trackers that are not recorded (see the trackers section of the configuration) are skipped completely
+            with profiler.phase('memory_trackers'):
+                fleet.update_group_allegiance_tracker(time_id)                                                          # record the group of every agent, as agents may switch groups at the end of a time step
+                if 'knowledge_in_heatmap' in fleet.trackers:
+                    fleet.update_memory_trackers(time_id)                                                               # record knowledge on the choice options/ environmental units /  DiscreteALternatives at the start of a time period
+                if 'resource_stock' in choice_set.trackers:
+                    choice_set.update_environmental_stock_tracker(time_id=time_id)                                      # save real stock ofevrry subunit of the environment (e.g. grid cell) into a tracker
+                if 'heatmap' in fleet.trackers:
+                    fleet.update_heatmap_tracker(time_id=time_id)                                                       # save current perception of the full environment (heatmap) of all agents into a tracker
+            if 'average_expected_competitors' in fleet.trackers:
+                with profiler.phase('expected_competitors'):
+                    fleet.update_average_expected_competitor_tracker(time_id)                                           # update tracker for the average expected amount of competitors
+
+            with profiler.phase('choice'):
+                if fleet.engine == 'vectorized':
+                    chosen_alternatives = fleet.make_choices()                                                          # all agents choose a forage option (column) at once, choices are independent given the heatmaps
+                    fleet.update_choice_trackers_all(time_id=time_id, chosen_alternatives=chosen_alternatives)          # update the trackers on where agents have gone to and what they expected to catch there
+                else:
+                    # loop for every agent
+                    for agent in fleet.agent_index_list:                                                                # begin choosing a forage option (e.g. grid cell) that every agent wil forage in
+                        alternative_index = fleet.agents[agent].make_choice(choice_set)                                 # agent chooses a forage option/location (e.g. Grid cell)
+                        if 'forage_visit' in fleet.trackers:
+                            fleet.update_forage_visit_tracker(time_id=time_id,
+                                                              agent_id=agent,
+                                                              chosen_alternative=alternative_index)                     # update the tracker that keeps track of where agents have gone to: TODO: QUICK and DIRTY implemented fo rnow
+                        if 'heatmap_expectation' in fleet.trackers:
+                            fleet.update_heatmap_expectation_tracker(time_id=time_id, agent_id=agent,                   # load the (a priori) expected catch in the chosen forage option (e.g. Grid Cell) to the fleet tracker
+                                                                     expected_catch=fleet.agents[agent].heatmap[alternative_index])
+                        competition_handler.load_competition_data(alternative_index, agent)                             # load the id of the chosen alternative to the object that will introduce competition between agents
+
+            if fleet.engine == 'vectorized':
+                with profiler.phase('competition'):
+                    competition_handler.competition_correction_all(choice_set, fleet, chosen_alternatives,              # Catch of all agents is corrected for competition effects at once and trackers are updated
+                                                                   time_id=time_id)
+                with profiler.phase('sharing'):
+                    fleet.exchange_heatmaps(chosen_alternatives)                                                        # all agents share data at once, after the catches of all agents instead of after each single catch
+            elif fleet.synchronous_sharing:
+                with profiler.phase('competition'):
+                    for agent in fleet.agent_index_list:                                                                # Second agent loop to execute foraging --> second loop is needed to account for competition
+                        competition_handler.competition_correction(choice_set, fleet, agent, time_id=time_id)           # Catch is corrected for competition effects and trackers are updated, if harvest removal is on, the stock is also reduced
+                with profiler.phase('sharing'):
+                    fleet.exchange_heatmaps_synchronously()                                                             # all agents share data from the heatmaps after the catches of all agents
+            else:                                                                                                       # competition and sharing alternate per agent, so they are measured as a single phase
+                with profiler.phase('competition_and_sharing'):
+                    for agent in fleet.agent_index_list:                                                                # Second agent loop to execute foraging --> second loop is needed to account for competition
+                        competition_handler.competition_correction(choice_set, fleet, agent, time_id=time_id)           # Catch is corrected for competition effects and trackers are updated, if harvest removal is on, the stock is also reduced
+                        fleet.agents[agent].heatmap_exchanger.provide_data(fleet)                                       # share data with other agent(s)
+
+            if fleet.group_former.dynamics is not None:
+                with profiler.phase('group_dynamics'):
+                    fleet.update_group_allegiances(time_id)                                                             # agents may switch to groups whose members caught more in this time step
+
+            with profiler.phase('growth_and_reset'):
+                # growth of the resource stock, for all choice options at once
+                # TODO: Migrate functionality to new object StockDynamicHandler
+                choice_set.grow_stocks()
+
+                # reset the stocks if chosen for a static stock format - otherwise keep old stock
+                choice_set.reset_stocks(stock_reset_scenario=stock_reset_scenario,                                      # every choice option is reset with a chance of stock_reset_chance, drawn from a normal or uniform distribution
+                                        stock_reset_chance=stock_reset_chance,
+                                        init_stock=init_stock, sd_init_stock=sd_init_stock,
+                                        minimum_stock=min_stock, maximum_stock=max_stock)
+
+            with profiler.phase('competition_trackers'):
+                if competition_handler.records_choice_set_competition_trackers(choice_set):
+                    if fleet.engine == 'vectorized':
+                        competition_handler.update_choice_set_competition_trackers_all(choice_set=choice_set,
+                                                                                       time_id=time_id)
+                    else:
+                        competition_handler.update_choice_set_competition_trackers(choice_set=choice_set,
+                                                                                   time_id=time_id)
             competition_handler.reset_relevant_data()                                                                   # ensure the competition_handler is reset to default to start next time_step fresh
             time_tracker += 1                                                                                           # proceed to the next time step
 
@@ -0,0 +1,237 @@
+"""
+This Module is used to run a parameter sweep: a scenario is run for every combination of a set of parameter values.
+-   Expand Sweep                                    (combine the values of the swept parameters into a list of jobs,
+                                                     each with its own scenario data and output subfolder)
+-   Job Manifest                                    (the jobs, a digest of the scenario data and which jobs are
+                                                     completed are recorded in a json file in the output folder, so an
+                                                     interrupted sweep resumes with the jobs that were not completed
+                                                     yet)
+-   Run Jobs                                        (run every job with artemis.run_artemis, jobs can run in parallel
+                                                     processes)
+
+A sweep spec maps a (short) name for every swept parameter to its path in the scenario data and the values it takes,
+e.g. in a yml file:
+
+    parameters:
+        intfac:
+            path: competition > interference_attributes > interference_factor
+            values: [0.9, 1.0]
+        nbsrec:
+            path: agents > sharing > receiver_choice > nb_receivers
+            values: [0, 1]
+
+A path through a list (e.g. 'agents') changes the parameter in every element of the list, unless the next key in the
+path is the name of an element (e.g. 'agents > subfleet001 > sharing > receiver_choice > nb_receivers')
+
+Module inputs:
+-   artemis.py to run a single scenario of the sweep
+
+Module Usage:
+-   run from the command line to run a sweep of a scenario config file and a sweep spec file:
+    python -m artemis.sweep path/to/config.yml path/to/sweep.yml path/to/output_folder --workers 4
+-   or from a python script with run_sweep, e.g. scripts/default_scenario_vary_parameters.py
+
+Last Updated:
+    18-10-2026
+
+Version Number:
+    0.1
+"""
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Import External Modules needed for ARTEMIS functionality
+# ----------------------------------------------------------------------------------------------------------------------
+
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import os
+import timeit                                                                                                           # Import module to track runtime
+from concurrent.futures import ProcessPoolExecutor, as_completed                                                        # Pool of processes to run jobs in parallel
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Import Internal Modules built for ARTEMIS functionality
+# ----------------------------------------------------------------------------------------------------------------------
+
+from artemis.artemis import run_artemis                                                                                 # Module to run a single scenario
+from artemis.io.input.config_yml import read_data_from_yml
+
+MANIFEST_FILE_NAME = 'sweep_manifest.json'                                                                              # file in the output folder recording the jobs of a sweep
+PATH_SEPARATOR = '>'                                                                                                    # separator of the keys in a parameter path, as in the input description
+
+
+def expand_sweep(parameters):
+    """Expand a sweep spec into a list of jobs, one for every combination of parameter values.
+
+    Parameters
+    ----------
+    parameters: dict
+        Python dictionary with for every swept parameter name a dictionary with the 'path' of the parameter in the
+        scenario data and the 'values' it takes.
+
+    Returns
+    -------
+    list
+        Python dictionary for every job with its 'job_id' (used as scenario id and output subfolder) and the value of
+        every swept parameter ('parameters'), in the order of itertools.product over the parameter values.
+    """
+
+    names = list(parameters)
+    for name in names:
+        if 'path' not in parameters[name] or 'values' not in parameters[name]:
+            raise ValueError('Sweep parameter {} needs a path and values'.format(name))
+
+    jobs = []
+    for values in itertools.product(*(parameters[name]['values'] for name in names)):
+        job_id = '_'.join('{}{}'.format(name, value) for name, value in zip(names, values))
+        jobs.append({'job_id': job_id, 'parameters': dict(zip(names, values))})
+    return jobs
+
+
+def job_scenario_data(scenario_data, parameters, job):
+    """returns a copy of the scenario data with the parameter values of a job"""
+    job_data = copy.deepcopy(scenario_data)
+    for name, value in job['parameters'].items():
+        keys = [key.strip() for key in parameters[name]['path'].split(PATH_SEPARATOR)]
+        _set_parameter(job_data, keys, value)
+    job_data['scenario_id'] = '_' + job['job_id']                                                                       # name output files after the job
+    return job_data
+
+
+def _set_parameter(data, keys, value):
+    if isinstance(data, list):                                                                                          # list (e.g. of agents): change the element with the next key as name, or all elements
+        named = [element for element in data if isinstance(element, dict) and element.get('name') == keys[0]]
+        if named:
+            data, keys = named, keys[1:]
+        for element in data:
+            _set_parameter(element, keys, value)
+    elif len(keys) == 1:
+        data[keys[0]] = value
+    elif keys[0] not in data:
+        raise KeyError('Sweep parameter path not found in scenario data: {}'.format(keys[0]))
+    else:
+        _set_parameter(data[keys[0]], keys[1:], value)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Job Manifest
+# ----------------------------------------------------------------------------------------------------------------------
+
+def scenario_digest(scenario_data):
+    """returns a sha256 digest of the scenario data all jobs start from, to recognize a sweep of changed scenario data"""
+    return hashlib.sha256(json.dumps(scenario_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def load_manifest(output_basefolder, jobs, scenario_data):
+    """returns the manifest of the sweep in the output folder, or a new manifest for the jobs if there is none yet.
+    A ValueError is raised if the manifest in the output folder belongs to a different sweep, with other jobs or
+    other scenario data"""
+    manifest_file = os.path.join(output_basefolder, MANIFEST_FILE_NAME)
+    digest = scenario_digest(scenario_data)
+    if not os.path.exists(manifest_file):
+        return {'scenario_digest': digest, 'jobs': [dict(job, completed=False) for job in jobs]}
+
+    with open(manifest_file) as file:
+        manifest = json.load(file)
+    recorded_jobs = [{'job_id': job['job_id'], 'parameters': job['parameters']} for job in manifest['jobs']]
+    if manifest.get('scenario_digest') != digest or recorded_jobs != json.loads(json.dumps(jobs)):                                                                   # compare as stored in json (e.g. tuples as lists)
+        raise ValueError('{} holds a different sweep; use another output folder or remove the manifest'
+                         .format(manifest_file))
+    return manifest
+
+
+def write_manifest(output_basefolder, manifest):
+    """writes the manifest to the output folder, replacing the file in one step so an interruption cannot corrupt it"""
+    manifest_file = os.path.join(output_basefolder, MANIFEST_FILE_NAME)
+    with open(manifest_file + '.tmp', 'w') as file:
+        json.dump(manifest, file, indent=4)
+    os.replace(manifest_file + '.tmp', manifest_file)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Run Jobs
+# ----------------------------------------------------------------------------------------------------------------------
+
+def run_sweep(scenario_data, parameters, output_basefolder, workers=1, save_config=True):
+    """Run a scenario for every combination of parameter values, skipping jobs completed in an earlier run.
+
+    Parameters
+    ----------
+    scenario_data: dict
+        Python dictionary containing the scenario data all jobs start from.
+    parameters: dict
+        Python dictionary with for every swept parameter name a dictionary with the 'path' of the parameter in the
+        scenario data and the 'values' it takes.
+    output_basefolder: str
+        Path to the output folder, the output of every job is written to a subfolder named after the job.
+    workers: int, optional
+        Number of processes that run jobs in parallel. Iterations of a job run in a single process if more than one
+        worker is used. Default: 1.
+    save_config: bool, optional
+        Set to True to save the configuration file of every job to its output subfolder. Default: True.
+
+    Returns
+    -------
+    list
+        ids of the jobs that were run.
+    """
+
+    start = timeit.default_timer()
+    jobs = expand_sweep(parameters)
+    os.makedirs(output_basefolder, exist_ok=True)
+    manifest = load_manifest(output_basefolder, jobs, scenario_data)
+    write_manifest(output_basefolder, manifest)
+
+    pending_jobs = [job for job in manifest['jobs'] if not job['completed']]
+    print('running {} of {} sweep jobs ({} completed earlier)'.format(len(pending_jobs), len(jobs),
+                                                                       len(jobs) - len(pending_jobs)))
+
+    iteration_workers = None if workers == 1 else 1                                                                     # jobs already keep all workers busy, so iterations do not start more processes
+    job_arguments = [(job_scenario_data(scenario_data, parameters, job), os.path.join(output_basefolder, job['job_id']),
+                      save_config, iteration_workers) for job in pending_jobs]
+
+    if workers == 1:
+        for job, arguments in zip(pending_jobs, job_arguments):
+            _run_job(*arguments)
+            job['completed'] = True
+            write_manifest(output_basefolder, manifest)                                                                 # record every completed job, so an interrupted sweep resumes after it
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_run_job, *arguments): job for job, arguments in zip(pending_jobs, job_arguments)}
+            for future in as_completed(futures):                                                                       # record jobs in the order they complete
+                future.result()                                                                                         # raise errors of a job
+                futures[future]['completed'] = True
+                write_manifest(output_basefolder, manifest)
+
+    stop = timeit.default_timer()
+    print("Sweep Runtime: \t{} seconds".format(str(stop - start)))
+    return [job['job_id'] for job in pending_jobs]
+
+
+def _run_job(job_data, output_subfolder, save_config, workers):
+    os.makedirs(output_subfolder, exist_ok=True)
+    run_artemis(job_data, output_subfolder, save_config=save_config, workers=workers)
+
+
+def main(arguments=None):
+    """runs a sweep from the command line"""
+    parser = argparse.ArgumentParser(description='Run an ARTEMIS scenario for every combination of parameter values.')
+    parser.add_argument('scenario_file', help='scenario config (yml) file all jobs start from')
+    parser.add_argument('sweep_file', help='sweep spec (yml) file with the swept parameters under "parameters"')
+    parser.add_argument('output_folder', help='output folder, every job writes to a subfolder named after the job')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='number of processes that run jobs in parallel (default: number of cpus)')
+    parser.add_argument('--no-save-config', dest='save_config', action='store_false',
+                        help='do not save the config file of every job to its output subfolder')
+    arguments = parser.parse_args(arguments)
+
+    run_sweep(read_data_from_yml(arguments.scenario_file), read_data_from_yml(arguments.sweep_file)['parameters'],
+              arguments.output_folder, workers=arguments.workers, save_config=arguments.save_config)
+
+
+if __name__ == "__main__":
+    main()
+
+# EOF
@@ -0,0 +1,37 @@
+""""Shared helpers for the unit tests, to set up (the fleet of) the default scenario with a few settings changed."""
+
+# import testing package and internal modules
+import os
+import artemis
+from artemis.artemis import initialize_model
+from artemis.core.random_streams import RandomStreams
+from artemis.io.input.config_yml import Configuration
+from artemis.io.output.tracing import Tracer
+
+
+def update_nested(data, overrides):
+    """updates a nested dictionary in place with the values of a nested dictionary of overrides"""
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(data.get(key), dict):
+            update_nested(data[key], value)
+        else:
+            data[key] = value
+
+
+def default_scenario_data(scenario=None, agents=None, engine='dict'):
+    """returns the scenario data of the default scenario of 2 time steps, with the given engine, the overrides of the
+    scenario data and the overrides of the data of every agent (both nested dictionaries)"""
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    update_nested(scenario_data, {'model': {'duration': 2, 'engine': engine}})
+    update_nested(scenario_data, scenario or {})
+    for agent in scenario_data['agents']:
+        update_nested(agent, agents or {})
+    return scenario_data
+
+
+def make_fleet(scenario=None, agents=None, engine='dict', seed=0):
+    """initializes the fleet of the default scenario, see default_scenario_data for the settings that can be changed"""
+    _, fleet = initialize_model(Configuration(default_scenario_data(scenario, agents, engine)),
+                                random_streams=RandomStreams(seed), tracer=Tracer())
+    return fleet
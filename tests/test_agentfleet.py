@@ -0,0 +1,69 @@
+""""Unit tests for artemis.core.agents.AgentFleet; run with pytest."""
+
+# import testing package and internal modules
+import numpy as np
+import pytest
+from conftest import make_fleet
+
+
+def encounter_matrix_competitors(fleet):
+    """the average number of expected competitors of every agent, from the full agent x agent encounter matrix"""
+    heatmaps = fleet.heatmap_matrix()
+    number_of_options = heatmaps.shape[1]
+    explore_probability = np.array([agent.explore_probability for agent in fleet.agents.values()])[:, np.newaxis]
+    prob_matrix = heatmaps / heatmaps.sum(axis=1, keepdims=True) * (1 - explore_probability) \
+        + explore_probability / number_of_options
+    encounter_matrix = prob_matrix @ prob_matrix.T
+    np.fill_diagonal(encounter_matrix, 0)
+    return encounter_matrix.sum(axis=1) / number_of_options
+
+
+@pytest.mark.parametrize('engine', ['dict', 'array', 'vectorized'])
+def test_average_expected_competitors(engine):
+    """Test that the expected competitors match the row sums of the encounter matrix of all agents."""
+    fleet = make_fleet(engine=engine)
+    time_id = fleet.trackers.time_ids[0]
+    fleet.update_average_expected_competitor_tracker(time_id)
+    competitors = fleet.trackers['average_expected_competitors'][fleet.trackers.time_step(time_id)]
+    assert np.allclose(competitors, encounter_matrix_competitors(fleet), rtol=1e-12, atol=0)
+
+
+@pytest.mark.parametrize('engine', ['dict', 'array'])
+def test_expected_competitors_of_changed_heatmaps(engine):
+    """Test that updating only the rows of changed heatmaps gives the same expected competitors as the encounter
+    matrix, for heatmaps changed by catches and by received data."""
+    fleet = make_fleet(engine=engine)
+    first_time_id, second_time_id = fleet.trackers.time_ids
+    fleet.update_average_expected_competitor_tracker(first_time_id)
+    assert not fleet.changed_heatmaps.any()
+
+    agents = list(fleet.agents.values())
+    agents[3].update_agent_trackers(alternative_index=7, catch=12.5, time_step_counter=first_time_id)
+    agents[5].heatmap_exchanger.functionality['receiving']['combine_receiver']['execute'](([2], [40.0]))
+    assert np.flatnonzero(fleet.changed_heatmaps).tolist() == [agents[3].id, agents[5].id]
+
+    fleet.update_average_expected_competitor_tracker(second_time_id)
+    competitors = fleet.trackers['average_expected_competitors'][fleet.trackers.time_step(second_time_id)]
+    assert np.allclose(competitors, encounter_matrix_competitors(fleet), rtol=1e-12, atol=0)
+
+
+@pytest.mark.parametrize('engine', ['dict', 'vectorized'])
+def test_changed_heatmaps_are_not_marked_without_expected_competitors(engine):
+    """Test that heatmap changes are not marked if the expected competitors are not recorded."""
+    fleet = make_fleet(scenario={'trackers': {'agents': ['corrected_catch']}}, engine=engine)
+    assert fleet.changed_heatmaps is None
+    assert all(agent.changed_heatmaps is None for agent in fleet.agents.values())
+    agents = list(fleet.agents.values())
+    agents[3].update_agent_trackers(alternative_index=7, catch=12.5, time_step_counter=fleet.trackers.time_ids[0])
+    if engine == 'vectorized':
+        fleet.exchange_heatmaps(fleet.make_choices())
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    for engine in ['dict', 'array', 'vectorized']:
+        test_average_expected_competitors(engine)
+    for engine in ['dict', 'array']:
+        test_expected_competitors_of_changed_heatmaps(engine)
+    for engine in ['dict', 'vectorized']:
+        test_changed_heatmaps_are_not_marked_without_expected_competitors(engine)
@@ -0,0 +1,160 @@
+""""Unit tests for artemis.core.allegiances.GroupFormer; run with pytest."""
+
+# import testing package and internal modules
+import json
+import os
+import numpy as np
+import pytest
+import artemis
+from artemis.io.output.export_data import DataReader
+from artemis.io.output.tracing import Tracer
+from conftest import default_scenario_data, make_fleet
+
+
+def make_group_fleet(engine='dict', nb_groups=4, group_dynamics=False, switch_probability=0.1):
+    """initializes the fleet of the default scenario, in which every agent shares with a member of its group"""
+    return make_fleet(scenario={'fleet': {'receiver_choice': {'group_attributes': {
+                                    'nb_groups': nb_groups, 'group_dynamics': group_dynamics,
+                                    'switch_probability': switch_probability}}}},
+                      agents={'sharing': {'receiver_choice': {'nb_receivers': 1}}},
+                      engine=engine)
+
+
+def assert_membership_is_consistent(group_former):
+    """checks that the member blocks, the overview and the group and position of every agent agree"""
+    data = group_former.relevant_data
+    for group, group_name in enumerate(data['group_names']):
+        start, size = data['group_start'][group], data['group_size'][group]
+        assert size <= data['group_capacity'][group]
+        members = data['group_members'][start:start + size].tolist()
+        assert members == data['overview_allegiances'][group_name]
+        assert data['group_of_agent'][members].tolist() == [group] * size
+        assert data['position_in_group'][members].tolist() == list(range(size))
+        assert all(data['personal_allegiances'][member] == group_name for member in members)
+    assert data['group_size'].sum() == len(data['personal_allegiances'])
+
+
+def test_moves_keep_membership_consistent():
+    """Test that moving agents between groups keeps all membership data consistent, also when groups outgrow the
+    room in their block."""
+    group_former = make_group_fleet().group_former
+    rng = np.random.default_rng(0)
+    for agent, group in zip(rng.integers(0, 100, 300).tolist(), rng.integers(0, 4, 300).tolist()):
+        group_former.move(agent, 'group_{}'.format(group))
+        assert_membership_is_consistent(group_former)
+    for agent in range(100):                                                                                            # all agents in a single group, twice its initial room
+        group_former.move(agent, 'group_0')
+    assert_membership_is_consistent(group_former)
+    assert group_former.relevant_data['group_size'].tolist() == [100, 0, 0, 0]
+
+
+def test_picked_members_follow_moves():
+    """Test that agents pick other members of the group they moved to, one by one and all at once."""
+    group_former = make_group_fleet().group_former
+    for agent in range(0, 100, 3):
+        group_former.move(agent, 'group_1')
+    agents = np.repeat(np.arange(100), 50)
+    random_numbers = np.random.default_rng(0).random(len(agents))
+    picked = group_former.pick_other_members(agents, random_numbers)
+
+    personal_allegiances = group_former.relevant_data['personal_allegiances']
+    for agent, random_number, member in zip(agents.tolist(), random_numbers.tolist(), picked.tolist()):
+        assert member != agent
+        assert personal_allegiances[member] == personal_allegiances[agent]
+        assert group_former.pick_other_member(agent, random_number) == member
+
+
+def test_payoff_switching_moves_agents_to_groups_that_caught_more():
+    """Test that agents only switch to groups whose members caught more, and no group is left with a single
+    member."""
+    fleet = make_group_fleet(group_dynamics='payoff_switching', switch_probability=1)
+    group_former = fleet.group_former
+    group_of_agent = group_former.relevant_data['group_of_agent'].copy()
+    catches = np.where(group_of_agent == 0, 10.0, group_of_agent.astype(float))                                         # group 0 caught most, then group 3, 2 and 1
+
+    moves = group_former.run_dynamics(catches)
+    assert moves
+    for agent, group in moves:
+        assert group_former.relevant_data['group_index'][group] in (0, 3, 2)
+        assert catches[group_of_agent == group_former.relevant_data['group_index'][group]].mean() \
+            > catches[group_of_agent == group_of_agent[agent]].mean()
+    assert np.all(group_former.relevant_data['group_size'] >= 2)
+    assert_membership_is_consistent(group_former)
+
+
+def test_group_switches_are_traced():
+    """Test that every agent that switches groups reports its new group, which it keeps as group allegiance."""
+    fleet = make_group_fleet(group_dynamics=True, switch_probability=1)
+    fleet.tracer = Tracer(capture_level='agent')
+    fleet.tracer.set_labels(agent_labels=fleet.agent_labels, alternative_labels=fleet.alternative_labels)
+    time_id = fleet.trackers.time_ids[0]
+    group_of_agent = fleet.group_former.relevant_data['group_of_agent']
+    for agent_id, agent in fleet.agents.items():
+        agent.time_step_catch[time_id] = float(group_of_agent[agent_id])                                                # the higher the group, the more its members caught
+    fleet.update_group_allegiances(time_id)
+
+    events = fleet.tracer.get_events_data()
+    assert len(events) > 0 and set(events['event']) == {'group_switch'}
+    for agent_id, agent in fleet.agents.items():
+        switches = events[events['agent_id'] == fleet.agent_labels[agent_id]]
+        assert switches['message'].tolist() in ([], ['{} has switched to {}'.format(fleet.agent_labels[agent_id],
+                                                                                    agent.group_allegiance)])
+
+
+def test_group_dynamics_validation():
+    """Test that unknown group dynamics are rejected."""
+    with pytest.raises(ValueError):
+        make_group_fleet(group_dynamics='unknown_dynamics')
+
+
+@pytest.mark.parametrize('engine', ['dict', 'vectorized'])
+def test_run_with_group_dynamics(engine, tmp_path):
+    """Test that the groups are updated in every time step of a run with group dynamics."""
+    scenario_data = default_scenario_data(scenario={'model': {'duration': 5},
+                                                    'fleet': {'receiver_choice': {'group_attributes': {
+                                                        'nb_groups': 10, 'group_dynamics': True}}},
+                                                    'profiling': {'enabled': True}},
+                                          agents={'sharing': {'receiver_choice': {'nb_receivers': 1}}},
+                                          engine=engine)
+    artemis.run_artemis(scenario_data, str(tmp_path))
+
+    with open(os.path.join(tmp_path, 'profiling_reportdefault.json')) as file:
+        report = json.load(file)
+    assert report['phases']['group_dynamics']['calls'] == 5
+
+
+def test_output_reports_the_group_of_every_time_step(tmp_path):
+    """Test that the output rows of an agent that switched groups report its old group up to the time step it switched
+    in, and its new group from the next time step on."""
+    scenario_data = default_scenario_data(scenario={'model': {'duration': 6},
+                                                    'fleet': {'receiver_choice': {'group_attributes': {
+                                                        'nb_groups': 4, 'group_dynamics': True,
+                                                        'switch_probability': 0.5}}},
+                                                    'tracing': {'level': 'off', 'capture_level': 'agent'}},
+                                          agents={'sharing': {'receiver_choice': {'nb_receivers': 1}}})
+    artemis.run_artemis(scenario_data, str(tmp_path))
+
+    output_data = DataReader().read(os.path.join(tmp_path, 'flat_time_x_agent_resultsdefault.csv'))
+    groups = output_data.pivot(index='time_id', columns='agent_id', values='group_allegiance')
+    events_data = DataReader().read(os.path.join(tmp_path, 'trace_eventsdefault.csv'))
+    switches = events_data[events_data['event'] == 'group_switch']
+    assert len(switches) > 0
+    for time_id, agent_id, message in switches[['time_id', 'agent_id', 'message']].itertuples(index=False):
+        time_step = groups.index.get_loc(time_id)
+        new_group = message.split()[-1]
+        assert groups[agent_id].iloc[time_step] != new_group
+        if time_step + 1 < len(groups):
+            assert groups[agent_id].iloc[time_step + 1] == new_group
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    import tempfile
+    test_moves_keep_membership_consistent()
+    test_picked_members_follow_moves()
+    test_payoff_switching_moves_agents_to_groups_that_caught_more()
+    test_group_switches_are_traced()
+    test_group_dynamics_validation()
+    for engine in ['dict', 'vectorized']:
+        test_run_with_group_dynamics(engine, tempfile.mkdtemp())
+    test_output_reports_the_group_of_every_time_step(tempfile.mkdtemp())
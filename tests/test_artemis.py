@@ -0,0 +1,64 @@
+""""Unit tests for artemis.artemis.run_artemis; run with pytest."""
+
+# import testing package and internal modules
+import os
+import pandas as pd
+import pytest
+import artemis
+from artemis.artemis import spawn_iteration_seeds
+from artemis.io.output.export_data import DataReader, DataWriter
+
+
+def test_iteration_seeds():
+    """Test that iterations get independent seeds, only derived from the master seed."""
+    seeds = [seed_sequence.generate_state(1)[0] for seed_sequence in spawn_iteration_seeds(3, seed=1)]
+    assert len(set(seeds)) == 3
+    assert seeds == [seed_sequence.generate_state(1)[0] for seed_sequence in spawn_iteration_seeds(3, seed=1)]
+    assert seeds != [seed_sequence.generate_state(1)[0] for seed_sequence in spawn_iteration_seeds(3, seed=2)]
+
+
+def test_parallel_run_matches_serial_run(tmp_path):
+    """Test that a seeded run gives the same output, in iteration order, for any number of workers."""
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    scenario_data['model']['duration'] = 5
+    scenario_data['model']['nb_iterations'] = 3
+    scenario_data['model']['seed'] = 42
+
+    for workers in [1, 2]:
+        output_subfolder = os.path.join(tmp_path, 'workers_{}'.format(workers))
+        os.makedirs(output_subfolder)
+        artemis.run_artemis(scenario_data, output_subfolder, workers=workers)
+
+    for file_name in ['flat_time_x_agent_resultsdefault.csv', 'flat_time_x_environment_resultsdefault.csv']:
+        serial_data = DataReader().read(os.path.join(tmp_path, 'workers_1', file_name))
+        parallel_data = DataReader().read(os.path.join(tmp_path, 'workers_2', file_name))
+        assert serial_data['iteration_id'].is_monotonic_increasing
+        pd.testing.assert_frame_equal(serial_data, parallel_data)
+
+
+def test_failed_run_closes_output_files(tmp_path, monkeypatch):
+    """Test that the output files are finished and the worker processes are stopped if writing the output fails."""
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    scenario_data['model']['duration'] = 2
+    scenario_data['model']['nb_iterations'] = 3
+    closed = []
+
+    def failing_append(self, pd_dataframe, filename):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(DataWriter, 'append', failing_append)
+    monkeypatch.setattr(DataWriter, 'close', lambda self: closed.append(self))
+    with pytest.raises(OSError):
+        artemis.run_artemis(scenario_data, str(tmp_path), workers=2)
+    assert len(closed) == 1
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    import tempfile
+    test_iteration_seeds()
+    test_parallel_run_matches_serial_run(tempfile.mkdtemp())
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_failed_run_closes_output_files(tempfile.mkdtemp(), monkeypatch)
@@ -0,0 +1,54 @@
+""""Unit tests for artemis.core.choice_making.FleetChoiceMaker; run with pytest."""
+
+# import testing package and internal modules
+import numpy as np
+from artemis.core.choice_making import FleetChoiceMaker
+from artemis.core.fleet_state import FleetState
+
+
+def get_fleet_state(choice_method, heatmap, explore_probability=0.0):
+    """FleetState with one agent per heatmap row, all using the same choice method."""
+    nb_agents, nb_alternatives = np.shape(heatmap)
+    fleet_state = FleetState(alternative_ids=['alternative_{}'.format(i) for i in range(nb_alternatives)])
+    for agent in range(nb_agents):
+        fleet_state.add_agent('agent_{}'.format(agent), catchability_coefficient=0.2,
+                              explore_probability=explore_probability, choice_method=choice_method)
+    fleet_state.finalize()
+    fleet_state.heatmap[:] = heatmap
+    return fleet_state
+
+
+def test_choose_all_full_heatmap_ties():
+    """Test that the batched full_heatmap choice resolves ties to the first choice option, like max() on a dict."""
+    fleet_state = get_fleet_state('full_heatmap', [[1.0, 3.0, 3.0], [0.0, 0.0, 0.0], [2.0, 1.0, 2.5]])
+    chosen = FleetChoiceMaker().choose_all(fleet_state, np.random.default_rng(0))
+    assert chosen.tolist() == [1, 0, 2]
+
+
+def test_choose_all_weighted_heatmap():
+    """Test that the batched weighted choice never picks zero weight options and follows the weights."""
+    heatmap = np.tile([0.0, 1.0, 0.0, 3.0], (4000, 1))
+    fleet_state = get_fleet_state('full_weighted_heatmap', heatmap)
+    chosen = FleetChoiceMaker().choose_all(fleet_state, np.random.default_rng(0))
+    counts = np.bincount(chosen, minlength=4)
+    assert counts[0] == 0 and counts[2] == 0
+    assert abs(counts[3] / len(chosen) - 0.75) < 0.03
+
+
+def test_choose_all_explore():
+    """Test that agents that always explore choose at random and agents that never explore exploit."""
+    heatmap = np.tile([0.0, 5.0, 1.0, 0.0], (4000, 1))
+    always_explore = get_fleet_state('explore_heatmap', heatmap, explore_probability=1.0)
+    chosen = FleetChoiceMaker().choose_all(always_explore, np.random.default_rng(0))
+    assert np.all(np.bincount(chosen, minlength=4) > 800)
+
+    never_explore = get_fleet_state('explore_weighted_heatmap', heatmap, explore_probability=0.0)
+    chosen = FleetChoiceMaker().choose_all(never_explore, np.random.default_rng(0))
+    assert set(chosen.tolist()) == {1, 2}
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    test_choose_all_full_heatmap_ties()
+    test_choose_all_weighted_heatmap()
+    test_choose_all_explore()
@@ -0,0 +1,52 @@
+""""Unit tests for artemis.core.choice_set; run with pytest."""
+
+# import testing package and internal modules
+import numpy as np
+from artemis.core.choice_set import ChoiceSet, draw_positive_normal, draw_positive_uniform
+
+
+def get_choice_set(nb_alternatives=1000):
+    np.random.seed(0)
+    return ChoiceSet(nb_alternatives=nb_alternatives, stock_distribution='uniform_random_repeat', init_stock=100,
+                     sd_init_stock=25, minimum_stock=10, maximum_stock=20, growth_factor=1.5)
+
+
+def test_discrete_alternatives_share_choice_set_arrays():
+    """Test that the DiscreteAlternative objects read and write their entry in the ChoiceSet arrays."""
+    choice_set = get_choice_set(nb_alternatives=3)
+    alternative = choice_set.discrete_alternatives[1]
+    assert alternative.alternative_id == 1 and choice_set.alternative_labels[1] == 'alternative_1'
+    assert alternative.resource_stock == choice_set.resource_stocks[1]
+    alternative.resource_stock = 42.0
+    assert choice_set.resource_stocks[1] == 42.0
+    choice_set.grow_stocks()
+    assert alternative.resource_stock == 63.0
+
+
+def test_reset_stocks():
+    """Test that no stock is reset with a reset chance of 0 and every stock is redrawn with a chance of 1."""
+    choice_set = get_choice_set()
+    rng = np.random.default_rng(0)
+    stocks = choice_set.resource_stocks.copy()
+    choice_set.reset_stocks('normal_random_repeat', stock_reset_chance=0, init_stock=100, sd_init_stock=25,
+                            minimum_stock=10, maximum_stock=20, rng=rng)
+    assert np.array_equal(choice_set.resource_stocks, stocks)
+
+    choice_set.reset_stocks('normal_random_repeat', stock_reset_chance=1, init_stock=100, sd_init_stock=25,
+                            minimum_stock=10, maximum_stock=20, rng=rng)
+    assert np.all(choice_set.resource_stocks > 20)                                                                   # far out of the uniform range the stocks were initialised in
+    assert np.all(choice_set.growth_factors == 1.5)                                                                  # resets do not change the growth factor
+
+
+def test_positive_draws():
+    """Test that truncated draws are all positive, also when most draws need to be redrawn."""
+    rng = np.random.default_rng(0)
+    assert np.all(draw_positive_normal(mean=-1, sd=1, size=10000, rng=rng) > 0)
+    assert np.all(draw_positive_uniform(minimum=-100, maximum=1, size=10000, rng=rng) > 0)
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    test_discrete_alternatives_share_choice_set_arrays()
+    test_reset_stocks()
+    test_positive_draws()
@@ -0,0 +1,56 @@
+""""Unit tests for artemis.core.competition.CompetitionHandler; run with pytest."""
+
+# import testing package and internal modules
+import random
+import numpy as np
+import pytest
+from artemis.core.agents import AgentFleet
+from artemis.core.choice_set import ChoiceSet
+from artemis.core.competition import CompetitionHandler
+
+
+def get_fleet_and_choice_set(engine):
+    """AgentFleet of 12 agents with a FleetState, foraging in a ChoiceSet of 5 choice options."""
+    random.seed(0)
+    np.random.seed(0)
+    choice_set = ChoiceSet(nb_alternatives=5, stock_distribution='uniform_random_repeat', init_stock=100,
+                           sd_init_stock=25, minimum_stock=10, maximum_stock=100, duration=2)
+    fleet = AgentFleet(engine=engine)
+    fleet.add(nb_agents=12, choice_set=choice_set, catchability_coefficient=0.2, nb_alternatives_known=2,
+              choice_method='full_heatmap', receiver_choice_strategy='static_group_choice')
+    fleet.finalize_setup(number_of_sharing_groups=1, duration_model=2, agent_ordering_strategy='constant')
+    return fleet, choice_set
+
+
+@pytest.mark.parametrize('competition_method', ['absent', 'interference-simple', 'split-catch'])
+def test_competition_correction_all_matches_per_agent_correction(competition_method):
+    """Test that correcting all agents at once gives the same trackers as correcting them one by one."""
+    chosen_alternatives = np.array([0, 0, 0, 1, 1, 2, 2, 2, 2, 2, 0, 1])                                              # nobody forages in the last two choice options
+
+    fleet, choice_set = get_fleet_and_choice_set('array')
+    handler = CompetitionHandler(competition_method, interference_factor=0.8)
+    for agent_id, column in zip(fleet.agent_index_list, chosen_alternatives):
+        handler.load_competition_data(fleet.fleet_state.alternative_ids[column], agent_id)
+    for agent_id in fleet.agent_index_list:
+        handler.competition_correction(choice_set, fleet, agent_id, time_id='0')
+    handler.update_choice_set_competition_trackers(choice_set, time_id='0')
+
+    fleet_all, choice_set_all = get_fleet_and_choice_set('vectorized')
+    handler_all = CompetitionHandler(competition_method, interference_factor=0.8)
+    handler_all.competition_correction_all(choice_set_all, fleet_all, chosen_alternatives, time_id='0')
+    handler_all.update_choice_set_competition_trackers_all(choice_set_all, time_id='0')
+
+    for tracker in ['corrected_catch', 'uncorrected_catch', 'realised_competition']:
+        np.testing.assert_allclose(fleet_all.trackers[tracker], fleet.trackers[tracker])
+    assert fleet_all.total_catch == pytest.approx(fleet.total_catch)
+    np.testing.assert_allclose(fleet_all.fleet_state.heatmap, fleet.fleet_state.heatmap)
+    np.testing.assert_array_equal(fleet_all.fleet_state.forage_effort, fleet.fleet_state.forage_effort)
+    np.testing.assert_allclose(fleet_all.fleet_state.time_step_catch, fleet.fleet_state.time_step_catch)
+    np.testing.assert_array_equal(choice_set_all.effort_map, choice_set.effort_map)
+    for tracker in ['nb_agents_visited', 'competition_correction', 'hypothetical_competition_correction']:
+        np.testing.assert_allclose(choice_set_all.trackers[tracker], choice_set.trackers[tracker])
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    for method in ['absent', 'interference-simple', 'split-catch']:
+        test_competition_correction_all_matches_per_agent_correction(method)
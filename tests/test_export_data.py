@@ -0,0 +1,88 @@
+""""Unit tests for artemis.io.output.export_data.DataWriter; run with pytest."""
+
+# import testing package and internal modules
+import os
+import random
+import numpy as np
+import pandas as pd
+import pytest
+import artemis
+from artemis.io.output.export_data import DataWriter, DataReader
+
+
+def test_append_csv_matches_write_csv(tmp_path):
+    """Test that appending iterations one by one gives the same file as writing the concatenated data at once."""
+    iterations = [pd.DataFrame({'iteration_id': [iteration] * 3, 'catch': [0.5, 1.0, 1.5]}) for iteration in range(3)]
+
+    DataWriter('_full').write_csv(pd.concat(iterations).reset_index(drop=True), os.path.join(tmp_path, 'data'))
+    data_writer = DataWriter('_streamed')
+    for iteration_data in iterations:
+        data_writer.append_csv(iteration_data, os.path.join(tmp_path, 'data'))
+
+    with open(os.path.join(tmp_path, 'data_full.csv')) as full, \
+            open(os.path.join(tmp_path, 'data_streamed.csv')) as streamed:
+        assert full.read() == streamed.read()
+
+    with pytest.raises(ValueError):
+        data_writer.append_csv(pd.DataFrame({'catch': [2.0]}), os.path.join(tmp_path, 'data'))
+
+
+def test_append_csv_overwrites_existing_file(tmp_path):
+    """Test that the first append to a file replaces the output of an earlier run."""
+    with open(os.path.join(tmp_path, 'data.csv'), 'w') as old_output:
+        old_output.write('old output\n')
+
+    DataWriter().append_csv(pd.DataFrame({'catch': [1.0]}), os.path.join(tmp_path, 'data'))
+    assert pd.read_csv(os.path.join(tmp_path, 'data.csv'), index_col=0)['catch'].tolist() == [1.0]
+
+
+@pytest.mark.parametrize('output_format', ['npz', 'parquet', 'feather'])
+def test_columnar_formats_round_trip(tmp_path, output_format):
+    """Test that data appended in a columnar format is read back with its data types and only the wanted columns."""
+    if output_format != 'npz':
+        pytest.importorskip('pyarrow')
+    iterations = [pd.DataFrame({'iteration_id': [iteration] * 2, 'time_id': ['00', '01'],
+                                'agents_visited': ['agent_00|agent_01', ''], 'catch': [0.5, 1.5]})
+                  for iteration in range(3)]
+
+    with DataWriter(output_format=output_format) as data_writer:
+        for iteration_data in iterations:
+            data_writer.append(iteration_data, os.path.join(tmp_path, 'data'))
+
+    file_path = os.path.join(tmp_path, 'data.{}'.format(output_format))
+    assert DataReader().read_columns(file_path) == ['iteration_id', 'time_id', 'agents_visited', 'catch']
+    data = DataReader().read(file_path, columns=['time_id', 'catch'])
+    assert list(data.columns) == ['time_id', 'catch']
+    assert data['time_id'].tolist() == [0, 1] * 3                                                                      # time ids are read as integers, as from csv files
+    assert data['catch'].tolist() == [0.5, 1.5] * 3
+    assert DataReader().read(file_path)['agents_visited'].tolist() == ['agent_00|agent_01', ''] * 3
+
+
+def test_run_with_npz_output(tmp_path):
+    """Test that the npz output of a run holds the same data as the csv output."""
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    scenario_data['model']['duration'] = 5
+    scenario_data['model']['nb_iterations'] = 2
+
+    for output_format in ['csv', 'npz']:                                                                                # same random seed, so both runs are identical
+        scenario_data['output'] = {'format': output_format}
+        random.seed(0)
+        np.random.seed(0)
+        artemis.run_artemis(scenario_data, str(tmp_path))
+
+    for file_name in ['flat_time_x_agent_resultsdefault', 'flat_time_x_environment_resultsdefault']:
+        csv_data = DataReader().read(os.path.join(tmp_path, file_name + '.csv')).drop(columns='Unnamed: 0')
+        if 'agents_visited' in csv_data:
+            csv_data['agents_visited'] = csv_data['agents_visited'].fillna('')                                          # empty strings are read as nan from csv files
+        npz_data = DataReader().read(os.path.join(tmp_path, file_name + '.npz'))
+        pd.testing.assert_frame_equal(csv_data, npz_data, check_dtype=False)
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    import tempfile
+    test_append_csv_matches_write_csv(tempfile.mkdtemp())
+    test_append_csv_overwrites_existing_file(tempfile.mkdtemp())
+    test_columnar_formats_round_trip(tempfile.mkdtemp(), 'npz')
+    test_run_with_npz_output(tempfile.mkdtemp())
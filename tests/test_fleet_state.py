@@ -0,0 +1,60 @@
+""""Unit tests for artemis.core.fleet_state and the 'array' engine of artemis.core.agents.AgentFleet; run with pytest."""
+
+# import testing package and internal modules
+import os
+import random
+import numpy as np
+import pandas as pd
+import artemis
+from artemis.core.agents import KnownAlternatives
+from artemis.core.fleet_state import FleetState
+
+
+def test_heatmap_view_known_entries():
+    """Test that a heatmap view behaves as a heatmap dictionary, and the known mask follows the KnownAlternatives."""
+    fleet_state = FleetState(alternative_ids=['alternative_0', 'alternative_1'], initial_capacity=1)
+    row = fleet_state.add_agent('agent_0', catchability_coefficient=0.2, explore_probability=0.1)
+    heatmap = fleet_state.heatmap_view(row)
+    known_alternatives = KnownAlternatives(fleet_state=fleet_state, agent_index=row)
+    assert heatmap['alternative_0'] == 0.0
+    heatmap['alternative_1'] = 2.5
+    assert known_alternatives.add('alternative_1') and not known_alternatives.add('alternative_1')
+    assert heatmap['alternative_1'] == 2.5 and isinstance(heatmap['alternative_1'], float)
+    assert list(heatmap.keys()) == ['alternative_0', 'alternative_1']
+    assert fleet_state.known[row].tolist() == [False, True]
+
+    second_row = fleet_state.add_agent('agent_1', catchability_coefficient=0.3, explore_probability=0.0)            # forces the arrays to grow
+    fleet_state.finalize()
+    assert heatmap['alternative_1'] == 2.5
+    assert known_alternatives.add('alternative_0')
+    assert fleet_state.known[row].tolist() == [True, True]
+    assert list(known_alternatives) == ['alternative_1', 'alternative_0']                                               # in the order they became known
+    assert fleet_state.heatmap.shape == (2, 2)
+    assert fleet_state.catchability[second_row] == 0.3
+
+
+def run_short_scenario(engine, output_subfolder):
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    scenario_data['model']['duration'] = 20
+    scenario_data['model']['engine'] = engine
+    random.seed(0)
+    np.random.seed(0)
+    artemis.run_artemis(scenario_data, str(output_subfolder))
+    return (pd.read_csv(os.path.join(output_subfolder, 'flat_time_x_agent_resultsdefault.csv')),
+            pd.read_csv(os.path.join(output_subfolder, 'flat_time_x_environment_resultsdefault.csv')))
+
+
+def test_array_engine_matches_dict_engine(tmp_path):
+    """Test that the 'array' engine gives exactly the same output as the 'dict' engine for a fixed seed."""
+    (tmp_path / 'dict').mkdir()
+    (tmp_path / 'array').mkdir()
+    agent_dict, environment_dict = run_short_scenario('dict', tmp_path / 'dict')
+    agent_array, environment_array = run_short_scenario('array', tmp_path / 'array')
+    assert agent_dict.equals(agent_array)
+    assert environment_dict.equals(environment_array)
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    test_heatmap_view_known_entries()
@@ -1,15 +1,18 @@
 """"Unit tests for artemis.core.agents.ForagerAgent; run with pytest."""
 
 # import testing package and internal modules
-from artemis.core.agents import ForagerAgent
+import numpy as np
+from artemis.core.agents import ForagerAgent, KnownAlternatives
+from artemis.core.random_streams import RandomStream, RandomStreams
+from conftest import make_fleet
 
 
-def get_minimal_choice_set():
+def get_minimal_choice_set(nb_alternatives=1):
     class Alternative:
         resource_stock = 1
 
     class ChoiceSet:
-        discrete_alternatives = {'alternative_0': Alternative()}
+        discrete_alternatives = {alternative: Alternative() for alternative in range(nb_alternatives)}
     
     return ChoiceSet()
 
@@ -18,21 +21,64 @@ def test_forageragent_initialization():
     """Test ForagerAgent initialization for minimal choice_set input."""
     agent = ForagerAgent(choice_set=get_minimal_choice_set(), choice_method='full_heatmap')
     assert type(agent.heatmap) is dict
-    assert agent.heatmap['alternative_0'] == 0
+    assert agent.heatmap[0] == 0
 
 
 def test_forageragent_update_trackers():
     """Test ForagerAgent.update_agent_trackers() for minimal choice_set input."""
     agent = ForagerAgent(choice_set=get_minimal_choice_set(), choice_method='full_heatmap')
     agent.time_step_catch[0] = 0
-    assert agent.heatmap['alternative_0'] == 0
+    assert agent.heatmap[0] == 0
     assert agent.time_step_catch[0] == 0
-    agent.update_agent_trackers('alternative_0', 1, 0)
-    assert agent.heatmap['alternative_0'] == 1
+    agent.update_agent_trackers(0, 1, 0)
+    assert agent.heatmap[0] == 1
     assert agent.time_step_catch[0] == 1
 
 
+def test_known_alternatives_of_dict_agent():
+    """Test that an agent without FleetState row keeps the choice options it knows in the order they became known,
+    adds a caught choice option at once and only once, and picks known choice options by position."""
+    agent = ForagerAgent(choice_set=get_minimal_choice_set(10), choice_method='full_heatmap',
+                         catchability_coefficient=0.5, nb_of_alternatives_known=3, random_streams=RandomStreams(0))
+    assert isinstance(agent.known_alternatives, KnownAlternatives) and agent.known_alternatives.fleet_state is None
+    initially_known = list(agent.known_alternatives)
+    assert len(set(initially_known)) == 3
+    assert all(agent.heatmap[alternative] > 0 for alternative in initially_known)
+
+    new_alternative = next(alternative for alternative in range(10) if alternative not in agent.known_alternatives)
+    agent.time_step_catch[0] = 0
+    agent.update_agent_trackers(new_alternative, 5, 0)
+    agent.update_agent_trackers(new_alternative, 6, 0)
+    assert list(agent.known_alternatives) == initially_known + [new_alternative]
+    assert agent.known_alternatives[-1] == new_alternative and new_alternative in agent.known_alternatives
+
+    picks, list_picks = RandomStream(np.random.default_rng(0)), RandomStream(np.random.default_rng(0))
+    assert [picks.choice(agent.known_alternatives) for _ in range(50)] == \
+        [list_picks.choice(initially_known + [new_alternative]) for _ in range(50)]                                     # random sharing picks as it would from a list
+
+
+def test_knowledge_tracker_does_not_lag_a_time_step():
+    """Test that the knowledge_in_heatmap tracker counts a choice option from the time step after the agent first
+    caught in it."""
+    fleet = make_fleet(agents={'choice_method': {'heatmap_attributes': {'init_nb_alternative_known': 3}}})
+    first_time_id, second_time_id = fleet.trackers.time_ids
+    fleet.update_memory_trackers(first_time_id)
+    knowledge = fleet.trackers['knowledge_in_heatmap'][fleet.trackers.time_step(first_time_id)].copy()
+    assert knowledge.tolist() == [len(agent.known_alternatives) for agent in fleet.agents.values()]
+
+    agent = fleet.agents[7]
+    new_alternative = next(alternative for alternative in range(len(fleet.alternative_labels))
+                           if alternative not in agent.known_alternatives)
+    fleet.update_agent_trackers(agent.id, catch=3.0, alternative_index=new_alternative, time_tracker=first_time_id)
+    fleet.update_memory_trackers(second_time_id)
+    knowledge[agent.id] += 1
+    assert fleet.trackers['knowledge_in_heatmap'][fleet.trackers.time_step(second_time_id)].tolist() == \
+        knowledge.tolist()
+
+
 # If you want to run the test function directly.
 if __name__ == "__main__":
     test_forageragent_initialization()
     test_forageragent_update_trackers()
+    test_known_alternatives_of_dict_agent()
+    test_knowledge_tracker_does_not_lag_a_time_step()
@@ -0,0 +1,49 @@
+""""Unit tests for artemis.core.heatmap_trees; run with pytest."""
+
+# import testing package and internal modules
+from bisect import bisect
+from itertools import accumulate
+import numpy as np
+import pytest
+from artemis.core.heatmap_trees import FenwickSampler, MaxTree
+
+
+def test_fenwick_sampler_matches_cumulative_weights():
+    """Test that a FenwickSampler draws the same index as a search in the cumulative weights, also after updates."""
+    rng = np.random.default_rng(0)
+    weights = (rng.random(37) * (rng.random(37) < 0.5)).tolist()                                                        # about half of the entries unknown (0)
+    sampler = FenwickSampler(weights)
+    for index, weight in zip(rng.integers(0, 37, 20).tolist(), (rng.random(20) * 10).tolist()):
+        weights[index] = weight
+        sampler.update(index, weight)
+
+    cumulative_weights = list(accumulate(weights))
+    assert sampler.total() == pytest.approx(cumulative_weights[-1])
+    for random_number in rng.random(1000).tolist():
+        assert sampler.sample(random_number) == bisect(cumulative_weights, random_number * cumulative_weights[-1])
+    assert weights[sampler.sample(0.0)] > 0                                                                             # indices without weight are never drawn
+
+
+def test_fenwick_sampler_without_weight():
+    """Test that drawing without any weight raises an error, as RandomStream.choices does."""
+    with pytest.raises(ValueError):
+        FenwickSampler([0.0, 0.0]).sample(0.5)
+
+
+def test_max_tree_ties_resolve_to_lowest_index():
+    """Test that a MaxTree finds the same index as max() over the values, also after updates and with ties."""
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 4, 13).astype(float).tolist()                                                              # few distinct values, so many ties
+    max_tree = MaxTree(values)
+    for index, value in zip(rng.integers(0, 13, 200).tolist(), rng.integers(0, 6, 200).astype(float).tolist()):
+        values[index] = value
+        max_tree.update(index, value)
+        assert max_tree.argmax() == max(range(len(values)), key=values.__getitem__)
+    assert MaxTree([2.5]).argmax() == 0
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    test_fenwick_sampler_matches_cumulative_weights()
+    test_fenwick_sampler_without_weight()
+    test_max_tree_ties_resolve_to_lowest_index()
@@ -0,0 +1,62 @@
+""""Unit tests for artemis.io.output.profiling; run with pytest."""
+
+# import testing package and internal modules
+import json
+import os
+import artemis
+from artemis.io.output.profiling import PhaseProfiler
+
+
+def test_disabled_profiler_measures_nothing():
+    """Test that a disabled PhaseProfiler does not record any phase."""
+    profiler = PhaseProfiler()
+    with profiler.phase('choice'):
+        pass
+    assert profiler.phases == {}
+
+
+def test_phase_measurements():
+    """Test that calls, wall time and allocated bytes of a phase are summed, also over merged profilers."""
+    profiler = PhaseProfiler(enabled=True, memory=True)
+    profiler.start()
+    for _ in range(3):
+        with profiler.phase('allocate'):
+            data = [0.0] * 100000
+    profiler.stop()
+    del data
+    assert profiler.phases['allocate']['calls'] == 3
+    assert profiler.phases['allocate']['allocated_bytes'] > 3 * 0.9 * 100000 * 8                                        # a list of 100000 references of 8 bytes each call
+
+    other_profiler = PhaseProfiler(enabled=True)
+    with other_profiler.phase('allocate'):
+        pass
+    profiler.merge(other_profiler.phases)
+    assert profiler.phases['allocate']['calls'] == 4
+
+
+def test_run_writes_profiling_report(tmp_path):
+    """Test that a profiled run reports all phases of a time step, and the extraction and writing of the output."""
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    scenario_data['model']['duration'] = 4
+    scenario_data['model']['nb_iterations'] = 2
+    scenario_data['profiling'] = {'enabled': True}
+    artemis.run_artemis(scenario_data, str(tmp_path))
+
+    with open(os.path.join(tmp_path, 'profiling_reportdefault.json')) as file:
+        report = json.load(file)
+    assert report['number_of_iterations'] == 2
+    assert set(report['phases']) == {'setup', 'ordering', 'memory_trackers', 'expected_competitors', 'choice',
+                                     'competition_and_sharing', 'growth_and_reset', 'competition_trackers',
+                                     'extraction', 'writing'}
+    assert report['phases']['ordering']['calls'] == 2 * 4                                                               # every time step of every iteration
+    assert report['phases']['competition_and_sharing']['calls'] == 2 * 4                                                # once for all agents, not per agent
+    assert report['phases']['setup']['allocated_bytes'] is None                                                         # memory is not tracked
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    import tempfile
+    test_disabled_profiler_measures_nothing()
+    test_phase_measurements()
+    test_run_writes_profiling_report(tempfile.mkdtemp())
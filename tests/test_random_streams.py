@@ -0,0 +1,33 @@
+""""Unit tests for artemis.core.random_streams; run with pytest."""
+
+# import testing package and internal modules
+import numpy as np
+from artemis.core.random_streams import RandomStreams, RandomStream
+
+
+def test_streams_are_reproducible_and_independent():
+    """Test that the same seed gives the same draws in every component, whatever is drawn in other components."""
+    first_streams = RandomStreams(0)
+    second_streams = RandomStreams(np.random.SeedSequence(0))
+    second_streams['agent_ordering'].generator.random(10000)                                                            # draws of one component do not change those of another
+    assert [first_streams['sharing'].random() for _ in range(5)] == [second_streams['sharing'].random() for _ in range(5)]
+    assert first_streams['sharing'].random() != first_streams['choice_making'].random()
+
+
+def test_per_call_draws():
+    """Test the per call functions of the random module on a RandomStream, across batches of uniform numbers."""
+    random_stream = RandomStream(np.random.default_rng(0), batch_size=7)
+    assert all(0 <= random_stream.random() < 1 for _ in range(100))
+    assert {random_stream.choice(['a', 'b', 'c']) for _ in range(100)} == {'a', 'b', 'c'}
+    assert set(random_stream.choices(['a', 'b', 'c'], weights=[0.0, 1.0, 0.0], k=50)) == {'b'}                         # options with zero weight are never chosen
+
+    sequence = list(range(20))
+    random_stream.shuffle(sequence)
+    assert sorted(sequence) == list(range(20))
+    assert sequence != list(range(20))
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    test_streams_are_reproducible_and_independent()
+    test_per_call_draws()
@@ -0,0 +1,41 @@
+""""Unit tests for artemis.io.output.raw_data_extraction.DataExtractor; run with pytest."""
+
+# import testing package and internal modules
+import os
+import random
+import numpy as np
+import pandas as pd
+import artemis
+
+
+def test_long_layout_matches_agent_columns(tmp_path):
+    """Test that the long time by environment by agent output holds the same values as the agent columns."""
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    scenario_data['model']['duration'] = 5
+    scenario_data['agents'][0]['sharing']['receiving']['name'] = 'stubborn_receiver'                                # agents keep different heatmaps
+
+    for layout in ['wide', 'long']:                                                                                     # same random seed, so both runs are identical
+        scenario_data['output'] = {'layout': layout}
+        os.makedirs(os.path.join(tmp_path, layout))
+        random.seed(0)
+        np.random.seed(0)
+        artemis.run_artemis(scenario_data, os.path.join(tmp_path, layout))
+
+    wide_data = pd.read_csv(os.path.join(tmp_path, 'wide', 'flat_time_x_environment_resultsdefault.csv'))
+    long_data = pd.read_csv(os.path.join(tmp_path, 'long', 'flat_time_x_environment_x_agent_resultsdefault.csv'))
+    environment_data = pd.read_csv(os.path.join(tmp_path, 'long', 'flat_time_x_environment_resultsdefault.csv'))
+
+    assert not any(column.endswith('_catch_expectation_heatmap') for column in environment_data.columns)
+    assert len(long_data) == len(wide_data) * 100
+    for agent in ['agent_subfleet001_00', 'agent_subfleet001_42', 'agent_subfleet002_0']:
+        agent_data = long_data[long_data['agent_id'] == agent]
+        assert agent_data['alternative_id'].tolist() == wide_data['alternative_id'].tolist()
+        assert np.allclose(agent_data['catch_expectation_heatmap'], wide_data[agent + '_catch_expectation_heatmap'])
+        assert np.allclose(agent_data['catch_potential'], wide_data[agent + '_catch_potential'])
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    import tempfile
+    test_long_layout_matches_agent_columns(tempfile.mkdtemp())
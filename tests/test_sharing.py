@@ -0,0 +1,141 @@
+""""Unit tests for artemis.core.sharing; run with pytest."""
+
+# import testing package and internal modules
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import artemis
+from conftest import default_scenario_data, make_fleet
+
+
+def make_sharing_fleet(sharing_strategy='random_sharing', receiving_strategy='combine_receiver', nb_groups=1,
+                       engine='vectorized', synchronous_sharing=False, receiver_choice='static_group_choice'):
+    """initializes the fleet of the default scenario, in which every agent knows a few choice options and shares with a
+    single receiver of its own group"""
+    return make_fleet(scenario={'fleet': {'synchronous_sharing': synchronous_sharing,
+                                          'receiver_choice': {'name': receiver_choice,
+                                                              'group_attributes': {'nb_groups': nb_groups}}}},
+                      agents={'choice_method': {'heatmap_attributes': {'init_nb_alternative_known': 3}},
+                              'sharing': {'sharing': {'name': sharing_strategy, 'nb_options_shared': 2},
+                                          'receiver_choice': {'nb_receivers': 1},
+                                          'receiving': {'name': receiving_strategy}}},
+                      engine=engine)
+
+
+def receive_one_by_one(receiving_strategy, heatmap, known, receivers, columns, values):
+    """applies shared (receiver, column, value) triples one after the other, as the HeatmapExchanger of every agent"""
+    for receiver, column, value in zip(receivers.tolist(), columns.tolist(), values.tolist()):
+        if receiving_strategy == 'willing_receiver' or not known[receiver, column]:
+            heatmap[receiver, column] = value
+        elif receiving_strategy == 'combine_receiver':
+            heatmap[receiver, column] = (value + heatmap[receiver, column]) / 2
+        known[receiver, column] = True
+
+
+@pytest.mark.parametrize('receiving_strategy', ['willing_receiver', 'combine_receiver', 'stubborn_receiver'])
+def test_batch_receiving_matches_one_by_one(receiving_strategy):
+    """Test that receiving all shared data at once gives the same heatmaps as receiving the data one by one,
+    also if an entry is shared several times."""
+    fleet = make_sharing_fleet(receiving_strategy=receiving_strategy)
+    fleet_state = fleet.fleet_state
+    rng = np.random.default_rng(0)
+    receivers = rng.integers(0, 5, 300)                                                                                 # few receivers and choice options, so entries are shared many times
+    columns = rng.integers(0, 4, 300)
+    values = rng.random(300) * 50
+    heatmap, known = fleet_state.heatmap.copy(), fleet_state.known.copy()
+    receive_one_by_one(receiving_strategy, heatmap, known, receivers, columns, values)
+
+    receive = fleet.fleet_heatmap_exchanger.functionality['receiving'][receiving_strategy]
+    receive(fleet_state, receivers, columns, values, fleet_state.known[receivers, columns])
+    assert np.allclose(fleet_state.heatmap, heatmap, rtol=1e-12, atol=0)
+    assert np.array_equal(fleet_state.known, known)
+
+
+def test_exchange_reads_heatmaps_from_the_start_of_the_exchange():
+    """Test that every agent of a group of two receives the heatmap entry its partner had on its last forage event
+    at the start of the exchange, and knows the choice option afterwards."""
+    fleet = make_sharing_fleet(sharing_strategy='last_event_sharing', receiving_strategy='willing_receiver',
+                               nb_groups=50)
+    chosen_alternatives = fleet.make_choices()
+    heatmap = fleet.fleet_state.heatmap.copy()
+    fleet.exchange_heatmaps(chosen_alternatives)
+
+    for group in fleet.group_former.relevant_data['overview_allegiances'].values():
+        first_agent, second_agent = group
+        for sender, receiver in [(first_agent, second_agent), (second_agent, first_agent)]:
+            column = chosen_alternatives[sender]
+            assert fleet.fleet_state.heatmap[receiver, column] == heatmap[sender, column]
+            assert column in fleet.agents[receiver].known_alternatives
+
+
+@pytest.mark.parametrize('engine', ['dict', 'array'])
+def test_synchronous_sharing_does_not_depend_on_agent_order(engine):
+    """Test that synchronous sharing gives the same heatmaps for any order of the agents, and the same heatmaps for
+    the 'dict' and 'array' engines."""
+    heatmaps = []
+    for fleet_engine, reverse_order in [(engine, False), (engine, True), ('dict', False)]:
+        fleet = make_sharing_fleet(engine=fleet_engine, synchronous_sharing=True)
+        if reverse_order:
+            fleet.agent_index_list.reverse()
+        fleet.exchange_heatmaps_synchronously()
+        heatmaps.append(fleet.heatmap_matrix())
+    assert not np.array_equal(heatmaps[0], make_sharing_fleet(engine=engine).heatmap_matrix())                          # data has been shared
+    assert np.array_equal(heatmaps[0], heatmaps[1])
+    assert np.array_equal(heatmaps[0], heatmaps[2])
+
+
+def test_synchronous_sharing_reads_heatmaps_from_the_start_of_the_sharing_phase():
+    """Test that received data is not passed on in the same sharing phase: every agent of a group of two receives
+    the heatmap entries its partner had at the start of the sharing phase."""
+    fleet = make_sharing_fleet(receiving_strategy='willing_receiver', nb_groups=50, engine='dict',
+                               synchronous_sharing=True)
+    heatmaps = fleet.heatmap_matrix()
+    known_alternatives = {agent_id: set(agent.known_alternatives) for agent_id, agent in fleet.agents.items()}
+    fleet.exchange_heatmaps_synchronously()
+
+    for first_agent, second_agent in fleet.group_former.relevant_data['overview_allegiances'].values():
+        for sender, receiver in [(first_agent, second_agent), (second_agent, first_agent)]:
+            received = set(fleet.agents[receiver].known_alternatives) - known_alternatives[receiver]
+            assert received <= known_alternatives[sender]                                                               # only data the sender knew at the start is shared
+            for column in received:
+                assert fleet.agents[receiver].heatmap[column] == heatmaps[sender, column]
+
+
+@pytest.mark.parametrize('receiver_choice', ['random_choice', 'static_group_choice'])
+def test_picked_receivers_are_the_other_agents_of_the_pool(receiver_choice):
+    """Test that an agent picks every other agent it may share with as receiver, and never itself."""
+    fleet = make_sharing_fleet(nb_groups=10, engine='dict', receiver_choice=receiver_choice)
+    personal_allegiances = fleet.group_former.relevant_data['personal_allegiances']
+    for agent_id in [0, 37, 99]:
+        pick_receiver = fleet.agents[agent_id].heatmap_exchanger.functionality['pick_receiver'][receiver_choice]
+        receivers = {pick_receiver['execute']() for _ in range(2000)}
+        if receiver_choice == 'random_choice':
+            assert receivers == set(fleet.agents) - {agent_id}
+        else:
+            group = fleet.group_former.relevant_data['overview_allegiances'][personal_allegiances[agent_id]]
+            assert receivers == set(group) - {agent_id}
+
+
+def test_run_with_random_receiver_choice(tmp_path):
+    """Test that a run in which agents pick receivers from all agents reports the group of every agent."""
+    scenario_data = default_scenario_data(scenario={'fleet': {'receiver_choice': {'name': 'random_choice'}}},
+                                          agents={'sharing': {'receiver_choice': {'nb_receivers': 1}}})
+    artemis.run_artemis(scenario_data, str(tmp_path))
+
+    output_data = pd.read_csv(os.path.join(tmp_path, 'flat_time_x_agent_resultsdefault.csv'))
+    assert output_data['group_allegiance'].notna().all()
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    import tempfile
+    for strategy in ['willing_receiver', 'combine_receiver', 'stubborn_receiver']:
+        test_batch_receiving_matches_one_by_one(strategy)
+    test_exchange_reads_heatmaps_from_the_start_of_the_exchange()
+    for engine in ['dict', 'array']:
+        test_synchronous_sharing_does_not_depend_on_agent_order(engine)
+    test_synchronous_sharing_reads_heatmaps_from_the_start_of_the_sharing_phase()
+    for receiver_choice in ['random_choice', 'static_group_choice']:
+        test_picked_receivers_are_the_other_agents_of_the_pool(receiver_choice)
+    test_run_with_random_receiver_choice(tempfile.mkdtemp())
@@ -0,0 +1,100 @@
+""""Unit tests for artemis.core.social_network.SocialNetwork; run with pytest."""
+
+# import testing package and internal modules
+import os
+import numpy as np
+import pytest
+from conftest import make_fleet
+
+
+def make_network_fleet(network_attributes, engine='dict', nb_groups=1):
+    """initializes the fleet of the default scenario, in which every agent shares with a neighbour in the network"""
+    return make_fleet(scenario={'fleet': {'receiver_choice': {'name': 'network_choice',
+                                                              'group_attributes': {'nb_groups': nb_groups},
+                                                              'network_attributes': network_attributes}}},
+                      agents={'choice_method': {'heatmap_attributes': {'init_nb_alternative_known': 3}},
+                              'sharing': {'sharing': {'name': 'random_sharing'},
+                                          'receiver_choice': {'nb_receivers': 1}}},
+                      engine=engine)
+
+
+def adjacency_sets(network):
+    """the neighbours of every agent in the network, as a set per agent"""
+    return [set(network.neighbours(agent_id).tolist()) for agent_id in range(network.nb_agents)]
+
+
+@pytest.mark.parametrize('network_type', ['small_world', 'scale_free', 'group_block'])
+def test_generated_network_is_a_simple_undirected_graph(network_type):
+    """Test that a generated network has sorted, symmetric links without links of an agent to itself or duplicate
+    links, and about the mean degree."""
+    fleet = make_network_fleet({'network_type': network_type, 'mean_degree': 6}, nb_groups=4)
+    network = fleet.social_network
+    neighbours = adjacency_sets(network)
+    for agent_id in range(network.nb_agents):
+        agent_neighbours = network.neighbours(agent_id)
+        assert np.all(np.diff(agent_neighbours) > 0)                                                                    # sorted, so no duplicates
+        assert agent_id not in neighbours[agent_id]
+        assert all(agent_id in neighbours[neighbour] for neighbour in neighbours[agent_id])
+    assert np.all(network.degrees() > 0)
+    assert 4 < network.degrees().mean() <= 6
+
+
+def test_scale_free_network_has_hubs():
+    """Test that preferential attachment gives a few agents many more links than the mean degree, most of them
+    among the agents added first."""
+    fleet = make_network_fleet({'network_type': 'scale_free', 'mean_degree': 4})
+    degrees = fleet.social_network.degrees()
+    assert degrees.max() >= 4 * degrees.mean()
+    assert degrees[:10].mean() > 2 * degrees[50:].mean()
+
+
+def test_group_block_network_links_mostly_within_groups():
+    """Test that about the between_group_share of the links of a group_block network is between groups."""
+    fleet = make_network_fleet({'network_type': 'group_block', 'mean_degree': 10, 'between_group_share': 0.2},
+                               nb_groups=4)
+    personal_allegiances = fleet.group_former.relevant_data['personal_allegiances']
+    network = fleet.social_network
+    sources = np.repeat(np.arange(network.nb_agents), network.degrees())
+    between = [personal_allegiances[source] != personal_allegiances[target]
+               for source, target in zip(sources.tolist(), network.indices.tolist())]
+    assert 0.1 < np.mean(between) < 0.3
+
+
+def test_network_from_file(tmp_path):
+    """Test that links read from a file are symmetric and left out when duplicate or to the agent itself."""
+    file = os.path.join(tmp_path, 'links.csv')
+    with open(file, 'w') as links:
+        links.write('0,1\n1,0\n2,2\n3,99\n')
+    fleet = make_network_fleet({'network_type': 'file', 'file': file})
+    neighbours = adjacency_sets(fleet.social_network)
+    assert neighbours[0] == {1} and neighbours[1] == {0} and neighbours[3] == {99} and neighbours[99] == {3}
+    assert neighbours[2] == set()
+
+
+@pytest.mark.parametrize('engine', ['dict', 'vectorized'])
+def test_receivers_are_neighbours(engine):
+    """Test that agents only receive data known by their neighbours in a ring network."""
+    fleet = make_network_fleet({'network_type': 'small_world', 'mean_degree': 2, 'rewire_probability': 0}, engine)
+    known_alternatives = {agent_id: set(agent.known_alternatives) for agent_id, agent in fleet.agents.items()}
+    if engine == 'vectorized':
+        fleet.exchange_heatmaps(fleet.make_choices())
+    else:
+        fleet.exchange_heatmaps_synchronously()                                                                         # received data is not passed on to the neighbours of neighbours
+
+    for agent_id, agent in fleet.agents.items():
+        received = set(agent.known_alternatives) - known_alternatives[agent_id]
+        neighbours_known = set().union(*(known_alternatives[neighbour] for neighbour in {(agent_id - 1) % 100,
+                                                                                          (agent_id + 1) % 100}))
+        assert received <= neighbours_known
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    import tempfile
+    for network_type in ['small_world', 'scale_free', 'group_block']:
+        test_generated_network_is_a_simple_undirected_graph(network_type)
+    test_scale_free_network_has_hubs()
+    test_group_block_network_links_mostly_within_groups()
+    test_network_from_file(tempfile.mkdtemp())
+    for engine in ['dict', 'vectorized']:
+        test_receivers_are_neighbours(engine)
@@ -0,0 +1,68 @@
+""""Unit tests for artemis.sweep; run with pytest."""
+
+# import testing package and internal modules
+import json
+import os
+import pytest
+import artemis
+from artemis.sweep import expand_sweep, job_scenario_data, run_sweep, MANIFEST_FILE_NAME
+
+PARAMETERS = {'intfac': {'path': 'competition > interference_attributes > interference_factor', 'values': [0.9, 1.0]},
+              'nbsrec': {'path': 'agents > subfleet001 > sharing > receiver_choice > nb_receivers', 'values': [0, 1]}}
+
+
+def read_scenario_data():
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    scenario_data['model']['duration'] = 3
+    return scenario_data
+
+
+def test_expand_sweep():
+    """Test that every combination of parameter values becomes a job that only changes its own scenario data."""
+    scenario_data = read_scenario_data()
+    jobs = expand_sweep(PARAMETERS)
+    assert [job['job_id'] for job in jobs] == ['intfac0.9_nbsrec0', 'intfac0.9_nbsrec1',
+                                               'intfac1.0_nbsrec0', 'intfac1.0_nbsrec1']
+
+    job_data = job_scenario_data(scenario_data, PARAMETERS, jobs[1])
+    assert job_data['scenario_id'] == '_intfac0.9_nbsrec1'
+    assert job_data['competition']['interference_attributes']['interference_factor'] == 0.9
+    assert [agent['sharing']['receiver_choice']['nb_receivers'] for agent in job_data['agents']] == [1, 0]
+    assert scenario_data['scenario_id'] == 'default'                                                                    # the scenario data of the sweep is not changed
+
+    with pytest.raises(KeyError):
+        job_scenario_data(scenario_data, {'x': {'path': 'model > no_such > key', 'values': [1]}},
+                          {'job_id': 'x1', 'parameters': {'x': 1}})
+
+
+def test_sweep_resumes_after_completed_jobs(tmp_path):
+    """Test that a sweep records completed jobs and only runs the remaining jobs when run again."""
+    scenario_data = read_scenario_data()
+    manifest_file = os.path.join(tmp_path, MANIFEST_FILE_NAME)
+
+    assert run_sweep(scenario_data, PARAMETERS, str(tmp_path), workers=2, save_config=False) == \
+        [job['job_id'] for job in expand_sweep(PARAMETERS)]
+    assert os.path.exists(os.path.join(tmp_path, 'intfac1.0_nbsrec1', 'flat_time_x_agent_results_intfac1.0_nbsrec1.csv'))
+
+    with open(manifest_file) as file:
+        manifest = json.load(file)
+    assert all(job['completed'] for job in manifest['jobs'])
+    manifest['jobs'][2]['completed'] = False                                                                           # as if the sweep was interrupted during this job
+    with open(manifest_file, 'w') as file:
+        json.dump(manifest, file)
+
+    assert run_sweep(scenario_data, PARAMETERS, str(tmp_path), save_config=False) == ['intfac1.0_nbsrec0']
+
+    with pytest.raises(ValueError):                                                                                     # the output folder holds a different sweep
+        run_sweep(scenario_data, {'intfac': PARAMETERS['intfac']}, str(tmp_path))
+    scenario_data['model']['duration'] = 5
+    with pytest.raises(ValueError):                                                                                     # the jobs start from other scenario data
+        run_sweep(scenario_data, PARAMETERS, str(tmp_path))
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    import tempfile
+    test_expand_sweep()
+    test_sweep_resumes_after_completed_jobs(tempfile.mkdtemp())
@@ -0,0 +1,65 @@
+""""Unit tests for artemis.io.output.tracing; run with pytest."""
+
+# import testing package and internal modules
+import os
+import numpy as np
+import pytest
+import artemis
+from artemis.io.output.tracing import Tracer
+from artemis.io.output.export_data import DataReader
+
+
+def test_trace_levels(capsys):
+    """Test that events are printed and captured up to their own level, and that all agent events can be sampled."""
+    tracer = Tracer(level='iteration', capture_level='agent', sample_rate=0)
+    assert tracer.traces_iterations and tracer.traces_time_steps and tracer.traces_agents
+    tracer.set_time(iteration_id=0, time_id='01')
+    tracer.event('iteration', 'iteration_start', 'iteration {iteration_id}')
+    tracer.event('time_step', 'time_step_start', 'time step {time_id}')
+    tracer.event('agent', 'choice', '{agent_id} chose {alternative_id}', agent_id='agent_1', alternative_id='a_1')
+
+    assert capsys.readouterr().out == 'iteration 0\n'
+    events_data = tracer.get_events_data()
+    assert events_data['event'].tolist() == ['iteration_start', 'time_step_start']                                      # the agent event was not sampled
+    assert events_data['message'].tolist() == ['iteration 0', 'time step 01']
+
+    assert not Tracer().traces_iterations
+    with pytest.raises(ValueError):
+        Tracer(level='everything')
+
+
+def test_events_report_labels_of_indices():
+    """Test that agent and choice option indices are reported by their label once label tables are set."""
+    tracer = Tracer(capture_level='agent')
+    tracer.set_labels(agent_labels=['agent_a_0', 'agent_a_1'], alternative_labels=['alternative_0', 'alternative_1'])
+    tracer.event('agent', 'choice', '{agent_id} chose {alternative_id}', agent_id=1, alternative_id=0)
+    tracer.event('agent', 'explore', '{agent_id} is exploring!', agent_id=0)
+
+    events_data = tracer.get_events_data()
+    assert events_data['agent_id'].tolist() == ['agent_a_1', 'agent_a_0']
+    assert events_data['alternative_id'].tolist() == ['alternative_0', '']
+    assert events_data['message'].tolist() == ['agent_a_1 chose alternative_0', 'agent_a_0 is exploring!']
+
+
+def test_run_captures_agent_events(tmp_path):
+    """Test that the captured events of a run are written with the output data of every iteration."""
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    scenario_data['model']['duration'] = 3
+    scenario_data['model']['nb_iterations'] = 2
+    scenario_data['tracing'] = {'level': 'off', 'capture_level': 'agent', 'sample_rate': 0.5}
+    artemis.run_artemis(scenario_data, str(tmp_path))
+
+    events_data = DataReader().read(os.path.join(tmp_path, 'trace_eventsdefault.csv'))
+    assert events_data['iteration_id'].unique().tolist() == [0, 1]
+    assert (events_data['event'] == 'time_step_start').sum() == 2 * 3
+    nb_choices = (events_data['event'] == 'choice').sum()
+    assert 0 < nb_choices < 2 * 3 * 100                                                                                 # a sample of the choices of 100 agents in every time step
+    assert np.all(events_data.loc[events_data['event'] == 'choice', 'alternative_id'].str.startswith('alternative_'))
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    import tempfile
+    test_events_report_labels_of_indices()
+    test_run_captures_agent_events(tempfile.mkdtemp())
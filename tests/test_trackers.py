@@ -0,0 +1,69 @@
+""""Unit tests for artemis.core.trackers.TrackerStore and the extraction of tracked data; run with pytest."""
+
+# import testing package and internal modules
+import os
+import random
+import numpy as np
+import pandas as pd
+import pytest
+import artemis
+from artemis.core.choice_set import ChoiceSet
+from artemis.core.trackers import TrackerStore
+
+
+def test_tracker_store_preallocation():
+    """Test that trackers are preallocated for all time steps and indexed by time step id."""
+    trackers = TrackerStore(time_ids=['00', '01', '02'])
+    trackers.add_tracker('catch', shape=(4,))
+    trackers.add_tracker('visit', shape=(4,), dtype=np.int64, fill_value=-1)
+    assert trackers['catch'].shape == (3, 4) and trackers['visit'].dtype == np.int64
+    assert 'catch' in trackers and 'stock' not in trackers
+
+    trackers['visit'][trackers.time_step('01')] = [0, 1, 2, 3]
+    assert trackers['visit'][:, 1].tolist() == [-1, 1, -1]
+
+
+def test_agent_data_aligned_with_agent_id(tmp_path):
+    """Test that the agent data of a shuffled fleet is extracted in the row of the agent it belongs to."""
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    scenario_data['model']['duration'] = 10
+    scenario_data['agents'][0]['sharing']['receiving']['name'] = 'stubborn_receiver'                                # agents keep different heatmaps
+    random.seed(0)
+    np.random.seed(0)
+    artemis.run_artemis(scenario_data, str(tmp_path))
+
+    agent_data = pd.read_csv(os.path.join(tmp_path, 'flat_time_x_agent_resultsdefault.csv'))
+    environment_data = pd.read_csv(os.path.join(tmp_path, 'flat_time_x_environment_resultsdefault.csv'))\
+        .set_index(['time_id', 'alternative_id'])
+    for row in agent_data.itertuples():
+        perception = environment_data.loc[(row.time_id, row.forage_visit), row.agent_id + '_catch_expectation_heatmap']
+        assert perception == row.heatmap_expected_catch
+        assert np.isclose(environment_data.loc[(row.time_id, row.forage_visit), 'real_stock'] * 0.2,
+                          row.uncorrected_catch)
+
+
+def test_tracker_selection(tmp_path):
+    """Test that only the selected trackers are recorded and the data series of the others are not written."""
+    this_file_dir = os.path.dirname(__file__)
+    scenario_data = artemis.io.read_data_from_yml(os.path.join(this_file_dir, 'resources/default_config.yml'))
+    scenario_data['model']['duration'] = 5
+    scenario_data['trackers'] = {'agents': ['forage_visit', 'corrected_catch'], 'options': ['resource_stock']}
+    artemis.run_artemis(scenario_data, str(tmp_path))
+
+    agent_data = pd.read_csv(os.path.join(tmp_path, 'flat_time_x_agent_resultsdefault.csv'))
+    environment_data = pd.read_csv(os.path.join(tmp_path, 'flat_time_x_environment_resultsdefault.csv'))
+    assert {'forage_visit', 'realised_catch'} <= set(agent_data.columns)
+    assert not {'uncorrected_catch', 'realised_competition', 'knowledge_in_heatmap'} & set(agent_data.columns)
+    assert {'agents_visited', 'real_stock'} <= set(environment_data.columns)
+    assert 'nb_agents_visited' not in environment_data.columns
+    assert not any(column.endswith('_catch_expectation_heatmap') for column in environment_data.columns)
+
+    with pytest.raises(ValueError):
+        ChoiceSet(nb_alternatives=4, stock_distribution='uniform_random_repeat', init_stock=100, sd_init_stock=25,
+                  minimum_stock=0, maximum_stock=100, duration=5, trackers=['resource_stock', 'catch_per_agent'])
+
+
+# If you want to run the test function directly.
+if __name__ == "__main__":
+    test_tracker_store_preallocation()